@@ -0,0 +1,169 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:47
+
+import advertisement.models
+import django.core.validators
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Banner",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("title", models.CharField(max_length=200, verbose_name="Заголовок")),
+                (
+                    "subtitle",
+                    models.CharField(
+                        blank=True,
+                        max_length=300,
+                        null=True,
+                        verbose_name="Подзаголовок",
+                    ),
+                ),
+                (
+                    "content",
+                    models.TextField(blank=True, null=True, verbose_name="Содержание"),
+                ),
+                (
+                    "image",
+                    models.ImageField(
+                        help_text="размер: 1200x400 пикселей",
+                        upload_to=advertisement.models.banner_image_path,
+                        verbose_name="Изображение",
+                    ),
+                ),
+                (
+                    "url",
+                    models.URLField(
+                        blank=True,
+                        help_text="Внешняя ссылка или путь внутри сайта",
+                        null=True,
+                        verbose_name="URL ссылки",
+                    ),
+                ),
+                (
+                    "button_text",
+                    models.CharField(
+                        blank=True,
+                        help_text="если кнопка не нужна",
+                        max_length=50,
+                        null=True,
+                        verbose_name="Текст кнопки",
+                    ),
+                ),
+                (
+                    "start_date",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name="Дата начала показа",
+                    ),
+                ),
+                (
+                    "end_date",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="бессрочного показа",
+                        null=True,
+                        verbose_name="Дата окончания показа",
+                    ),
+                ),
+                (
+                    "priority",
+                    models.IntegerField(
+                        default=5,
+                        help_text="От 1 (низкий) до 10 (высокий)",
+                        validators=[
+                            django.core.validators.MinValueValidator(1),
+                            django.core.validators.MaxValueValidator(10),
+                        ],
+                        verbose_name="Приоритет",
+                    ),
+                ),
+                (
+                    "position",
+                    models.CharField(
+                        choices=[
+                            ("hero", "Основная область (Hero)"),
+                            ("above_restaurants", "Над списком ресторанов"),
+                            ("above_dishes", "Над списком блюд"),
+                        ],
+                        default="hero",
+                        max_length=20,
+                        verbose_name="Позиция на странице",
+                    ),
+                ),
+                (
+                    "color_scheme",
+                    models.CharField(
+                        choices=[
+                            ("light", "Светлая (темный текст)"),
+                            ("dark", "Темная (светлый текст)"),
+                            ("primary", "Основной цвет"),
+                            ("accent", "Акцентный цвет"),
+                        ],
+                        default="light",
+                        max_length=10,
+                        verbose_name="Цветовая схема",
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(default=True, verbose_name="Активен"),
+                ),
+                (
+                    "clicks",
+                    models.PositiveIntegerField(
+                        default=0, editable=False, verbose_name="Количество кликов"
+                    ),
+                ),
+                (
+                    "impressions",
+                    models.PositiveIntegerField(
+                        default=0, editable=False, verbose_name="Количество показов"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Дата обновления"),
+                ),
+            ],
+            options={
+                "verbose_name": "Баннер",
+                "verbose_name_plural": "Баннеры",
+                "ordering": ["-priority", "-start_date"],
+                "indexes": [
+                    models.Index(
+                        fields=["start_date", "end_date", "is_active"],
+                        name="advertiseme_start_d_721752_idx",
+                    ),
+                    models.Index(
+                        fields=["position"], name="advertiseme_positio_4b98ec_idx"
+                    ),
+                    models.Index(
+                        fields=["priority"], name="advertiseme_priorit_b3c3c2_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -11,30 +11,37 @@ from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+from core.cache import cache_response
+from core.conditional import ConditionalGetMixin, conditional_get
+from core.ratelimit import rate_limit
 from .models import Banner
 from .serializers import BannerSerializer
 
 logger = logging.getLogger(__name__)
 
-class BannerViewSet(viewsets.ReadOnlyModelViewSet):
+class BannerViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Banner.objects.all()
     serializer_class = BannerSerializer
     permission_classes = [permissions.AllowAny]
-    
-    @swagger_auto_schema(
-        operation_description="Получить список активных баннеров",
-        responses={200: BannerSerializer(many=True)}
-    )
-    def list(self, request):
-        """Список всех активных баннеров"""
+    conditional_counters = ('impressions', 'clicks')
+
+    def get_active_banners(self):
         now = timezone.now()
-        banners = Banner.objects.filter(
+        return Banner.objects.filter(
             is_active=True,
             start_date__lte=now
         ).filter(
             Q(end_date__gte=now) | Q(end_date__isnull=True)
         ).order_by('-priority', '-start_date')
-        
+
+    @swagger_auto_schema(
+        operation_description="Получить список активных баннеров",
+        responses={200: BannerSerializer(many=True)}
+    )
+    @cache_response('banners', timeout=60)
+    def list(self, request):
+        """Список всех активных баннеров"""
+        banners = self.get_active_banners()
         serializer = self.get_serializer(banners, many=True)
         return Response(serializer.data)
     
@@ -45,9 +52,10 @@ class BannerViewSet(viewsets.ReadOnlyModelViewSet):
             404: "Баннер не найден"
         }
     )
+    @conditional_get
     def retrieve(self, request, pk=None):
         """Получить детали баннера по ID"""
-        banner = get_object_or_404(Banner, pk=pk)
+        banner = self.get_object()
         serializer = self.get_serializer(banner)
         return Response(serializer.data)
     
@@ -65,6 +73,7 @@ class BannerViewSet(viewsets.ReadOnlyModelViewSet):
         }
     )
     @action(detail=True, methods=['post'])
+    @rate_limit('banner-click', '60/m')
     def click(self, request, pk=None):
         """Зарегистрировать клик по баннеру и вернуть URL для перенаправления"""
         banner = get_object_or_404(Banner, pk=pk)
@@ -90,6 +99,7 @@ class BannerViewSet(viewsets.ReadOnlyModelViewSet):
         }
     )
     @action(detail=True, methods=['post'])
+    @rate_limit('banner-impression', '120/m')
     def impression(self, request, pk=None):
         """Зарегистрировать показ баннера"""
         banner = get_object_or_404(Banner, pk=pk)
@@ -121,6 +131,7 @@ class BannerViewSet(viewsets.ReadOnlyModelViewSet):
         responses={200: BannerSerializer(many=True)}
     )
     @action(detail=False, methods=['get'])
+    @cache_response('banners', timeout=60)
     def by_position(self, request):
         """Получить баннеры по позиции на странице"""
         position = request.query_params.get('position', 'hero')
@@ -144,6 +155,7 @@ def get_current_banners(position='hero', limit=1):
     return banners
 
 @require_GET
+@rate_limit('banner-click', '60/m')
 def banner_click(request, banner_id):
     try:
         banner = get_object_or_404(Banner, pk=banner_id)
@@ -159,6 +171,7 @@ def banner_click(request, banner_id):
 
 @csrf_exempt
 @require_POST
+@rate_limit('banner-impression', '120/m')
 def banner_impression(request, banner_id):
     try:
         banner = get_object_or_404(Banner, pk=banner_id)
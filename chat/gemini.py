@@ -0,0 +1,11 @@
+import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_model():
+    """Модель Gemini создаётся при первом сообщении: импорт SDK занимает около половины секунды."""
+    import google.generativeai as genai
+
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    return genai.GenerativeModel("gemini-1.5-flash")
@@ -10,3 +10,9 @@ class ChatMessage(models.Model):
     role = models.CharField(max_length=10, choices=[('user', 'User'), ('bot', 'Bot')])
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id']),
+        ]
@@ -1,4 +1,11 @@
 from rest_framework import serializers
+from .models import ChatMessage
 
 class ChatSerializer(serializers.Serializer):
     message = serializers.CharField(max_length=2000)
+
+
+class ChatMessageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChatMessage
+        fields = ['id', 'role', 'content', 'created_at']
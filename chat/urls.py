@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import ChatAPIView
+from .views import ChatAPIView, ChatHistoryView
 
 urlpatterns = [
     path('', ChatAPIView.as_view(), name='chat'),
+    path('history/', ChatHistoryView.as_view(), name='chat-history'),
 ]
@@ -1,16 +1,17 @@
-import os
-import google.generativeai as genai
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
-from .serializers import ChatSerializer
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from core.metrics import observe_external
+from core.pagination import KeysetPagination
+from core.ratelimit import rate_limit
+from .gemini import get_model
+from .serializers import ChatSerializer, ChatMessageSerializer
 from .models import ChatMessage
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-
-
-model = genai.GenerativeModel("gemini-1.5-flash")
 
+@rate_limit('chat', '10/m', key='user')
+@rate_limit('chat-daily', '200/d', key='user')
 class ChatAPIView(APIView):
     def post(self, request):
         serializer = ChatSerializer(data=request.data)
@@ -21,7 +22,9 @@ class ChatAPIView(APIView):
             try:
                 ChatMessage.objects.create(user=user, role="user", content=message)
 
-                response = model.generate_content(message)
+                model = get_model()
+                with observe_external('gemini', 'generate_content'):
+                    response = model.generate_content(message)
                 reply = response.text
 
                 ChatMessage.objects.create(user=user, role="bot", content=reply)
@@ -32,3 +35,14 @@ class ChatAPIView(APIView):
                 return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ChatHistoryView(generics.ListAPIView):
+    """История сообщений текущего пользователя, от новых к старым, с курсорной пагинацией."""
+    serializer_class = ChatMessageSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    filter_backends = []
+
+    def get_queryset(self):
+        return ChatMessage.objects.filter(user=self.request.user).order_by('-created_at')
@@ -6,6 +6,7 @@ from django.db.models import Max
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+from core.cache import cache_response
 from .models import City
 from .permissions import IsAdminOrReadOnly
 from .serializers import CitySerializer
@@ -19,6 +20,14 @@ class CityViewSet(viewsets.ModelViewSet):
     search_fields = ['name']
     ordering_fields = ['name', 'position']
     ordering = ['position', 'name']
+
+    @cache_response('cities')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response('cities')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
     
     def perform_create(self, serializer):
         if not serializer.validated_data.get('position'):
@@ -0,0 +1,54 @@
+import pytest
+from django.test import override_settings
+
+from core.synthetic import DEFAULT_SIZES, SyntheticDataBuilder, scale_sizes
+
+# Тесты не трогают общий Redis: сброс версий и счётчики остаются в памяти процесса.
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'epicure-tests',
+    },
+}
+
+REPORTS = pytest.StashKey[dict]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('epicure')
+    group.addoption('--synthetic-scale', type=float, default=1.0, help='Множитель объёма синтетических данных')
+    group.addoption('--no-time-budget', action='store_true', help='Не проверять время ответа эндпоинтов')
+
+
+@pytest.fixture(scope='session', autouse=True)
+def locmem_cache():
+    with override_settings(CACHES=TEST_CACHES):
+        yield
+
+
+@pytest.fixture(scope='session')
+def synthetic_data(request, django_db_setup, django_db_blocker):
+    """Синтетический набор данных в тестовой базе, один на весь прогон."""
+    sizes = scale_sizes(DEFAULT_SIZES, request.config.getoption('synthetic_scale'))
+    with django_db_blocker.unblock():
+        return SyntheticDataBuilder(sizes=sizes, seed=0).build()
+
+
+@pytest.fixture(scope='session')
+def report(request):
+    """
+    report(заголовок, шапка, строка) добавляет строку в таблицу, которая
+    выводится в конце прогона: по ней видно, какой эндпоинт стал хуже.
+    """
+    tables = request.config.stash.setdefault(REPORTS, {})
+
+    def add(title, header, line):
+        tables.setdefault(title, [header, '-' * len(header)]).append(line)
+    return add
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    for title, lines in config.stash.get(REPORTS, {}).items():
+        terminalreporter.section(title)
+        for line in lines:
+            terminalreporter.write_line(line)
@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "core"
+    verbose_name = "Ядро"
+
+    def ready(self):
+        from . import cache, invalidation, metrics, slow_queries, tracing
+        invalidation.connect_signals()
+        cache.connect_signals()
+        metrics.connect_signals()
+        slow_queries.connect_signals()
+        tracing.install()
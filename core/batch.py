@@ -0,0 +1,163 @@
+import logging
+from urllib.parse import urlencode, urlsplit
+
+import orjson
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import serializers, status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core import ratelimit
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = '/api/v1/'
+# Заголовки, которые клиент может передать подзапросу; остальные берутся из пакета.
+ITEM_HEADERS = {
+    'if-none-match': 'HTTP_IF_NONE_MATCH',
+    'if-modified-since': 'HTTP_IF_MODIFIED_SINCE',
+    'accept-language': 'HTTP_ACCEPT_LANGUAGE',
+}
+RESPONSE_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control')
+
+
+class BatchItemSerializer(serializers.Serializer):
+    id = serializers.CharField(required=False, max_length=64, help_text='Ключ, возвращаемый в ответе')
+    path = serializers.CharField(max_length=2000, help_text='Путь GET-запроса, например /api/v1/cities/')
+    params = serializers.DictField(child=serializers.CharField(allow_blank=True), required=False)
+    headers = serializers.DictField(child=serializers.CharField(), required=False)
+
+    def validate_path(self, value):
+        if not value.startswith(API_PREFIX):
+            raise serializers.ValidationError(f'Поддерживаются только пути {API_PREFIX}')
+        return value
+
+    def validate_headers(self, value):
+        unknown = [name for name in value if name.lower() not in ITEM_HEADERS]
+        if unknown:
+            raise serializers.ValidationError(f"Недопустимые заголовки: {', '.join(unknown)}")
+        return value
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(f'Не больше {settings.BATCH_MAX_REQUESTS} запросов в пакете')
+        return value
+
+
+class BatchView(APIView):
+    """
+    Несколько GET-запросов к API одним POST: главный экран мобильного приложения
+    получает города, рестораны, баннеры и предложения за один round trip.
+
+    Подзапросы выполняются в этом же процессе через URLconf, с теми же правами и
+    фильтрами, что и отдельные вызовы. Пользователь определяется один раз для
+    всего пакета, соединение с базой общее, а middleware для подзапросов
+    не выполняются. JSON подзапросов вставляется в ответ без повторного разбора.
+    """
+
+    permission_classes = [AllowAny]
+    # Пакет только читает: запросы идут на реплики и не закрепляют клиента за основной базой.
+    replica_safe = True
+
+    @swagger_auto_schema(
+        operation_description='Выполнить пакет GET-запросов к /api/v1/',
+        request_body=BatchRequestSerializer,
+        tags=['batch'],
+    )
+    def post(self, request):
+        serializer = BatchRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        responses = [
+            {'id': item.get('id', str(index)), **self._dispatch(request, item)}
+            for index, item in enumerate(serializer.validated_data['requests'])
+        ]
+        return Response({'responses': responses})
+
+    def _dispatch(self, request, item):
+        parts = urlsplit(item['path'])
+        query = parts.query
+        if item.get('params'):
+            query = '&'.join(filter(None, [query, urlencode(item['params'])]))
+
+        try:
+            match = resolve(parts.path)
+        except Resolver404:
+            return _error(status.HTTP_404_NOT_FOUND, 'Маршрут не найден')
+        if getattr(match.func, 'cls', None) is type(self):
+            return _error(status.HTTP_400_BAD_REQUEST, 'Вложенные пакеты не поддерживаются')
+
+        sub_request = self._build_request(request, parts.path, query, item.get('headers', {}))
+        sub_request.resolver_match = match
+        # Middleware для подзапросов не выполняются, поэтому лимиты представления проверяются здесь.
+        limited = ratelimit.check(sub_request, match.func, match.kwargs)
+        if limited is not None:
+            return {'status': limited.status_code, 'headers': {'Retry-After': limited['Retry-After']}, 'body': orjson.Fragment(limited.content)}
+        try:
+            if iscoroutinefunction(match.func):
+                response = async_to_sync(match.func)(sub_request, *match.args, **match.kwargs)
+            else:
+                response = match.func(sub_request, *match.args, **match.kwargs)
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+        except Http404:
+            return _error(status.HTTP_404_NOT_FOUND, 'Не найдено')
+        except PermissionDenied:
+            return _error(status.HTTP_403_FORBIDDEN, 'Доступ запрещён')
+        except Exception as e:
+            logger.error(f'Ошибка подзапроса {item["path"]} в пакете: {e}', exc_info=True)
+            return _error(status.HTTP_500_INTERNAL_SERVER_ERROR, 'Внутренняя ошибка сервера')
+
+        result = {'status': response.status_code}
+        headers = {name: response[name] for name in RESPONSE_HEADERS if response.has_header(name)}
+        if headers:
+            result['headers'] = headers
+        if response.content:
+            if response.get('Content-Type', '').startswith('application/json'):
+                result['body'] = orjson.Fragment(response.content)
+            else:
+                result['body'] = response.content.decode(response.charset or 'utf-8', errors='replace')
+        return result
+
+    @staticmethod
+    def _build_request(request, path, query, headers):
+        """GET-запрос с заголовками и пользователем пакета; DRF не аутентифицирует его заново."""
+        outer = request._request
+        sub_request = HttpRequest()
+        sub_request.method = 'GET'
+        sub_request.path = sub_request.path_info = path
+        sub_request.META = {
+            key: value for key, value in outer.META.items()
+            if key not in ('CONTENT_LENGTH', 'CONTENT_TYPE', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+        }
+        sub_request.META.update({
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'HTTP_ACCEPT': 'application/json',
+        })
+        for name, value in headers.items():
+            sub_request.META[ITEM_HEADERS[name.lower()]] = value
+        sub_request.GET = QueryDict(query)
+        sub_request.COOKIES = outer.COOKIES
+        sub_request._body = b''
+        if hasattr(outer, 'session'):
+            sub_request.session = outer.session
+        sub_request.user = request.user
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+        return sub_request
+
+
+def _error(code, detail):
+    return {'status': code, 'body': {'detail': detail}}
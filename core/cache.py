@@ -0,0 +1,293 @@
+import hashlib
+import json
+import logging
+import time
+from functools import partial, wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models.signals import post_save, post_delete
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from core import invalidation
+from core.local_cache import LocalCache
+from core.metrics import LOCAL_CACHE
+from core.singleflight import single_flight
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'resp'
+# Тема шины для явного сброса пространств (invalidate), ключ - пространства через запятую.
+NAMESPACES_TOPIC = 'cache'
+
+# Модель -> пространства кэша, которые нужно сбросить при её изменении.
+# Ресторан отдаётся вложенным в предложения и меню, город - в рестораны, предложения и меню.
+INVALIDATION_MAP = {
+    'cities.City': ('cities', 'restaurants', 'offers', 'menu'),
+    'restaurant.Restaurant': ('restaurants', 'offers', 'menu'),
+    # Рейтинг ресторана меняется через UPDATE без сигналов Restaurant.
+    'restaurant.Review': ('restaurants',),
+    'products.Menu': ('menu',),
+    'products.MenuType': ('menu-types', 'menu'),
+    'advertisement.Banner': ('banners',),
+    'offers.Offer': ('offers',),
+    'offers.OfferItem': ('offers',),
+}
+
+
+def get_namespaces():
+    namespaces = set()
+    for values in INVALIDATION_MAP.values():
+        namespaces.update(values)
+    return sorted(namespaces)
+
+
+def _version_key(namespace):
+    return f'{KEY_PREFIX}:ver:{namespace}'
+
+
+def _stats_key(namespace, kind):
+    return f'{KEY_PREFIX}:stats:{namespace}:{kind}'
+
+
+def get_version(namespace):
+    return cache.get_or_set(_version_key(namespace), time.time_ns, None)
+
+
+def _bump_versions(namespaces):
+    for namespace in namespaces:
+        cache.set(_version_key(namespace), time.time_ns(), None)
+    logger.debug(f"Сброшен кэш ответов: {', '.join(namespaces)}")
+
+
+def invalidate(*namespaces):
+    """
+    Сбрасывает пространства кэша сменой версии: старые ключи просто перестают читаться.
+    Кэши в памяти всех воркеров сбрасываются через шину (core.invalidation).
+    """
+    _bump_versions(namespaces)
+    invalidation.publish(NAMESPACES_TOPIC, ','.join(namespaces))
+
+
+def invalidate_model(model, using=None):
+    """
+    Сброс, который для model сделали бы сигналы сохранения, - для bulk_create,
+    bulk_update и update(), которые сигналов не шлют: версии пространств из
+    INVALIDATION_MAP меняются после фиксации, шина рассылает сброс всех записей модели.
+    """
+    label = model._meta.label
+    using = using or router.db_for_write(model)
+    namespaces = INVALIDATION_MAP.get(label, ())
+    if namespaces:
+        transaction.on_commit(partial(_bump_versions, namespaces), using=using)
+    invalidation.publish(label, '*', using=using)
+
+
+def get_auth_class(request):
+    user = getattr(request, 'user', None)
+    if not user or not user.is_authenticated:
+        return 'anon'
+    if user.is_staff:
+        return 'staff'
+    return 'user'
+
+
+def get_language(request):
+    user = getattr(request, 'user', None)
+    if user and user.is_authenticated:
+        return getattr(user, 'language', 'ru') or 'ru'
+    return 'ru'
+
+
+def _digest(request):
+    raw = '|'.join([
+        request.get_host(),
+        request.path,
+        request.META.get('QUERY_STRING', ''),
+        get_language(request),
+        get_auth_class(request),
+    ])
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def _key(namespace, digest):
+    return f'{KEY_PREFIX}:{namespace}:{get_version(namespace)}:{digest}'
+
+
+def build_key(namespace, request):
+    return _key(namespace, _digest(request))
+
+
+def record(namespace, kind):
+    key = _stats_key(namespace, kind)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def get_stats():
+    keys = {}
+    for namespace in get_namespaces():
+        for kind in ('hit', 'miss'):
+            keys[_stats_key(namespace, kind)] = (namespace, kind)
+
+    values = cache.get_many(list(keys)) or {}
+    stats = {namespace: {'hit': 0, 'miss': 0} for namespace in get_namespaces()}
+    for key, (namespace, kind) in keys.items():
+        stats[namespace][kind] = values.get(key) or 0
+    return stats
+
+
+def reset_stats():
+    cache.delete_many([
+        _stats_key(namespace, kind)
+        for namespace in get_namespaces()
+        for kind in ('hit', 'miss')
+    ])
+
+
+def _etag(digest, data):
+    """Слабый ETag по ключу запроса и содержимому ответа: считается один раз при записи в кэш."""
+    body = json.dumps(data, cls=JSONEncoder, ensure_ascii=False)
+    return f'W/"{hashlib.md5(f"{digest}|{body}".encode("utf-8")).hexdigest()}"'
+
+
+def _payload(entry):
+    """(данные, ETag) записи кэша. Запись хранится как (свежа_до, данные, ETag)."""
+    if isinstance(entry, tuple) and len(entry) == 3:
+        return entry[1:]
+    return None
+
+
+def _fresh(entry):
+    """(данные, ETag) записи кэша, если она ещё свежая."""
+    if _payload(entry) is not None and entry[0] > time.time():
+        return entry[1:]
+    return None
+
+
+# Кэш ответов в памяти воркера перед Redis. Включается, только пока шина сброса
+# слушает PostgreSQL: без неё воркер не узнает об изменениях в других процессах.
+local = LocalCache(settings.L1_CACHE_MAX_ENTRIES)
+
+
+def _local_enabled():
+    return settings.L1_CACHE_TIMEOUT > 0 and invalidation.is_listening()
+
+
+def _evict_local(topic, key):
+    if topic == NAMESPACES_TOPIC:
+        namespaces = get_namespaces() if key == '*' else key.split(',')
+    else:
+        namespaces = INVALIDATION_MAP.get(topic, ())
+    local.evict(*namespaces)
+
+
+def _conditional(response, etag):
+    response['ETag'] = etag
+    # Без no-cache браузер может эвристически отдать ответ из кэша, не спросив сервер.
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def _cached_response(request, payload, state):
+    """
+    Ответ из записи кэша. Совпавший If-None-Match получает 304 по ETag записи:
+    условный запрос, как и обычное попадание, не обращается к БД.
+    """
+    data, etag = payload
+    response = get_conditional_response(request._request, etag=etag)
+    if response is None:
+        response = Response(data)
+    response['X-Cache'] = state
+    if response.status_code in (200, 304):
+        _conditional(response, etag)
+    return response
+
+
+def cache_response(namespace, timeout=None):
+    """
+    Кэширует сериализованные данные GET-ответа DRF-представления.
+    Ответ получает ETag записи, и по If-None-Match отдаётся 304 без тела.
+
+    Ключ строится по хосту, пути, строке запроса, языку и классу авторизации,
+    поэтому локализованные и персональные варианты ответа не смешиваются.
+    Истёкшая запись ещё RESPONSE_CACHE_STALE_SECONDS хранится как устаревшая.
+    Пересобирает её один запрос (core.singleflight), остальные в это время
+    получают устаревшие данные, а при пустом кэше ждут результат пересборки.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method != 'GET':
+                return view_method(self, request, *args, **kwargs)
+
+            digest = _digest(request)
+            use_local = _local_enabled()
+            if use_local:
+                payload = local.get(namespace, digest)
+                LOCAL_CACHE.labels(namespace, 'hit' if payload is not None else 'miss').inc()
+                if payload is not None:
+                    return _cached_response(request, payload, 'HIT')
+                generation = local.generation(namespace)
+
+            def remember(payload, fresh_until):
+                if use_local:
+                    ttl = min(settings.L1_CACHE_TIMEOUT, fresh_until - time.time())
+                    local.set(namespace, digest, payload, ttl, generation)
+
+            key = _key(namespace, digest)
+            entry = cache.get(key)
+            payload = _fresh(entry)
+            if payload is not None:
+                record(namespace, 'hit')
+                remember(payload, entry[0])
+                return _cached_response(request, payload, 'HIT')
+
+            record(namespace, 'miss')
+            stale = _payload(entry)
+            lifetime = timeout or settings.RESPONSE_CACHE_TIMEOUT
+            response = None
+
+            def rebuild():
+                nonlocal response
+                response = view_method(self, request, *args, **kwargs)
+                if isinstance(response, Response) and response.status_code == 200:
+                    entry = (time.time() + lifetime, response.data, _etag(digest, response.data))
+                    cache.set(key, entry, lifetime + settings.RESPONSE_CACHE_STALE_SECONDS)
+                    return entry[1:]
+                return None
+
+            payload, outcome = single_flight(key, lambda: _fresh(cache.get(key)), rebuild, namespace, stale=stale)
+            if payload is not None and outcome != 'stale':
+                remember(payload, time.time() + lifetime)
+            if response is None:
+                return _cached_response(request, payload, 'STALE' if outcome == 'stale' else 'HIT')
+            if payload is not None:
+                response['X-Cache'] = 'MISS'
+                _conditional(response, payload[1])
+            return response
+        return wrapper
+    return decorator
+
+
+def _invalidate_for_sender(sender, using=None, **kwargs):
+    # Версии меняются после фиксации: иначе промах кэша между сигналом и COMMIT
+    # сохранил бы старые данные под новой версией. Кэши в памяти сбрасываются
+    # сообщением шины о самой модели, оно тоже доставляется после COMMIT.
+    namespaces = INVALIDATION_MAP.get(sender._meta.label, ())
+    if namespaces:
+        transaction.on_commit(partial(_bump_versions, namespaces), using=using)
+
+
+def connect_signals():
+    for label in INVALIDATION_MAP:
+        post_save.connect(_invalidate_for_sender, sender=label, dispatch_uid=f'response_cache_save_{label}')
+        post_delete.connect(_invalidate_for_sender, sender=label, dispatch_uid=f'response_cache_delete_{label}')
+        invalidation.subscribe(label, _evict_local)
+    invalidation.watch(*INVALIDATION_MAP)
+    invalidation.subscribe(NAMESPACES_TOPIC, _evict_local)
@@ -0,0 +1,127 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from core.cache import get_language, get_version
+
+
+def _isoformat(stamp):
+    return stamp.isoformat() if stamp else '-'
+
+
+def conditional_get(view_method):
+    """
+    Условный GET для list/retrieve представлений с ConditionalGetMixin.
+
+    Валидаторы считаются до сериализации: для списка - одним запросом
+    MAX(updated_at) и COUNT(*) по отфильтрованному queryset, для объекта -
+    по его updated_at. Совпавший If-None-Match/If-Modified-Since сразу
+    получает 304 без тела. Представления с cache_response его не используют:
+    кэш сам отдаёт 304 по ETag записи, не обращаясь к БД.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_method(self, request, *args, **kwargs)
+
+        if (self.lookup_url_kwarg or self.lookup_field) in self.kwargs:
+            etag, last_modified = self.get_detail_validators()
+        else:
+            etag, last_modified = self.get_list_validators()
+
+        not_modified = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            if not_modified.status_code == 304:
+                not_modified['ETag'] = etag
+            return not_modified
+
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            # Без no-cache браузер может эвристически отдать ответ из кэша, не спросив сервер.
+            patch_cache_control(response, no_cache=True)
+        return response
+    return wrapper
+
+
+class ConditionalGetMixin:
+    """
+    Валидаторы ETag/Last-Modified по полю conditional_field для GenericAPIView.
+
+    ETag учитывает путь со строкой запроса, язык, пользователя и формат ответа,
+    поэтому разные представления одних данных не получают общий тег. Для списков
+    Last-Modified не выставляется: по нему нельзя заметить удаление записи.
+    conditional_counters - поля-счётчики, которые меняются без обновления updated_at.
+
+    Вложенные в ответ данные других моделей тоже входят в ETag: conditional_related -
+    внешние ключи на модели с conditional_field (их MAX считается тем же запросом),
+    conditional_namespaces - пространства core.cache, версия которых меняется
+    с моделями без updated_at. conditional_period - секунды, через которые ETag
+    меняется сам, если в ответе есть поля, зависящие от текущего времени.
+    """
+
+    conditional_field = 'updated_at'
+    conditional_counters = ()
+    conditional_related = ()
+    conditional_namespaces = ()
+    conditional_period = None
+
+    def get_conditional_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def get_object(self):
+        # get_detail_validators и retrieve загружают объект один раз.
+        if not hasattr(self, '_conditional_object'):
+            self._conditional_object = super().get_object()
+        return self._conditional_object
+
+    def get_list_validators(self):
+        related = {
+            f'related_{i}': f'{path}__{self.conditional_field}' for i, path in enumerate(self.conditional_related)
+        }
+        # Связи - внешние ключи, JOIN не размножает строки, и COUNT остаётся верным.
+        stats = self.get_conditional_queryset().aggregate(
+            last=Max(self.conditional_field),
+            count=Count('pk'),
+            **{alias: Max(field) for alias, field in related.items()},
+            **{name: Sum(name) for name in self.conditional_counters},
+        )
+        stamps = [stats[alias] for alias in ('last', *related)]
+        counters = [stats[name] for name in self.conditional_counters]
+        return self.make_etag('list', stats['count'], *map(_isoformat, stamps), *counters), None
+
+    def get_detail_validators(self):
+        obj = self.get_object()
+        stamps = [getattr(obj, self.conditional_field)]
+        for path in self.conditional_related:
+            related = obj
+            for name in path.split('__'):
+                related = getattr(related, name) if related is not None else None
+            stamps.append(getattr(related, self.conditional_field) if related is not None else None)
+        counters = [getattr(obj, name) for name in self.conditional_counters]
+        etag = self.make_etag('detail', obj.pk, *map(_isoformat, stamps), *counters)
+        # Изменение счётчиков, моделей без updated_at и полей от текущего времени по дате не заметить.
+        if counters or self.conditional_namespaces or self.conditional_period:
+            return etag, None
+        return etag, int(max(stamp for stamp in stamps if stamp is not None).timestamp())
+
+    def make_etag(self, *parts):
+        request = self.request
+        user = request.user.pk if request.user.is_authenticated else '-'
+        renderer = getattr(request, 'accepted_renderer', None)
+        raw = '|'.join(str(part) for part in (
+            request.get_full_path(),
+            get_language(request),
+            user,
+            renderer.format if renderer else '-',
+            *(get_version(namespace) for namespace in self.conditional_namespaces),
+            int(time.time() // self.conditional_period) if self.conditional_period else '-',
+            *parts,
+        ))
+        return f'W/"{hashlib.md5(raw.encode("utf-8")).hexdigest()}"'
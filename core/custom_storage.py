@@ -1,8 +1,23 @@
+import re
+
 from storages.backends.s3boto3 import S3Boto3Storage
 from django.conf import settings
 
+# QR-коды с именем по хешу ссылки (restaurant.qr.content_name) никогда не меняются.
+IMMUTABLE_NAME = re.compile(r'(^|/)qr_codes/[0-9a-f]{32}\.svg$')
+
+
 class MediaStorage(S3Boto3Storage):
     location = 'media'
     file_overwrite = False
     default_acl = 'public-read'
-    custom_domain = f'{settings.AWS_STORAGE_BUCKET_NAME}.{settings.AWS_S3_REGION_NAME}.digitaloceanspaces.com'
\ No newline at end of file
+    # SVG - текст и сжимается в несколько раз; растровые файлы уже сжаты.
+    gzip = True
+    gzip_content_types = ('image/svg+xml',)
+    custom_domain = f'{settings.AWS_STORAGE_BUCKET_NAME}.{settings.AWS_S3_REGION_NAME}.digitaloceanspaces.com'
+
+    def get_object_parameters(self, name):
+        params = super().get_object_parameters(name)
+        if IMMUTABLE_NAME.search(name):
+            params['CacheControl'] = 'public, max-age=31536000, immutable'
+        return params
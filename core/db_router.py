@@ -0,0 +1,151 @@
+import hashlib
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'epicure_primary'
+PIN_KEY_PREFIX = 'epicure:db-pin'
+
+
+class RoutingState:
+    __slots__ = ('eligible', 'replica_allowed', 'read_only', 'wrote')
+
+    def __init__(self, eligible, replica_allowed):
+        # eligible - реплики есть и клиент не закреплён за основной базой.
+        self.eligible = eligible
+        self.replica_allowed = replica_allowed
+        self.read_only = False
+        self.wrote = False
+
+
+# Состояние маршрутизации текущего запроса. Вне запроса (команды, celery) - None,
+# и все чтения идут на основную базу.
+_state = ContextVar('epicure_db_routing', default=None)
+
+
+def get_replicas():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica_')]
+
+
+class PrimaryReplicaRouter:
+    """
+    Чтения безопасных запросов уходят на случайную реплику, всё остальное -
+    на default. После первой записи запрос до конца читает с основной базы,
+    как и чтения внутри transaction.atomic().
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.replica_allowed or state.wrote:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        replicas = get_replicas()
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему через репликацию.
+        return db == DEFAULT_DB_ALIAS
+
+
+def _pin_key(request):
+    authorization = request.headers.get('Authorization')
+    if not authorization:
+        return None
+    return f'{PIN_KEY_PREFIX}:{hashlib.md5(authorization.encode("utf-8")).hexdigest()}'
+
+
+def is_pinned(request):
+    if PIN_COOKIE in request.COOKIES:
+        return True
+    key = _pin_key(request)
+    return key is not None and cache.get(key) is not None
+
+
+def pin(request, response):
+    """
+    Закрепляет клиента за основной базой на REPLICA_PIN_SECONDS, чтобы сразу
+    после записи он не прочитал отстающую реплику. Браузер получает cookie,
+    API-клиент с JWT - метку в общем кэше по заголовку Authorization.
+    """
+    seconds = settings.REPLICA_PIN_SECONDS
+    response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+    key = _pin_key(request)
+    if key is not None:
+        cache.set(key, 1, seconds)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Включает чтение с реплик для GET/HEAD/OPTIONS клиентов, которые недавно
+    ничего не записывали. Ставится сразу после MetricsMiddleware, чтобы
+    маршрутизация касалась и сессий, и авторизации.
+
+    Представление с атрибутом класса replica_safe = True (POST только для
+    чтения, например /api/v1/batch/) тоже читает с реплик и не закрепляет клиента.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        state = self._start(request)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self._finish(request, response, state)
+
+    async def __acall__(self, request):
+        state = self._start(request)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self._finish(request, response, state)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _state.get()
+        view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        if state is not None and getattr(view_class, 'replica_safe', False):
+            state.read_only = True
+            state.replica_allowed = state.eligible
+        return None
+
+    def _start(self, request):
+        eligible = bool(get_replicas()) and not is_pinned(request)
+        return RoutingState(eligible, eligible and request.method in SAFE_METHODS)
+
+    def _finish(self, request, response, state):
+        unsafe = request.method not in SAFE_METHODS and not state.read_only
+        if get_replicas() and (state.wrote or unsafe) and response.status_code < 400:
+            pin(request, response)
+        return response
@@ -0,0 +1,367 @@
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.encoding import force_str
+from rest_framework import serializers
+from rest_framework.fields import empty
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from core import tracing
+
+logger = logging.getLogger(__name__)
+
+# Поле не выводится: так DRF поступает с SkipField.
+SKIP = object()
+
+
+class FastPathUnsupported(Exception):
+    """В сериализаторе есть поле, которое нельзя собрать из values()."""
+
+
+class Computed:
+    """
+    Значение SerializerMethodField из колонок строки:
+    Computed(['name_ru', 'name_kz'], lambda ru, kz: kz or ru).
+    Колонки указываются относительно модели сериализатора.
+    """
+
+    def __init__(self, columns, func):
+        self.columns = list(columns)
+        self.func = func
+
+
+class Nested:
+    """SerializerMethodField, который выводит связь FK другим сериализатором."""
+
+    def __init__(self, source, serializer):
+        self.source = source
+        self.serializer = serializer
+
+
+def localized(language):
+    """(ru, kz) -> значение на языке пользователя, как в get_name сериализаторов."""
+    if language == 'kz':
+        return lambda ru, kz: kz or ru
+    return lambda ru, kz: ru
+
+
+def absolute_file_url(model_field, request):
+    """Имя файла -> request.build_absolute_uri(obj.<поле>.url), как в get_image_url."""
+    storage = model_field.storage
+
+    def build(name):
+        if not name or request is None:
+            return None
+        return request.build_absolute_uri(storage.url(name))
+    return build
+
+
+class FastPlan:
+    """
+    Скомпилированный сериализатор: колонки для values() и функция сборки
+    строки в dict. Связи один-ко-многим догружаются отдельным запросом на
+    страницу, как prefetch_related.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.columns = {}
+        self.relations = []
+        self.build = None
+
+    def column(self, path):
+        self.columns[path] = None
+        return path
+
+    def prepare(self, queryset):
+        """values() с колонками плана и полями сортировки (их читает KeysetPagination)."""
+        meta = queryset.model._meta
+        columns = list(self.columns)
+        for name in [*(queryset.query.order_by or meta.ordering), meta.pk.name]:
+            if not isinstance(name, str):
+                continue
+            name = name.lstrip('-')
+            name = meta.pk.name if name == 'pk' else name
+            if name in columns or '__' in name:
+                continue
+            try:
+                meta.get_field(name)
+            except FieldDoesNotExist:
+                if name not in queryset.query.annotations:
+                    continue
+            columns.append(name)
+        return queryset.select_related(None).prefetch_related(None).defer(None).values(*columns)
+
+    def run(self, rows):
+        rows = list(rows)
+        for relation in self.relations:
+            relation.load(rows)
+        build = self.build
+        with tracing.span(f'serialize fast {self.model.__name__}', **{'serializer.rows': len(rows)}):
+            return [build(row) for row in rows]
+
+
+class ToManyRelation:
+    def __init__(self, parent_column, related_model, fk_name, plan):
+        self.parent_column = parent_column
+        self.related_model = related_model
+        self.fk_name = fk_name
+        self.plan = plan
+        self.groups = {}
+
+    def load(self, rows):
+        keys = {row[self.parent_column] for row in rows if row[self.parent_column] is not None}
+        self.groups = defaultdict(list)
+        if not keys:
+            return
+        # Менеджер по умолчанию даёт тот же порядок, что и связанный менеджер в DRF.
+        queryset = self.related_model._default_manager.filter(**{f'{self.fk_name}__in': keys})
+        columns = list(self.plan.columns)
+        if self.fk_name not in self.plan.columns:
+            columns.append(self.fk_name)
+        children = list(queryset.values(*columns))
+        for item, row in zip(self.plan.run(children), children):
+            self.groups[row[self.fk_name]].append(item)
+
+    def access(self, row):
+        return self.groups.get(row[self.parent_column], [])
+
+
+def _missing(field):
+    """Значение поля, если промежуточная связь пуста: повторяет Field.get_attribute."""
+    if field.default is not empty:
+        return lambda row: field.get_default()
+    if field.allow_null:
+        return lambda row: None
+    if not field.required:
+        return lambda row: SKIP
+
+    def fail(row):
+        raise AttributeError(f'Пустая связь в source поля {field.field_name}')
+    return fail
+
+
+def _walk(model, prefix, parts):
+    """
+    Проходит по прямым FK пути source. Возвращает модель и путь последнего
+    атрибута, а также колонки nullable-связей, пустое значение которых обрывает путь.
+    """
+    guards = []
+    path = prefix
+    for attr in parts:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            raise FastPathUnsupported(f'{model.__name__}.{attr} не является полем модели')
+        if not (field.is_relation and field.concrete and (field.many_to_one or field.one_to_one)):
+            raise FastPathUnsupported(f'{model.__name__}.{attr} не является прямой связью')
+        if field.null:
+            guards.append(f'{path}{attr}')
+        path = f'{path}{attr}__'
+        model = field.related_model
+    return model, path, guards
+
+
+def _guarded(accessor, guards, missing):
+    if not guards:
+        return accessor
+
+    def access(row):
+        for guard in guards:
+            if row[guard] is None:
+                return missing(row)
+        return accessor(row)
+    return access
+
+
+def _compile_relation(serializer, parts, field, plan, model, prefix):
+    """Вложенный сериализатор по цепочке FK: пустая последняя связь даёт None."""
+    parent_model, parent_path, guards = _walk(model, prefix, parts[:-1])
+    attr = parts[-1]
+    related_model, nested_prefix, last_guards = _walk(parent_model, parent_path, [attr])
+    last = plan.column(last_guards[0]) if last_guards else None
+    for guard in guards:
+        plan.column(guard)
+
+    build = _compile(serializer, plan, related_model, nested_prefix)
+    if last is None:
+        accessor = build
+    else:
+        def accessor(row):
+            return None if row[last] is None else build(row)
+    return _guarded(accessor, guards, _missing(field))
+
+
+def _compile_many(field, plan, model, prefix):
+    if len(field.source_attrs) != 1:
+        raise FastPathUnsupported(f'{field.field_name}: вложенный source у списка')
+    relation = next((
+        related for related in model._meta.related_objects
+        if related.get_accessor_name() == field.source_attrs[0]
+    ), None)
+    if relation is None or not relation.one_to_many or not relation.field.target_field.primary_key:
+        raise FastPathUnsupported(f'{model.__name__}.{field.source} не является обратным FK')
+
+    child_plan = FastPlan(relation.related_model)
+    child_plan.build = _compile(field.child, child_plan, relation.related_model, '')
+    parent_column = plan.column(f'{prefix}{model._meta.pk.name}')
+    to_many = ToManyRelation(parent_column, relation.related_model, relation.field.name, child_plan)
+    plan.relations.append(to_many)
+    return to_many.access
+
+
+def _compile_value(field, plan, model, prefix):
+    parts = field.source_attrs
+    parent_model, parent_path, guards = _walk(model, prefix, parts[:-1])
+    for guard in guards:
+        plan.column(guard)
+    attr = parts[-1]
+
+    display = None
+    try:
+        model_field = parent_model._meta.get_field(attr)
+    except FieldDoesNotExist:
+        # get_status_display: значение поля status, переведённое по choices.
+        if not (attr.startswith('get_') and attr.endswith('_display')):
+            raise FastPathUnsupported(f'{parent_model.__name__}.{attr} не является полем модели')
+        model_field = parent_model._meta.get_field(attr[4:-8])
+        choices = dict(model_field.flatchoices)
+        display = lambda value: force_str(choices.get(value, value), strings_only=True)
+
+    if model_field.is_relation:
+        if not (isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None):
+            raise FastPathUnsupported(f'{field.field_name}: {type(field).__name__} для связи')
+        if not (model_field.concrete and (model_field.many_to_one or model_field.one_to_one)):
+            raise FastPathUnsupported(f'{field.field_name}: первичный ключ не прямой связи')
+    elif isinstance(field, serializers.RelatedField):
+        raise FastPathUnsupported(f'{field.field_name}: {type(field).__name__}')
+
+    column = plan.column(f'{parent_path}{model_field.name}')
+
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        accessor = lambda row: row[column]
+    elif isinstance(field, serializers.FileField):
+        storage = model_field.storage
+        use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+        request = field.context.get('request')
+
+        def accessor(row):
+            name = row[column]
+            if not name:
+                return None
+            if not use_url:
+                return name
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+    else:
+        to_representation = field.to_representation
+        if display is None:
+            def accessor(row):
+                value = row[column]
+                return None if value is None else to_representation(value)
+        else:
+            def accessor(row):
+                value = display(row[column])
+                return None if value is None else to_representation(value)
+
+    return _guarded(accessor, guards, _missing(field))
+
+
+def _compile_field(serializer, name, field, plan, model, prefix):
+    hook = getattr(serializer, f'fast_{name}', None)
+    if hook is not None:
+        spec = hook()
+        if isinstance(spec, Nested):
+            return _compile_relation(spec.serializer, spec.source.split('.'), field, plan, model, prefix)
+        columns = [plan.column(f"{prefix}{column.replace('.', '__')}") for column in spec.columns]
+        func = spec.func
+        if len(columns) == 1:
+            only = columns[0]
+            return lambda row: func(row[only])
+        return lambda row: func(*[row[column] for column in columns])
+
+    if isinstance(field, serializers.SerializerMethodField):
+        raise FastPathUnsupported(f'{type(serializer).__name__}.{name}: SerializerMethodField без fast_{name}()')
+    if field.source == '*' or isinstance(field, (serializers.HiddenField, serializers.ManyRelatedField)):
+        raise FastPathUnsupported(f'{type(serializer).__name__}.{name}: {type(field).__name__}')
+    if isinstance(field, serializers.ListSerializer):
+        return _compile_many(field, plan, model, prefix)
+    if isinstance(field, serializers.BaseSerializer):
+        return _compile_relation(field, field.source_attrs, field, plan, model, prefix)
+    return _compile_value(field, plan, model, prefix)
+
+
+def _compile(serializer, plan, model, prefix):
+    if not isinstance(serializer, serializers.ModelSerializer):
+        raise FastPathUnsupported(f'{type(serializer).__name__} не является ModelSerializer')
+
+    accessors = [
+        (name, _compile_field(serializer, name, field, plan, model, prefix))
+        for name, field in serializer.fields.items()
+        if not field.write_only
+    ]
+
+    def build(row):
+        result = {}
+        for name, accessor in accessors:
+            value = accessor(row)
+            if value is not SKIP:
+                result[name] = value
+        return result
+    return build
+
+
+def compile_plan(serializer):
+    """
+    Компилирует ModelSerializer (с уже применёнными ?fields=/?expand=) в FastPlan.
+
+    Поддерживаются поля модели, первичные ключи прямых связей, get_<поле>_display,
+    вложенные сериализаторы по FK и списки по обратному FK. SerializerMethodField
+    описывается методом сериализатора fast_<имя>(), который возвращает Computed
+    или Nested. Остальное - FastPathUnsupported.
+    """
+    model = serializer.Meta.model
+    plan = FastPlan(model)
+    plan.build = _compile(serializer, plan, model, '')
+    return plan
+
+
+class FastListMixin:
+    """
+    Миксин для ModelViewSet: list собирает ответ из values() скомпилированным
+    планом сериализатора, минуя создание моделей и полей DRF на каждую строку.
+
+    Вывод совпадает с сериализатором побайтно (проверка - core/tests/test_fast_serializers.py).
+    Если сериализатор не компилируется или FAST_SERIALIZERS выключен, list
+    работает через сериализатор как обычно.
+    """
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_fast_plan()
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = plan.prepare(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.run(page))
+        return Response(plan.run(queryset))
+
+    def fast_data(self, queryset):
+        """Данные списка для действий, которые сериализуют queryset сами."""
+        plan = self.get_fast_plan()
+        if plan is None:
+            return self.get_serializer(queryset, many=True).data
+        return plan.run(plan.prepare(queryset))
+
+    def get_fast_plan(self):
+        if not settings.FAST_SERIALIZERS:
+            return None
+        try:
+            return compile_plan(self.get_serializer())
+        except FastPathUnsupported as exc:
+            logger.debug(f'{type(self).__name__}: быстрый путь недоступен ({exc})')
+            return None
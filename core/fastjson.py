@@ -0,0 +1,49 @@
+import datetime
+import decimal
+
+import orjson
+from django.db.models.query import QuerySet
+from django.http import HttpResponse
+from django.utils.functional import Promise
+
+# date, time, datetime, UUID и подклассы dict/list (ReturnDict, ReturnList) orjson кодирует сам;
+# UTC, как и в DRF, выводится суффиксом Z.
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+def _default(obj):
+    """Типы, которые orjson не знает; приведение совпадает с rest_framework.utils.encoders.JSONEncoder."""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, QuerySet):
+        return tuple(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__iter__'):
+        return tuple(obj)
+    raise TypeError(f'Объект типа {type(obj).__name__} не сериализуется в JSON')
+
+
+def dumps(data, indent=False):
+    options = OPTIONS | orjson.OPT_INDENT_2 if indent else OPTIONS
+    return orjson.dumps(data, default=_default, option=options)
+
+
+def loads(data):
+    return orjson.loads(data)
+
+
+class FastJsonResponse(HttpResponse):
+    """Замена JsonResponse на orjson: FastJsonResponse({'items': data}, status=404)."""
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError('Для сериализации не-dict объектов передайте safe=False')
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
@@ -0,0 +1,156 @@
+import logging
+import os
+import select
+import threading
+import time
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models.signals import post_delete, post_save
+
+from core.metrics import INVALIDATION_MESSAGES
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'epicure_invalidation'
+# Модели, изменения которых рассылаются всем воркерам.
+BUS_MODELS = (
+    'cities.City',
+    'restaurant.Restaurant',
+    'restaurant.Table',
+    'products.Menu',
+    'advertisement.Banner',
+    'offers.Offer',
+)
+RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 30
+
+# Тема -> обработчики handler(topic, key). Тема модели - её метка, ключ - pk.
+_handlers = defaultdict(list)
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def subscribe(topic, handler):
+    if handler not in _handlers[topic]:
+        _handlers[topic].append(handler)
+
+
+def _dispatch(topic, key, source):
+    INVALIDATION_MESSAGES.labels(source).inc()
+    for handler in _handlers.get(topic, ()):
+        try:
+            handler(topic, key)
+        except Exception as e:
+            logger.error(f'Ошибка обработчика сброса {topic}:{key}: {e}', exc_info=True)
+
+
+def publish(topic, key='', using='default'):
+    """
+    Рассылает сообщение о сбросе после коммита транзакции: обработчики этого
+    процесса - через on_commit, остальные воркеры - через NOTIFY. Иначе запрос
+    в этом же воркере успел бы заново заполнить кэш строкой до коммита.
+    При откате сообщение не доставляется. Вне PostgreSQL оно остаётся локальным.
+    """
+    transaction.on_commit(partial(_dispatch, topic, key, 'local'), using=using)
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, f'{topic}:{key}'])
+    except Exception as e:
+        logger.warning(f'Не удалось отправить сброс {topic}:{key}: {e}')
+
+
+def _on_change(sender, instance, **kwargs):
+    publish(sender._meta.label, instance.pk, using=router.db_for_write(sender))
+
+
+def watch(*labels):
+    """Публикует сброс при сохранении и удалении моделей."""
+    for label in labels:
+        post_save.connect(_on_change, sender=label, dispatch_uid=f'invalidation_bus_save_{label}')
+        post_delete.connect(_on_change, sender=label, dispatch_uid=f'invalidation_bus_delete_{label}')
+
+
+def connect_signals():
+    watch(*BUS_MODELS)
+
+
+class Listener(threading.Thread):
+    """
+    Поток воркера с отдельным соединением LISTEN. Пока соединения нет,
+    сообщения могут теряться, поэтому при каждом (пере)подключении
+    подписчики получают сообщение '*' и сбрасывают всё.
+    """
+
+    def __init__(self, using='default'):
+        super().__init__(name='invalidation-listener', daemon=True)
+        self.using = using
+        self.pid = os.getpid()
+        self.connected = threading.Event()
+
+    def run(self):
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                self._listen()
+            except Exception as e:
+                logger.warning(f'Соединение шины сброса кэша потеряно: {e}')
+            if self.connected.is_set():
+                delay = RECONNECT_DELAY
+            self.connected.clear()
+            _dispatch_all('reconnect')
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def _listen(self):
+        wrapper = connections[self.using]
+        params = wrapper.get_connection_params()
+        params.pop('cursor_factory', None)
+        # Уведомления читаются через poll()/notifies из psycopg2.
+        connection = wrapper.Database.connect(**params)
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN {CHANNEL}')
+            _dispatch_all('reconnect')
+            self.connected.set()
+            while True:
+                if select.select([connection], [], [], settings.INVALIDATION_POLL_SECONDS) == ([], [], []):
+                    # Проверка, что соединение живо: иначе обрыв заметим только по таймауту TCP.
+                    with connection.cursor() as cursor:
+                        cursor.execute('SELECT 1')
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    topic, _, key = connection.notifies.pop(0).payload.partition(':')
+                    _dispatch(topic, key, 'notify')
+        finally:
+            connection.close()
+
+
+def _dispatch_all(source):
+    for topic in list(_handlers):
+        _dispatch(topic, '*', source)
+
+
+def is_listening(using='default'):
+    """
+    Запускает слушателя в текущем процессе (после fork - заново) и
+    сообщает, подключён ли он. Без PostgreSQL всегда False.
+    """
+    global _listener
+    if connections[using].vendor != 'postgresql':
+        return False
+    listener = _listener
+    if listener is None or listener.pid != os.getpid():
+        with _listener_lock:
+            if _listener is None or _listener.pid != os.getpid():
+                _listener = Listener(using)
+                _listener.start()
+            listener = _listener
+    return listener.connected.is_set()
@@ -0,0 +1,52 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LocalCache:
+    """
+    Кэш в памяти воркера по пространствам имён: LRU на L1_CACHE_MAX_ENTRIES
+    записей в каждом пространстве и TTL у каждой записи.
+
+    Поколение пространства растёт при каждом сбросе. Значение, прочитанное
+    до сброса, сохраняется, только если поколение с тех пор не изменилось:
+    иначе запрос, начатый до сброса, вернул бы в кэш старые данные.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._generations = {}
+
+    def generation(self, namespace):
+        return self._generations.get(namespace, 0)
+
+    def get(self, namespace, key):
+        with self._lock:
+            entries = self._entries.get(namespace)
+            item = entries.get(key) if entries else None
+            if item is None:
+                return None
+            expires, value = item
+            if expires <= time.monotonic():
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return value
+
+    def set(self, namespace, key, value, timeout, generation):
+        with self._lock:
+            if self._generations.get(namespace, 0) != generation:
+                return
+            entries = self._entries.setdefault(namespace, OrderedDict())
+            entries[key] = (time.monotonic() + timeout, value)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def evict(self, *namespaces):
+        with self._lock:
+            for namespace in namespaces:
+                self._entries.pop(namespace, None)
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
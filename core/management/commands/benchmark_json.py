@@ -0,0 +1,126 @@
+import io
+import json
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import RequestFactory
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from cities.models import City
+from core import fastjson
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+from products.models import Menu, MenuType
+from products.serializers import MenuSerializer
+from restaurant.models import Restaurant
+
+
+class Command(BaseCommand):
+    help = 'Сравнение стандартного и orjson-кодировщика на меню из N блюд'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=1000, help='Количество блюд в ответе')
+        parser.add_argument('--repeat', type=int, default=50, help='Количество повторов каждого замера')
+
+    def handle(self, *args, **options):
+        if options['items'] < 1 or options['repeat'] < 1:
+            raise CommandError('--items и --repeat должны быть положительными')
+
+        api_payload, table_payload = self._build_payloads(options['items'])
+        rendered = JSONRenderer().render(api_payload)
+
+        cases = [
+            (
+                'DRF API: MenuSerializer',
+                lambda: JSONRenderer().render(api_payload),
+                lambda: ORJSONRenderer().render(api_payload),
+            ),
+            (
+                'table_service: menu_items_api',
+                lambda: json.dumps(table_payload, cls=DjangoJSONEncoder).encode(),
+                lambda: fastjson.dumps(table_payload),
+            ),
+            (
+                'Разбор тела запроса',
+                lambda: JSONParser().parse(io.BytesIO(rendered)),
+                lambda: ORJSONParser().parse(io.BytesIO(rendered)),
+            ),
+        ]
+
+        self.stdout.write(f"{options['items']} блюд, {len(rendered)} байт, лучший из {options['repeat']} замеров")
+        self.stdout.write(f"{'Сценарий':<32}{'json, мс':>12}{'orjson, мс':>12}{'ускорение':>12}")
+        for title, baseline, fast in cases:
+            if json.loads(self._as_bytes(baseline())) != json.loads(self._as_bytes(fast())):
+                raise CommandError(f'{title}: результаты кодировщиков различаются')
+
+            baseline_ms = self._measure(baseline, options['repeat'])
+            fast_ms = self._measure(fast, options['repeat'])
+            self.stdout.write(f'{title:<32}{baseline_ms:>12.2f}{fast_ms:>12.2f}{baseline_ms / fast_ms:>11.1f}x')
+
+    def _build_payloads(self, count):
+        """Несохранённые объекты: замер не зависит от базы и данных окружения."""
+        city = City(id=1, name='Алматы')
+        restaurant = Restaurant(id=1, name='Эпикур', city=city)
+        menu_type = MenuType(id=1, name_ru='Горячие блюда', name_kz='Ыстық тағамдар')
+        menus = [
+            Menu(
+                id=i,
+                restaurant=restaurant,
+                menu_type=menu_type,
+                name_ru=f'Блюдо {i}',
+                name_kz=f'Тағам {i}',
+                description_ru='Описание блюда с подробным составом и способом подачи',
+                description_kz='Тағамның құрамы мен берілу тәсілінің толық сипаттамасы',
+                calories=100 + i % 700,
+                proteins=Decimal('12.50'),
+                fats=Decimal('7.25'),
+                carbohydrates=Decimal('30.00'),
+                price=Decimal(1000 + i),
+                is_available=True,
+                is_popular=i % 10 == 0,
+            )
+            for i in range(1, count + 1)
+        ]
+
+        request = Request(RequestFactory().get('/api/v1/products/menu-items/'))
+        api_payload = {
+            'count': count,
+            'next': None,
+            'previous': None,
+            'results': MenuSerializer(menus, many=True, context={'request': request}).data,
+        }
+        table_payload = {'items': [
+            {
+                'id': item.id,
+                'name': item.name_ru,
+                'name_kz': item.name_kz,
+                'description': item.description_ru,
+                'price': float(item.price),
+                'image_url': None,
+                'menu_type_id': item.menu_type_id,
+                'calories': item.calories,
+                'proteins': float(item.proteins),
+                'fats': float(item.fats),
+                'carbohydrates': float(item.carbohydrates),
+                'is_healthy': item.is_healthy(),
+            }
+            for item in menus
+        ]}
+        return api_payload, table_payload
+
+    @staticmethod
+    def _as_bytes(value):
+        return value if isinstance(value, bytes) else json.dumps(value).encode()
+
+    @staticmethod
+    def _measure(func, repeat):
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - started)
+        return best * 1000
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core import cache
+
+
+class Command(BaseCommand):
+    help = 'Статистика попаданий в кэш ответов по пространствам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Обнулить счётчики после вывода')
+
+    def handle(self, *args, **options):
+        stats = cache.get_stats()
+
+        self.stdout.write(f"{'Пространство':<16}{'Попадания':>12}{'Промахи':>12}{'Hit ratio':>12}")
+        for namespace, values in stats.items():
+            total = values['hit'] + values['miss']
+            ratio = values['hit'] / total * 100 if total else 0
+            self.stdout.write(f"{namespace:<16}{values['hit']:>12}{values['miss']:>12}{ratio:>11.1f}%")
+
+        if options['reset']:
+            cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS('Счётчики обнулены'))
@@ -0,0 +1,72 @@
+import os
+import re
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Что выполняет воркер при старте: настройка приложений и загрузка URLconf.
+BOOT_SCRIPT = (
+    'import django; django.setup(); '
+    'from django.urls import get_resolver; get_resolver().url_patterns'
+)
+
+# SDK, которые должны загружаться при первом использовании, а не при старте.
+DEFERRED_MODULES = ('stripe', 'google.generativeai', 'qrcode', 'PIL', 'boto3', 'botocore')
+
+LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+
+class Command(BaseCommand):
+    help = 'Проверка времени импорта при старте воркера (python -X importtime)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget-ms', type=float, default=1200, help='Допустимое время импорта, мс')
+        parser.add_argument('--repeat', type=int, default=3, help='Количество замеров, берётся лучший')
+        parser.add_argument('--top', type=int, default=15, help='Сколько самых медленных модулей вывести')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat должен быть положительным')
+
+        runs = [self._measure() for _ in range(options['repeat'])]
+        total_us, modules = min(runs, key=lambda run: run[0])
+        total_ms = total_us / 1000
+
+        self.stdout.write(f"Импорт при старте: {total_ms:.0f} мс (лучший из {options['repeat']}), бюджет {options['budget_ms']:.0f} мс")
+        self.stdout.write(f"{'Модуль':<60}{'свой, мс':>12}{'всего, мс':>12}")
+        for name, self_us, cumulative_us in sorted(modules.values(), key=lambda m: m[2], reverse=True)[:options['top']]:
+            self.stdout.write(f'{name:<60}{self_us / 1000:>12.1f}{cumulative_us / 1000:>12.1f}')
+
+        problems = []
+        eager = [name for name in DEFERRED_MODULES if name in modules]
+        if eager:
+            problems.append(f"загружены при старте: {', '.join(eager)}")
+        if total_ms > options['budget_ms']:
+            problems.append(f"{total_ms:.0f} мс > {options['budget_ms']:.0f} мс")
+        if problems:
+            raise CommandError(f"Превышен бюджет импорта: {'; '.join(problems)}")
+        self.stdout.write(self.style.SUCCESS('Импорт укладывается в бюджет'))
+
+    def _measure(self):
+        """Отдельный процесс: в текущем всё уже импортировано."""
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+            capture_output=True,
+            text=True,
+            env=os.environ.copy(),
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Не удалось загрузить приложение:\n{result.stderr[-2000:]}')
+
+        total, modules = 0, {}
+        for line in result.stderr.splitlines():
+            match = LINE_RE.match(line)
+            if not match:
+                continue
+            self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), match[3], match[4]
+            modules[name] = (name, self_us, cumulative_us)
+            # Вложенные импорты уже учтены во времени модуля верхнего уровня.
+            if not indent:
+                total += cumulative_us
+        return total, modules
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import cache
+from core.synthetic import PRESETS, SyntheticDataBuilder, scale_sizes
+
+
+class Command(BaseCommand):
+    help = 'Генерация синтетических данных производственного объёма для профилирования'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--preset', choices=sorted(PRESETS), default='small', help='Набор объёмов данных')
+        parser.add_argument('--scale', type=float, default=1.0, help='Множитель абсолютных объёмов пресета')
+        parser.add_argument('--seed', type=int, default=42, help='Зерно генератора; один seed даёт одинаковые данные')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Размер порции bulk_create')
+        parser.add_argument(
+            '--set', action='append', default=[], metavar='KEY=VALUE',
+            help='Переопределить отдельный объём, например --set reservations=500000',
+        )
+
+    def handle(self, *args, **options):
+        sizes = scale_sizes(PRESETS[options['preset']], options['scale'])
+        for override in options['set']:
+            key, _, value = override.partition('=')
+            if key not in sizes or not value.isdigit():
+                raise CommandError(f'Некорректное переопределение: {override}. Доступные ключи: {", ".join(sizes)}')
+            sizes[key] = int(value)
+
+        self.stdout.write(f"Пресет {options['preset']}, seed {options['seed']}:")
+        for key, value in sizes.items():
+            self.stdout.write(f'  {key:<24}{value:>12}')
+
+        self._last_report = 0
+        started = time.monotonic()
+        # Одна транзакция: прерванная генерация не оставляет половину набора.
+        with transaction.atomic():
+            builder = SyntheticDataBuilder(
+                sizes=sizes,
+                seed=options['seed'],
+                chunk_size=options['chunk_size'],
+                progress=self._progress,
+            ).build()
+        elapsed = time.monotonic() - started
+
+        # bulk_create не отправляет сигналы, поэтому кэш ответов сбрасывается вручную.
+        cache.invalidate(*cache.get_namespaces())
+
+        total = sum(builder.counts.values())
+        self.stdout.write('')
+        for label, count in builder.counts.items():
+            self.stdout.write(f'{label:<24}{count:>12}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано {total} строк за {elapsed:.1f} с ({total / max(elapsed, 0.001):.0f} строк/с)'
+        ))
+
+    def _progress(self, label, total, elapsed):
+        now = time.monotonic()
+        if now - self._last_report < 2:
+            return
+        self._last_report = now
+        self.stdout.write(f'  {label}: {total} строк, {total / max(elapsed, 0.001):.0f} строк/с')
@@ -0,0 +1,25 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.openapi import write_artifact
+
+
+class Command(BaseCommand):
+    help = 'Генерация артефакта схемы OpenAPI (JSON, YAML, gzip, brotli) для /api/docs/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Каталог артефакта, по умолчанию OPENAPI_SCHEMA_DIR')
+        parser.add_argument('--keep', type=int, default=3, help='Сколько версий хранить на диске')
+
+    def handle(self, *args, **options):
+        directory = options['output'] or settings.OPENAPI_SCHEMA_DIR
+        os.makedirs(directory, exist_ok=True)
+
+        manifest = write_artifact(directory, keep=options['keep'])
+        target = os.path.join(directory, manifest['version'])
+        for name in manifest['files']:
+            size = os.path.getsize(os.path.join(target, name))
+            self.stdout.write(f'{name:<20}{size:>10} байт')
+        self.stdout.write(self.style.SUCCESS(f"Схема OpenAPI версии {manifest['version']} записана в {directory}"))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from core import cache
+from restaurant.models import Restaurant
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт рейтингов, гистограммы оценок и числа отзывов ресторанов по самим отзывам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Ресторанов в одной транзакции')
+        parser.add_argument(
+            '--missing', action='store_true',
+            help='Только рестораны с отзывами без суммы оценок или взвешенного рейтинга (после добавления полей)',
+        )
+
+    def handle(self, *args, **options):
+        restaurants = Restaurant.objects.order_by('pk')
+        if options['missing']:
+            restaurants = restaurants.filter(Q(rating_sum=0) | Q(score=0), reviews_count__gt=0)
+
+        updated = 0
+        last_pk = 0
+        # Порции по первичному ключу: короткие транзакции не держат блокировки на всю таблицу.
+        while True:
+            ids = list(restaurants.filter(pk__gt=last_pk).values_list('pk', flat=True)[:options['chunk_size']])
+            if not ids:
+                break
+            with transaction.atomic():
+                updated += Restaurant.recompute_ratings(ids)
+            last_pk = ids[-1]
+
+        if updated:
+            cache.invalidate(*cache.INVALIDATION_MAP['restaurant.Review'])
+        self.stdout.write(self.style.SUCCESS(f'Пересчитано ресторанов: {updated}'))
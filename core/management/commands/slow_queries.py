@@ -0,0 +1,57 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from core import slow_queries
+
+SORT_KEYS = {
+    'total': lambda entry: entry['total_ms'],
+    'count': lambda entry: entry['count'],
+    'max': lambda entry: entry['max_ms'],
+}
+
+
+class Command(BaseCommand):
+    help = 'Самые тяжёлые медленные SQL-запросы: источники, стек и планы'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10, help='Сколько запросов показать')
+        parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='total',
+                            help='Сортировка: суммарное время, число или максимум')
+        parser.add_argument('--plans', action='store_true', help='Показать сохранённые планы EXPLAIN')
+        parser.add_argument('--reset', action='store_true', help='Удалить собранные данные после вывода')
+
+    def handle(self, *args, **options):
+        report = sorted(slow_queries.get_report(), key=SORT_KEYS[options['sort']], reverse=True)
+        if not report:
+            self.stdout.write('Медленных запросов не записано')
+
+        for position, entry in enumerate(report[:options['top']], 1):
+            average = entry['total_ms'] / entry['count']
+            last_seen = datetime.fromtimestamp(entry['last_seen']).strftime('%Y-%m-%d %H:%M:%S')
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{position}. [{entry['key']}] {entry['count']} раз, всего {entry['total_ms']:.0f} мс, "
+                f"в среднем {average:.1f} мс, максимум {entry['max_ms']:.1f} мс ({entry.get('database', '-')})"
+            ))
+            self.stdout.write(f"   {entry['sql']}")
+            self.stdout.write(f'   Последний раз: {last_seen}')
+            self.stdout.write('   Источники:')
+            for origin, count in sorted(entry['origins'].items(), key=lambda item: item[1], reverse=True):
+                self.stdout.write(f'     {count:>6}  {origin}')
+            if entry.get('stack'):
+                self.stdout.write('   Стек самого медленного:')
+                for frame in entry['stack']:
+                    self.stdout.write(f'     {frame}')
+            if options['plans']:
+                plan = entry['plan']
+                if plan is None:
+                    self.stdout.write('   План ещё не снят')
+                else:
+                    self.stdout.write(f"   План ({plan['ms']:.1f} мс, {plan['origin']}):")
+                    for line in plan['plan'].splitlines():
+                        self.stdout.write(f'     {line}')
+            self.stdout.write('')
+
+        if options['reset']:
+            slow_queries.reset()
+            self.stdout.write(self.style.SUCCESS('Данные о медленных запросах удалены'))
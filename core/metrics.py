@@ -0,0 +1,239 @@
+import hmac
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+
+from core import tracing
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+# Без METRICS_TOKEN /metrics отдаётся только этим адресам (curl изнутри контейнера).
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+
+REQUEST_LATENCY = Histogram(
+    'epicure_http_request_duration_seconds',
+    'Время обработки запроса',
+    ['view', 'method'],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter(
+    'epicure_http_requests_total',
+    'Количество запросов по статусам ответа',
+    ['view', 'method', 'status'],
+)
+RESPONSE_SIZE = Histogram(
+    'epicure_http_response_size_bytes',
+    'Размер тела ответа',
+    ['view'],
+    buckets=SIZE_BUCKETS,
+)
+SQL_QUERIES = Histogram(
+    'epicure_db_queries_per_request',
+    'Количество SQL-запросов за один HTTP-запрос',
+    ['view'],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+SQL_DURATION = Histogram(
+    'epicure_db_duration_seconds_per_request',
+    'Суммарное время SQL-запросов за один HTTP-запрос',
+    ['view'],
+    buckets=LATENCY_BUCKETS,
+)
+EXTERNAL_LATENCY = Histogram(
+    'epicure_external_call_duration_seconds',
+    'Время обращений к внешним сервисам',
+    ['service', 'operation', 'outcome'],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_COALESCED = Counter(
+    'epicure_cache_coalesced_total',
+    'Запросы, которые не пересобирали кэш сами: дождались чужой пересборки или получили устаревшее значение',
+    ['namespace', 'outcome'],
+)
+CACHE_COALESCED_WAIT = Histogram(
+    'epicure_cache_coalesced_wait_seconds',
+    'Время ожидания чужой пересборки кэша',
+    ['namespace'],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_REBUILDS = Counter(
+    'epicure_cache_rebuilds_total',
+    'Пересборки кэша по способу блокировки (redis или process при недоступном Redis)',
+    ['namespace', 'lock'],
+)
+LOCAL_CACHE = Counter(
+    'epicure_local_cache_requests_total',
+    'Обращения к кэшу ответов в памяти воркера',
+    ['namespace', 'result'],
+)
+INVALIDATION_MESSAGES = Counter(
+    'epicure_invalidation_messages_total',
+    'Сообщения шины сброса кэша: local - из этого процесса, notify - через LISTEN, reconnect - полный сброс',
+    ['source'],
+)
+RATE_LIMITED = Counter(
+    'epicure_rate_limited_total',
+    'Запросы, отклонённые ограничителем с ответом 429',
+    ['view'],
+)
+
+UNRESOLVED_VIEW = '<unresolved>'
+
+
+class RequestStats:
+    __slots__ = ('request', 'queries', 'sql_time')
+
+    def __init__(self, request):
+        self.request = request
+        self.queries = 0
+        self.sql_time = 0.0
+
+
+# Статистика текущего запроса. Хранится в ContextVar, а не в threading.local,
+# чтобы учитывались и запросы из sync_to_async в ASGI.
+_current = ContextVar('epicure_request_stats', default=None)
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.sql_time += time.perf_counter() - started
+
+
+def _install_sql_wrapper(sender, connection, **kwargs):
+    if _sql_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_sql_wrapper)
+
+
+def connect_signals():
+    connection_created.connect(_install_sql_wrapper, dispatch_uid='metrics_sql_wrapper')
+
+
+@contextmanager
+def observe_external(service, operation):
+    """
+    Замеряет обращение к внешнему сервису: with observe_external('stripe', 'session_create'): ...
+    В трейсе запроса обращение становится клиентским спаном.
+    """
+    started = time.perf_counter()
+    outcome = 'ok'
+    try:
+        with tracing.span(f'{service} {operation}', tracing.CLIENT, **{'peer.service': service}):
+            yield
+    except Exception:
+        outcome = 'error'
+        raise
+    finally:
+        EXTERNAL_LATENCY.labels(service, operation, outcome).observe(time.perf_counter() - started)
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNRESOLVED_VIEW
+    return match.view_name or UNRESOLVED_VIEW
+
+
+def current_request_view():
+    """Представление запроса, который сейчас обрабатывается, или None вне запроса."""
+    stats = _current.get()
+    return get_view_name(stats.request) if stats is not None else None
+
+
+class MetricsMiddleware:
+    """
+    Снимает по каждому представлению латентность, статусы, размер ответа,
+    число и время SQL-запросов. Стоит в MIDDLEWARE сразу после TracingMiddleware,
+    поэтому в замер входит вся остальная цепочка.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        stats = RequestStats(request)
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._observe(request, response, stats, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats(request)
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._observe(request, response, stats, time.perf_counter() - started)
+        return response
+
+    def _observe(self, request, response, stats, elapsed):
+        view = get_view_name(request)
+        if view == 'metrics':
+            return
+
+        REQUEST_LATENCY.labels(view, request.method).observe(elapsed)
+        REQUESTS.labels(view, request.method, str(response.status_code)).inc()
+        SQL_QUERIES.labels(view).observe(stats.queries)
+        SQL_DURATION.labels(view).observe(stats.sql_time)
+        if not response.streaming:
+            RESPONSE_SIZE.labels(view).observe(len(response.content))
+
+
+def metrics_view(request):
+    """
+    Отдаёт метрики в формате Prometheus по Bearer-токену METRICS_TOKEN.
+    Без токена метрики видны только с локального адреса: латентности представлений
+    и внешних вызовов не должны быть публичными.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponseForbidden()
+    elif request.META.get('REMOTE_ADDR') not in LOCAL_ADDRESSES:
+        return HttpResponseForbidden()
+
+    # Под gunicorn с несколькими воркерами метрики собираются из общего каталога.
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,175 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+from rest_framework.request import Request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli необязателен, как и в whitenoise
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+FORMATS = {
+    'json': 'application/json',
+    'yaml': 'application/yaml',
+}
+# Порядок предпочтения, если клиент принимает несколько кодировок.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Загруженный в память артефакт текущего процесса.
+_loaded = {'mtime': None, 'version': None, 'files': {}}
+
+
+def generate_schema():
+    """
+    Строит схему от имени анонимного GET-запроса: get_queryset представлений
+    обращаются к request. Хост из синтетического запроса в артефакт не попадает,
+    UI подставляет текущий.
+    """
+    from core.urls import api_info, api_url_patterns
+
+    request = Request(RequestFactory().get('/api/docs/swagger.json'))
+    request.user = AnonymousUser()
+    generator = OpenAPISchemaGenerator(api_info, patterns=api_url_patterns)
+    schema = generator.get_schema(request=request, public=True)
+    schema.pop('host', None)
+    schema.pop('schemes', None)
+    return {
+        'json': OpenAPICodecJson(validators=[], pretty=False).encode(schema),
+        'yaml': OpenAPICodecYaml(validators=[]).encode(schema),
+    }
+
+
+def compress(content):
+    variants = {'': content, '.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content, quality=11)
+    return variants
+
+
+def write_artifact(directory, keep=3):
+    """
+    Записывает схему в directory/<версия>/ и переключает manifest.json на неё.
+    Версия - хэш содержимого, поэтому неизменившаяся схема даёт ту же версию.
+    """
+    rendered = generate_schema()
+    version = hashlib.sha256(rendered['json']).hexdigest()[:16]
+    target = os.path.join(directory, version)
+    os.makedirs(target, exist_ok=True)
+
+    files = []
+    for fmt, content in rendered.items():
+        for suffix, data in compress(content).items():
+            name = f'swagger.{fmt}{suffix}'
+            with open(os.path.join(target, name), 'wb') as fh:
+                fh.write(data)
+            files.append(name)
+
+    manifest = {
+        'version': version,
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'files': sorted(files),
+    }
+    # Запись через временный файл: воркеры не прочитают манифест наполовину.
+    tmp_path = os.path.join(directory, f'{MANIFEST}.tmp')
+    with open(tmp_path, 'w') as fh:
+        json.dump(manifest, fh, indent=2)
+    os.replace(tmp_path, os.path.join(directory, MANIFEST))
+
+    _prune(directory, version, keep)
+    return manifest
+
+
+def _prune(directory, current, keep):
+    versions = [
+        entry for entry in os.scandir(directory)
+        if entry.is_dir() and entry.name != current
+    ]
+    versions.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in versions[max(keep - 1, 0):]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def _load():
+    """Артефакт с диска; после перегенерации манифест меняется, и файлы перечитываются."""
+    directory = settings.OPENAPI_SCHEMA_DIR
+    manifest_path = os.path.join(directory, MANIFEST)
+    try:
+        mtime = os.stat(manifest_path).st_mtime
+    except FileNotFoundError:
+        mtime = None
+
+    if _loaded['files'] and _loaded['mtime'] == mtime:
+        return _loaded
+
+    if mtime is None:
+        logger.warning('Артефакт OpenAPI не найден, схема строится в памяти. Запустите generate_openapi_schema.')
+        rendered = generate_schema()
+        version = hashlib.sha256(rendered['json']).hexdigest()[:16]
+        files = {}
+        for fmt, content in rendered.items():
+            for suffix, data in compress(content).items():
+                files[f'swagger.{fmt}{suffix}'] = data
+    else:
+        with open(manifest_path) as fh:
+            manifest = json.load(fh)
+        version = manifest['version']
+        files = {}
+        for name in manifest['files']:
+            with open(os.path.join(directory, version, name), 'rb') as fh:
+                files[name] = fh.read()
+
+    _loaded.update(mtime=mtime, version=version, files=files)
+    return _loaded
+
+
+def _accepted_encodings(request):
+    header = request.headers.get('Accept-Encoding', '')
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0'):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def schema_file_view(request, format):
+    """Отдаёт заранее построенную схему (.json/.yaml) с ETag и сжатием без работы воркера."""
+    fmt = format.lstrip('.')
+    if fmt not in FORMATS:
+        raise Http404
+
+    artifact = _load()
+    name = f'swagger.{fmt}'
+    encoding, suffix = None, ''
+    accepted = _accepted_encodings(request)
+    for coding, candidate in ENCODINGS:
+        if coding in accepted and f'{name}{candidate}' in artifact['files']:
+            encoding, suffix = coding, candidate
+            break
+
+    etag = f'"{artifact["version"]}-{fmt}{suffix}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(artifact['files'][f'{name}{suffix}'], content_type=FORMATS[fmt])
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    patch_vary_headers(response, ['Accept-Encoding'])
+    patch_cache_control(response, public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+    return response
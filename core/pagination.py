@@ -0,0 +1,227 @@
+import datetime
+import json
+from base64 import b64decode, b64encode
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder обрезает время до миллисекунд, а позиции курсора нужны точные значения."""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная (keyset) пагинация по текущей сортировке queryset.
+
+    Вместо OFFSET и COUNT(*) следующая страница выбирается условием
+    «строго после последней строки» по всем полям сортировки и первичному
+    ключу, поэтому глубокие страницы стоят столько же, сколько первая.
+    Поля сортировки должны быть собственными NOT NULL полями модели.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size = PageNumberPagination.page_size
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Неверный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        model = queryset.model
+
+        self.ordering = self.get_ordering(queryset)
+        self.fields = [self._get_field(model, name.lstrip('-')) for name in self.ordering]
+
+        cursor = self.decode_cursor(request)
+        self.reverse = bool(cursor and cursor['reverse'])
+
+        ordering = [self._flip(name) for name in self.ordering] if self.reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if cursor:
+            queryset = queryset.filter(self._position_filter(cursor['position'], ordering))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if self.reverse:
+            rows.reverse()
+
+        # Лишняя строка говорит о продолжении в направлении обхода; пришли по курсору - значит, есть строки позади.
+        if self.reverse:
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Курсор страницы из ссылок next/previous',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Количество записей на странице',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+    def get_page_size(self, request):
+        try:
+            value = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(value, self.max_page_size))
+
+    def get_ordering(self, queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        pk_name = queryset.model._meta.pk.name
+        if not ordering:
+            return [f'-{pk_name}']
+        if not any(name.lstrip('-') in ('pk', pk_name) for name in ordering):
+            # Первичный ключ делает позицию уникальной при одинаковых значениях сортировки.
+            ordering.append(f'-{pk_name}' if ordering[-1].startswith('-') else pk_name)
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self._link(self.page[0], reverse=True)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            if data['o'] != self.ordering or len(data['p']) != len(self.fields):
+                raise ValueError
+            position = [field.to_python(value) for field, value in zip(self.fields, data['p'])]
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return {'position': position, 'reverse': bool(data.get('r'))}
+
+    def encode_cursor(self, position, reverse):
+        data = {'o': self.ordering, 'p': position}
+        if reverse:
+            data['r'] = 1
+        payload = json.dumps(data, cls=CursorEncoder, separators=(',', ':'))
+        return b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def get_position(self, row):
+        """Значения полей сортировки строки: модель или dict из values()."""
+        if isinstance(row, dict):
+            return [row[field.name] if field.name in row else row[field.attname] for field in self.fields]
+        return [getattr(row, field.attname) for field in self.fields]
+
+    def _link(self, row, reverse):
+        cursor = self.encode_cursor(self.get_position(row), reverse)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def _position_filter(self, position, ordering):
+        """(a, b, c) после (x, y, z): a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)."""
+        conditions = []
+        for index, name in enumerate(ordering):
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            equal = [Q(**{self.fields[i].attname: position[i]}) for i in range(index)]
+            conditions.append(reduce(and_, equal + [Q(**{f'{self.fields[index].attname}__{lookup}': position[index]})]))
+
+        # Нестрогое условие по первому полю позволяет планировщику сразу взять диапазон индекса.
+        first = 'lte' if ordering[0].startswith('-') else 'gte'
+        return Q(**{f'{self.fields[0].attname}__{first}': position[0]}) & reduce(or_, conditions)
+
+    @staticmethod
+    def _flip(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    @staticmethod
+    def _get_field(model, name):
+        if name == 'pk':
+            return model._meta.pk
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise NotFound(f'Сортировка по {name} не поддерживает курсорную пагинацию')
+        if not field.concrete or field.many_to_many or field.null:
+            raise NotFound(f'Сортировка по {name} не поддерживает курсорную пагинацию')
+        return field
+
+
+class SelectablePagination(PageNumberPagination):
+    """
+    Постраничная пагинация по умолчанию; курсорная - при ?pagination=keyset
+    или при наличии параметра cursor. Существующие клиенты не затрагиваются.
+    """
+
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get('pagination') == 'keyset' or self.keyset_class.cursor_query_param in request.query_params:
+            self.delegate = self.keyset_class()
+            return self.delegate.paginate_queryset(queryset, request, view)
+        self.delegate = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.delegate is not None:
+            return self.delegate.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': 'pagination',
+                'required': False,
+                'in': 'query',
+                'description': 'keyset - курсорная пагинация без подсчёта общего количества',
+                'schema': {'type': 'string', 'enum': ['keyset']},
+            },
+        ] + self.keyset_class().get_schema_operation_parameters(view)[:1]
@@ -0,0 +1,20 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from core import fastjson
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser на orjson: тело запроса разбирается без промежуточной декодировки в str."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        data = stream.read() if stream is not None else b''
+        try:
+            if encoding.lower().replace('-', '') != 'utf8':
+                data = data.decode(encoding).encode('utf-8')
+            return fastjson.loads(data)
+        except ValueError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
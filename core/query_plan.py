@@ -0,0 +1,151 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+class QueryPlan:
+    """
+    План загрузки связей для одной модели: пути select_related, вложенные
+    планы prefetch_related и поля для only().
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.select = set()
+        self.prefetch = {}
+        self.only = {model._meta.pk.name}
+        # only() безопасен, только если известны все поля, которые читает сериализатор.
+        self.only_safe = True
+
+    def child(self, path, model):
+        if path not in self.prefetch:
+            self.prefetch[path] = QueryPlan(model)
+        return self.prefetch[path]
+
+    def apply(self, queryset, use_only=False):
+        if self.select:
+            queryset = queryset.select_related(*sorted(self.select))
+        if self.prefetch:
+            queryset = queryset.prefetch_related(*[
+                Prefetch(path, queryset=plan.apply(plan.model._default_manager.all(), use_only))
+                for path, plan in sorted(self.prefetch.items())
+            ])
+        if use_only and self.only_safe:
+            queryset = queryset.only(*sorted(self.only))
+        return queryset
+
+
+def _walk_path(plan, model, prefix, parts, join_last=True):
+    """
+    Проходит по пути source (['restaurant', 'city', 'name']) и регистрирует связи.
+    Возвращает план, модель и префикс последней связи, а также признак того,
+    что путь целиком состоит из полей модели.
+    """
+    for index, attr in enumerate(parts):
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            # Метод или свойство модели: get_status_display читает поле status.
+            if attr.startswith('get_') and attr.endswith('_display') and index == len(parts) - 1:
+                plan.only.add(f'{prefix}{attr[4:-8]}')
+                return plan, model, prefix, True
+            return plan, model, prefix, False
+
+        if not field.is_relation:
+            plan.only.add(f'{prefix}{field.name}')
+            continue
+
+        if field.many_to_many or field.one_to_many:
+            plan = plan.child(f'{prefix}{attr}', field.related_model)
+            if field.one_to_many:
+                # Prefetch связывает строки с родителем по обратному FK.
+                plan.only.add(field.field.name)
+            prefix = ''
+        else:
+            if field.concrete:
+                plan.only.add(f'{prefix}{attr}')
+            # FK, выводимый как первичный ключ, читается из attname без JOIN.
+            if index == len(parts) - 1 and not join_last:
+                return plan, field.related_model, prefix, True
+            plan.select.add(f'{prefix}{attr}')
+            prefix = f'{prefix}{attr}__'
+        model = field.related_model
+    return plan, model, prefix, True
+
+
+def _collect(serializer, plan, model, prefix):
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+
+    meta = getattr(serializer, 'Meta', None)
+    # Meta.related_paths - связи, которые читают SerializerMethodField и to_representation:
+    # список загружается всегда, словарь {поле: [пути]} - только если поле осталось в выводе.
+    related_paths = getattr(meta, 'related_paths', ())
+    if isinstance(related_paths, dict):
+        related_paths = [
+            path for name, paths in related_paths.items()
+            if name in serializer.fields for path in paths
+        ]
+    for path in related_paths:
+        target_plan, _, _, _ = _walk_path(plan, model, prefix, path.split('__'))
+        target_plan.only_safe = False
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+
+        if isinstance(field, serializers.SerializerMethodField):
+            plan.only_safe = False
+            continue
+
+        if field.source == '*':
+            if isinstance(field, serializers.BaseSerializer):
+                _collect(field, plan, model, prefix)
+            continue
+
+        parts = field.source.split('.')
+        if isinstance(field, serializers.BaseSerializer):
+            target_plan, target_model, target_prefix, resolved = _walk_path(plan, model, prefix, parts)
+            if resolved:
+                _collect(field, target_plan, target_model, target_prefix)
+            else:
+                target_plan.only_safe = False
+            continue
+
+        join_last = not isinstance(field, serializers.PrimaryKeyRelatedField)
+        target_plan, _, _, resolved = _walk_path(plan, model, prefix, parts, join_last=join_last)
+        if not resolved:
+            target_plan.only_safe = False
+
+
+def build_query_plan(serializer):
+    model = serializer.child.Meta.model if isinstance(serializer, serializers.ListSerializer) else serializer.Meta.model
+    plan = QueryPlan(model)
+    _collect(serializer, plan, model, '')
+    return plan
+
+
+def apply_query_plan(queryset, serializer, use_only=False):
+    """Добавляет к queryset select_related/prefetch_related по дереву полей сериализатора."""
+    return build_query_plan(serializer).apply(queryset, use_only=use_only)
+
+
+class QueryPlanMixin:
+    """
+    Миксин для GenericAPIView: строит план загрузки связей по сериализатору
+    текущего действия, чтобы список выполнялся за постоянное число запросов.
+
+    query_plan_only = True дополнительно ограничивает выборку полями,
+    которые выводит сериализатор. Представления, которые переопределяют
+    get_queryset без вызова super(), оборачивают результат в plan_queryset().
+    """
+
+    query_plan_only = False
+
+    def get_queryset(self):
+        return self.plan_queryset(super().get_queryset())
+
+    def plan_queryset(self, queryset):
+        if not issubclass(self.get_serializer_class(), serializers.ModelSerializer):
+            return queryset
+        return apply_query_plan(queryset, self.get_serializer(), use_only=self.query_plan_only)
@@ -0,0 +1,261 @@
+import functools
+import ipaddress
+import logging
+import math
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+
+from core.metrics import RATE_LIMITED, get_view_name
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'rl'
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+MAX_LOCAL_BUCKETS = 10000
+
+# Все ведра проверяются и списываются одним атомарным вызовом: запрос либо
+# проходит по всем лимитам представления, либо ни одно ведро не тратится.
+# Время берётся из Redis, чтобы часы воркеров не влияли на пополнение.
+TOKEN_BUCKET_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local tokens = {}
+local retry = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local value = capacity
+    if bucket[1] then
+        value = math.min(capacity, tonumber(bucket[1]) + math.max(0, now - tonumber(bucket[2])) * rate)
+    end
+    if value < 1 then
+        retry = math.max(retry, (1 - value) / rate)
+    end
+    tokens[i] = value
+end
+if retry > 0 then
+    return tostring(retry)
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    redis.call('HSET', key, 'tokens', tokens[i] - 1, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000))
+end
+return '0'
+"""
+
+
+class RateLimit:
+    """
+    Лимит представления: ведро на capacity запросов (по умолчанию - число из rate),
+    которое пополняется со скоростью rate ('10/m', '5/h'...).
+
+    key определяет, чьё это ведро: 'ip' - адрес клиента, 'table' - UUID стола
+    из URL, 'user' - пользователь из JWT (без токена - адрес).
+    methods ограничивает лимит HTTP-методами, None - все методы.
+    """
+
+    def __init__(self, scope, rate, key='ip', burst=None, methods=None):
+        count, _, period = rate.partition('/')
+        self.scope = scope
+        self.key = key
+        self.capacity = burst or int(count)
+        self.refill = int(count) / PERIODS[period[:1]]
+        self.methods = {method.upper() for method in methods} if methods else None
+
+    def applies(self, method):
+        return self.methods is None or method in self.methods
+
+
+def rate_limit(scope, rate, key='ip', burst=None, methods=None):
+    """
+    Объявляет лимит для функции-представления, класса или метода действия ViewSet.
+    Декоратор только помечает представление; проверяет RateLimitMiddleware
+    до вызова представления, поэтому отказ не обращается к базе.
+    Несколько декораторов - несколько лимитов, запрос должен пройти все.
+    """
+    limit = RateLimit(scope, rate, key=key, burst=burst, methods=methods)
+
+    def decorator(target):
+        target.rate_limits = (*target.__dict__.get('rate_limits', ()), limit)
+        return target
+    return decorator
+
+
+def get_rate_limits(view_func, method):
+    limits = list(getattr(view_func, 'rate_limits', ()))
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if view_class is not None:
+        limits.extend(getattr(view_class, 'rate_limits', ()))
+        # Для ViewSet обработчик метода - действие из as_view(actions).
+        actions = getattr(view_func, 'actions', None)
+        handler_name = actions.get(method.lower()) if actions else method.lower()
+        handler = getattr(view_class, handler_name, None) if handler_name else None
+        limits.extend(getattr(handler, 'rate_limits', ()))
+    return [limit for limit in limits if limit.applies(method)]
+
+
+@functools.lru_cache(maxsize=8)
+def _proxy_networks(proxies):
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def _is_trusted_proxy(address):
+    proxies = settings.RATE_LIMIT_TRUSTED_PROXIES
+    if not proxies:
+        return True
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(address in network for network in _proxy_networks(tuple(proxies)))
+
+
+def get_client_ip(request):
+    """
+    Адрес клиента. X-Forwarded-For читается, только если перед приложением
+    RATE_LIMIT_PROXY_COUNT прокси и запрос пришёл с одного из RATE_LIMIT_TRUSTED_PROXIES:
+    иначе клиент получал бы новое ведро на каждый запрос с выдуманным заголовком.
+    """
+    proxies = settings.RATE_LIMIT_PROXY_COUNT
+    remote_addr = request.META.get('REMOTE_ADDR', '')
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if proxies and forwarded and _is_trusted_proxy(remote_addr):
+        addresses = [address.strip() for address in forwarded.split(',')]
+        return addresses[-min(proxies, len(addresses))]
+    return remote_addr
+
+
+def _user_identity(request):
+    """
+    Пользователь без запросов к базе: user_id из подписанного JWT. Сессию не читаем -
+    это запрос к БД, поэтому сессии и анонимы делят ведро адреса клиента.
+    """
+    authorization = request.headers.get('Authorization', '')
+    if authorization.startswith('Bearer '):
+        from rest_framework_simplejwt.settings import api_settings
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        try:
+            return f'user:{AccessToken(authorization[7:])[api_settings.USER_ID_CLAIM]}'
+        except Exception:
+            pass
+    return f'ip:{get_client_ip(request)}'
+
+
+def _identity(limit, request, view_kwargs):
+    if limit.key == 'table':
+        return f"table:{view_kwargs.get('table_uuid', '')}"
+    if limit.key == 'user':
+        return _user_identity(request)
+    return f'ip:{get_client_ip(request)}'
+
+
+class RedisBuckets:
+    def __init__(self):
+        self._script = None
+
+    def take(self, buckets):
+        if self._script is None:
+            from django_redis import get_redis_connection
+            self._script = get_redis_connection('default').register_script(TOKEN_BUCKET_SCRIPT)
+        keys = [key for key, _, _ in buckets]
+        args = [value for _, capacity, refill in buckets for value in (capacity, refill)]
+        return float(self._script(keys=keys, args=args))
+
+
+class LocalBuckets:
+    """Те же ведра в памяти процесса, если кэш не в Redis (разработка, тесты)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def take(self, buckets):
+        now = time.monotonic()
+        with self._lock:
+            tokens = []
+            retry = 0
+            for key, capacity, refill in buckets:
+                value, updated = self._buckets.get(key, (capacity, now))
+                value = min(capacity, value + (now - updated) * refill)
+                if value < 1:
+                    retry = max(retry, (1 - value) / refill)
+                tokens.append(value)
+            if retry:
+                return retry
+            if len(self._buckets) > MAX_LOCAL_BUCKETS:
+                # Запасной режим для одного процесса: проще начать заново, чем вытеснять по времени.
+                self._buckets.clear()
+            for (key, _, _), value in zip(buckets, tokens):
+                self._buckets[key] = (value - 1, now)
+            return 0
+
+
+_backend = None
+
+
+def _get_backend():
+    global _backend
+    if _backend is None:
+        redis = settings.CACHES['default']['BACKEND'].startswith('django_redis')
+        _backend = RedisBuckets() if redis else LocalBuckets()
+    return _backend
+
+
+def check(request, view_func, view_kwargs):
+    """429 с Retry-After, если запрос превышает лимиты представления, иначе None."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+    limits = get_rate_limits(view_func, request.method)
+    if not limits:
+        return None
+
+    buckets = [
+        (f'{KEY_PREFIX}:{limit.scope}:{_identity(limit, request, view_kwargs)}', limit.capacity, limit.refill)
+        for limit in limits
+    ]
+    try:
+        retry = _get_backend().take(buckets)
+    except Exception as e:
+        # Недоступный Redis не должен останавливать сервис: лимит пропускает запрос.
+        logger.warning(f'Ограничитель запросов недоступен: {e}')
+        return None
+    if not retry:
+        return None
+
+    RATE_LIMITED.labels(get_view_name(request)).inc()
+    seconds = math.ceil(retry)
+    response = JsonResponse(
+        {'detail': f'Слишком много запросов. Повторите через {seconds} с.'},
+        status=429,
+    )
+    response['Retry-After'] = str(seconds)
+    return response
+
+
+class RateLimitMiddleware:
+    """
+    Проверяет лимиты, объявленные через rate_limit, до вызова представления.
+    Ставится после MetricsMiddleware, чтобы отказы попадали в метрики.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        return check(request, view_func, view_kwargs)
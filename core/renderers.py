@@ -0,0 +1,14 @@
+from rest_framework.renderers import JSONRenderer
+
+from core import fastjson
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson; ?indent и Accept: application/json; indent=N включают отступы."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        return fastjson.dumps(data, indent=bool(indent))
@@ -0,0 +1,79 @@
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def parse_field_tree(value):
+    """'id,table_details.number,table_details.section' -> {'id': {}, 'table_details': {'number': {}, 'section': {}}}"""
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for part in path.strip().split('.'):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+def is_expandable(serializer, name, field):
+    """Вложенное представление связи: вложенный сериализатор или поле из Meta.expandable_fields."""
+    if isinstance(field, serializers.BaseSerializer):
+        return True
+    return name in getattr(getattr(serializer, 'Meta', None), 'expandable_fields', ())
+
+
+def prune_fields(serializer, fields, only=None, expand=None):
+    """
+    Убирает из fields сериализатора поля, не запрошенные клиентом.
+
+    only - дерево ?fields= (None - без ограничений), expand - дерево ?expand=
+    (None - вложенные связи выводятся как обычно). Поле связи, явно названное
+    в ?fields=, раскрывается и без ?expand=.
+    """
+    for name, field in list(fields.items()):
+        if only is not None and name not in only:
+            fields.pop(name)
+            continue
+
+        if not is_expandable(serializer, name, field):
+            continue
+
+        if expand is not None and name not in expand and not (only and name in only):
+            fields.pop(name)
+            continue
+
+        if isinstance(field, serializers.BaseSerializer):
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+            prune_fields(
+                nested,
+                nested.fields,
+                only.get(name) or None if only else None,
+                expand.get(name, {}) if expand is not None else None,
+            )
+    return fields
+
+
+class SparseFieldsetMixin:
+    """
+    Миксин для ModelSerializer: ?fields=id,name,table_details.number выбирает
+    поля ответа, ?expand=table_details.section включает только перечисленные
+    вложенные связи (?expand= без значения отключает их все).
+
+    Отброшенные поля не попадают в план QueryPlanMixin, поэтому связи для них
+    не загружаются. Параметры читает только сериализатор верхнего уровня
+    и только в GET-запросах; вложенные сериализаторы обрезаются им же.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # Вложенные сериализаторы создаются без контекста и запрос не видят.
+        request = self._context.get('request')
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return fields
+
+        params = request.query_params
+        only = parse_field_tree(params[FIELDS_PARAM]) if params.get(FIELDS_PARAM) else None
+        expand = parse_field_tree(params[EXPAND_PARAM]) if EXPAND_PARAM in params else None
+        if only is None and expand is None:
+            return fields
+        return prune_fields(self, fields, only, expand)
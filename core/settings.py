@@ -51,6 +51,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
 
     # Local apps
+    'core',
     'cities',
     'users',
     'restaurant',
@@ -106,6 +107,10 @@ SOCIALACCOUNT_EMAIL_VERIFICATION = "none"
 SOCIALACCOUNT_EMAIL_REQUIRED = False
 
 MIDDLEWARE = [
+    'core.tracing.TracingMiddleware',
+    'core.metrics.MetricsMiddleware',
+    'core.db_router.ReplicaRoutingMiddleware',
+    'core.ratelimit.RateLimitMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -116,7 +121,12 @@ MIDDLEWARE = [
     'allauth.account.middleware.AccountMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.tracing.ViewSpanMiddleware',
 ]
+# Под ASGI (WEB_SERVER=asgi) статику отдаёт nginx. WhiteNoiseMiddleware только синхронный,
+# и с ним Django выполнял бы всю внутреннюю цепочку в потоке на каждый запрос.
+if os.getenv('WEB_SERVER') == 'asgi':
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
 
 ROOT_URLCONF = 'core.urls'
 
@@ -155,6 +165,100 @@ DATABASES = {
         'PORT': os.getenv('DB_PORT', '5432'),
     }
 }
+
+# Реплики только для чтения: DB_REPLICA_HOSTS=replica1,replica2:5433.
+# Остальные параметры подключения берутся из default.
+for index, address in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    host, _, port = address.strip().partition(':')
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+# Сколько секунд после записи клиент читает с основной базы.
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '10'))
+
+REDIS_URL = os.getenv('REDIS_URL', 'redis://redis:6379/1')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': REDIS_URL,
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'SOCKET_CONNECT_TIMEOUT': 1,
+            'SOCKET_TIMEOUT': 1,
+            # При недоступном Redis кэш работает как постоянный промах
+            'IGNORE_EXCEPTIONS': True,
+        },
+    }
+}
+DJANGO_REDIS_LOG_IGNORED_EXCEPTIONS = True
+
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', '300'))
+# Сколько секунд после истечения отдавать устаревший ответ, пока его пересобирает один запрос.
+RESPONSE_CACHE_STALE_SECONDS = int(os.getenv('RESPONSE_CACHE_STALE_SECONDS', '60'))
+# Сколько ждать чужой пересборки при пустом кэше и на сколько брать блокировку в Redis.
+SINGLE_FLIGHT_WAIT_SECONDS = float(os.getenv('SINGLE_FLIGHT_WAIT_SECONDS', '2'))
+SINGLE_FLIGHT_LOCK_SECONDS = int(os.getenv('SINGLE_FLIGHT_LOCK_SECONDS', '30'))
+# Кэш ответов в памяти воркера, согласованный через LISTEN/NOTIFY (core.invalidation); 0 - выключен.
+L1_CACHE_TIMEOUT = int(os.getenv('L1_CACHE_TIMEOUT', '30'))
+L1_CACHE_MAX_ENTRIES = int(os.getenv('L1_CACHE_MAX_ENTRIES', '1000'))
+# Как часто слушатель шины проверяет своё соединение, если сообщений нет.
+INVALIDATION_POLL_SECONDS = int(os.getenv('INVALIDATION_POLL_SECONDS', '30'))
+
+# Лимиты запросов объявляются в представлениях (core.ratelimit.rate_limit), ведра хранятся в Redis.
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+# Число доверенных прокси перед приложением: адрес клиента берётся из X-Forwarded-For.
+# По умолчанию 0: docker-compose публикует web напрямую, и клиент подставил бы в заголовок любой адрес.
+RATE_LIMIT_PROXY_COUNT = int(os.getenv('RATE_LIMIT_PROXY_COUNT', '0'))
+# Адреса и сети прокси через запятую (10.0.0.0/8,172.16.0.5): X-Forwarded-For читается,
+# только если запрос пришёл с них. Пусто - заголовку верим при любом REMOTE_ADDR.
+RATE_LIMIT_TRUSTED_PROXIES = [proxy.strip() for proxy in os.getenv('RATE_LIMIT_TRUSTED_PROXIES', '').split(',') if proxy.strip()]
+
+# Трейсинг (core.tracing): file:///путь/traces.jsonl или http://collector:4318/v1/traces; пусто - выключен.
+TRACE_EXPORT = os.getenv('TRACE_EXPORT', '')
+# Доля запросов в выборке; запрос с traceparent решает сам по флагу sampled.
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.01'))
+TRACE_MAX_SPANS = int(os.getenv('TRACE_MAX_SPANS', '1000'))
+TRACE_SERVICE_NAME = os.getenv('TRACE_SERVICE_NAME', 'epicure')
+
+# Медленные запросы (core.slow_queries): порог в мс, 0 - выключено.
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200'))
+# Доля медленных SELECT, для которых снимается EXPLAIN (ANALYZE, BUFFERS), не чаще раза в интервал на запрос.
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv('SLOW_QUERY_EXPLAIN_RATE', '0.1'))
+SLOW_QUERY_EXPLAIN_INTERVAL = int(os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', '3600'))
+SLOW_QUERY_EXPLAIN_TIMEOUT = float(os.getenv('SLOW_QUERY_EXPLAIN_TIMEOUT', '5'))
+SLOW_QUERY_RETENTION = int(os.getenv('SLOW_QUERY_RETENTION', str(7 * 86400)))
+
+# Взвешенный рейтинг ресторанов (Restaurant.score): априорная средняя оценка и её вес в отзывах.
+# После изменения пересчитайте рейтинги: python manage.py recompute_ratings.
+RATING_PRIOR_MEAN = float(os.getenv('RATING_PRIOR_MEAN', '3.5'))
+RATING_PRIOR_WEIGHT = int(os.getenv('RATING_PRIOR_WEIGHT', '10'))
+
+# Формат QR-кодов новых столов: png - растр 450x450, svg - вектор с именем по хешу ссылки.
+QR_FORMAT = os.getenv('QR_FORMAT', 'png')
+# Массовое создание столов (restaurant.services.provision_tables): процессы для отрисовки QR,
+# потоки для загрузки PNG в хранилище и максимум столов за один вызов.
+QR_RENDER_WORKERS = int(os.getenv('QR_RENDER_WORKERS', str(os.cpu_count() or 1)))
+QR_UPLOAD_THREADS = int(os.getenv('QR_UPLOAD_THREADS', '8'))
+TABLE_PROVISION_MAX = int(os.getenv('TABLE_PROVISION_MAX', '500'))
+# Шрифты подписей на листах QR-кодов для печати (нужна кириллица).
+QR_LABEL_FONT = os.getenv('QR_LABEL_FONT', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf')
+QR_LABEL_FONT_BOLD = os.getenv('QR_LABEL_FONT_BOLD', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf')
+
+# Максимум подзапросов в одном POST /api/v1/batch/.
+BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', '10'))
+
+# Списки меню, предложений и бронирований собираются из values() (core.fast_serializers).
+FAST_SERIALIZERS = os.getenv('FAST_SERIALIZERS', 'True').lower() == 'true'
+
+# Prometheus: /metrics отдаётся с заголовком Authorization: Bearer <токен>; без токена - только с localhost.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -217,6 +321,15 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': [
@@ -241,6 +354,8 @@ DEFAULT_FROM_EMAIL = 'noreply@epicure.com'
 
 
 SWAGGER_SETTINGS = {
+    # UI загружает готовую схему из артефакта вместо ?format=openapi на каждый заход.
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
     'SECURITY_DEFINITIONS': {
         'Bearer': {
             'type': 'apiKey',
@@ -280,8 +395,13 @@ SWAGGER_SETTINGS = {
 
 REDOC_SETTINGS = {
     'LAZY_RENDERING': True,
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
 }
 
+# Схема OpenAPI строится при деплое командой generate_openapi_schema.
+OPENAPI_SCHEMA_DIR = os.getenv('OPENAPI_SCHEMA_DIR', os.path.join(BASE_DIR, 'openapi'))
+OPENAPI_SCHEMA_MAX_AGE = int(os.getenv('OPENAPI_SCHEMA_MAX_AGE', '300'))
+
 WHITENOISE_INDEX_FILE = False
 WHITENOISE_ROOT = None
 
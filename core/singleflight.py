@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.metrics import CACHE_COALESCED, CACHE_COALESCED_WAIT, CACHE_REBUILDS
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.05
+
+
+class _Flight:
+    __slots__ = ('done', 'value')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+
+
+# Пересборки, которые сейчас идут в этом процессе: ключ -> _Flight.
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def _acquire(lock_key, token):
+    """True - блокировка взята, False - её держит другой воркер, None - Redis недоступен."""
+    try:
+        # django-redis с IGNORE_EXCEPTIONS при недоступном Redis возвращает None.
+        return cache.add(lock_key, token, settings.SINGLE_FLIGHT_LOCK_SECONDS)
+    except Exception as e:
+        logger.warning(f'Не удалось взять блокировку {lock_key}: {e}')
+        return None
+
+
+def _release(lock_key, token):
+    # Снимаем только свою блокировку: по истечении таймаута её мог взять другой воркер.
+    try:
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+    except Exception as e:
+        logger.warning(f'Не удалось снять блокировку {lock_key}: {e}')
+
+
+def _wait(lock_key, load, namespace):
+    """Ждёт, пока другой воркер положит значение в кэш или отпустит блокировку."""
+    started = time.perf_counter()
+    deadline = started + settings.SINGLE_FLIGHT_WAIT_SECONDS
+    value = None
+    while time.perf_counter() < deadline:
+        time.sleep(POLL_INTERVAL)
+        value = load()
+        if value is not None or cache.get(lock_key) is None:
+            break
+    CACHE_COALESCED_WAIT.labels(namespace).observe(time.perf_counter() - started)
+    CACHE_COALESCED.labels(namespace, 'waited' if value is not None else 'timeout').inc()
+    return value
+
+
+def _lead(key, load, rebuild, namespace, stale):
+    lock_key = f'{key}:lock'
+    token = uuid.uuid4().hex
+    acquired = _acquire(lock_key, token)
+
+    if acquired is False:
+        if stale is not None:
+            CACHE_COALESCED.labels(namespace, 'stale').inc()
+            return stale, 'stale'
+        value = _wait(lock_key, load, namespace)
+        if value is not None:
+            return value, 'waited'
+    elif acquired:
+        # Пока мы брали блокировку, предыдущий лидер мог успеть сохранить значение.
+        value = load()
+        if value is not None:
+            return value, 'waited'
+
+    CACHE_REBUILDS.labels(namespace, {True: 'redis', None: 'process'}.get(acquired, 'none')).inc()
+    try:
+        return rebuild(), 'rebuilt'
+    finally:
+        if acquired:
+            _release(lock_key, token)
+
+
+def single_flight(key, load, rebuild, namespace, stale=None):
+    """
+    Пересборка значения кэша одним исполнителем.
+
+    load() возвращает свежее значение из кэша или None; rebuild() считает его
+    заново и сам сохраняет, None из rebuild значит, что результат не кэшируется.
+    Пока значение пересобирает другой запрос, остальные сразу получают stale,
+    если оно передано, иначе до SINGLE_FLIGHT_WAIT_SECONDS ждут результат и
+    только потом считают сами. Внутри процесса ожидание идёт на Event лидера,
+    между процессами - на блокировке в Redis. Если Redis недоступен, остаётся
+    только внутрипроцессное объединение.
+
+    Возвращает (значение, исход), исход - rebuilt, waited или stale.
+    """
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if leader:
+        try:
+            flight.value, outcome = _lead(key, load, rebuild, namespace, stale)
+            return flight.value, outcome
+        finally:
+            with _flights_lock:
+                _flights.pop(key, None)
+            flight.done.set()
+
+    if stale is not None:
+        CACHE_COALESCED.labels(namespace, 'stale').inc()
+        return stale, 'stale'
+
+    started = time.perf_counter()
+    flight.done.wait(settings.SINGLE_FLIGHT_WAIT_SECONDS)
+    CACHE_COALESCED_WAIT.labels(namespace).observe(time.perf_counter() - started)
+    if flight.value is not None:
+        CACHE_COALESCED.labels(namespace, 'waited').inc()
+        return flight.value, 'waited'
+    CACHE_COALESCED.labels(namespace, 'timeout').inc()
+    return rebuild(), 'rebuilt'
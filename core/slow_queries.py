@@ -0,0 +1,358 @@
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from core.db_router import get_replicas
+from core.metrics import current_request_view
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'slowq'
+QUEUE_SIZE = 1000
+STACK_DEPTH = 8
+MAX_SQL_LENGTH = 4000
+
+# Фоновая задача, которая сейчас выполняется (для запросов вне HTTP).
+_task = ContextVar('epicure_slow_query_task', default=None)
+# Запросы самого сборщика (EXPLAIN, запись в кэш) не учитываются.
+_collecting = ContextVar('epicure_slow_query_collecting', default=False)
+
+_IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)', re.IGNORECASE)
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_SPACES = re.compile(r'\s+')
+# SELECT ... FOR UPDATE/SHARE под EXPLAIN ANALYZE взял бы блокировки строк до отката.
+_LOCKING = re.compile(r'\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE|KEY\s+SHARE)\b', re.IGNORECASE)
+
+# Сводка по отпечатку обновляется одним атомарным вызовом: сборщики всех
+# воркеров пишут в одни ключи, и чтение-изменение-запись теряло бы счётчики.
+STORE_SCRIPT = """
+local ms = tonumber(ARGV[3])
+redis.call('HSETNX', KEYS[1], 'sql', ARGV[2])
+redis.call('HINCRBY', KEYS[1], 'count', 1)
+redis.call('HINCRBYFLOAT', KEYS[1], 'total_ms', ARGV[3])
+redis.call('HINCRBY', KEYS[1], 'origin:' .. ARGV[4], 1)
+if ms >= tonumber(redis.call('HGET', KEYS[1], 'max_ms') or '-1') then
+    redis.call('HSET', KEYS[1], 'max_ms', ARGV[3], 'stack', ARGV[5], 'database', ARGV[6])
+end
+if tonumber(ARGV[7]) > tonumber(redis.call('HGET', KEYS[1], 'last_seen') or '0') then
+    redis.call('HSET', KEYS[1], 'last_seen', ARGV[7])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[8])
+redis.call('SADD', KEYS[2], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[8])
+"""
+
+
+@contextmanager
+def task_origin(name):
+    token = _task.set(name)
+    try:
+        yield
+    finally:
+        _task.reset(token)
+
+
+def normalize(sql):
+    """SQL без значений: списки IN, числа и строки заменены, пробелы схлопнуты."""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _STRING.sub("'?'", sql)
+    sql = _NUMBER.sub('N', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def fingerprint(normalized):
+    return hashlib.md5(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def current_origin():
+    """Представление, фоновая задача или команда manage.py, выполняющая запрос."""
+    view = current_request_view()
+    if view is not None:
+        return view
+    task = _task.get()
+    if task is not None:
+        return f'task {task}'
+    if len(sys.argv) > 1 and os.path.basename(sys.argv[0]) == 'manage.py':
+        return f'command {sys.argv[1]}'
+    return 'unknown'
+
+
+def stack_summary():
+    """Последние кадры кода проекта (без библиотек и обёрток execute_wrappers)."""
+    base = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()[:-1]
+        if frame.filename.startswith(base)
+        and 'site-packages' not in frame.filename
+        and not frame.filename.endswith(os.path.join('core', 'slow_queries.py'))
+        and frame.name != '_sql_wrapper'
+    ]
+    return [
+        f'{os.path.relpath(frame.filename, base)}:{frame.lineno} {frame.name}'
+        for frame in frames[-STACK_DEPTH:]
+    ]
+
+
+def _entry_key(key):
+    return f'{KEY_PREFIX}:q:{key}'
+
+
+def _plan_key(key):
+    return f'{KEY_PREFIX}:plan:{key}'
+
+
+def _index_key():
+    return f'{KEY_PREFIX}:index'
+
+
+class Collector(threading.Thread):
+    """
+    Обрабатывает медленные запросы вне запроса: обновляет сводку по отпечатку
+    SQL в кэше и для части из них снимает план. План снимается не чаще раза
+    за SLOW_QUERY_EXPLAIN_INTERVAL на отпечаток.
+    """
+
+    def __init__(self):
+        super().__init__(name='slow-query-collector', daemon=True)
+        self.pid = os.getpid()
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+
+    def submit(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+    def run(self):
+        _collecting.set(True)
+        while True:
+            record = self.queue.get()
+            try:
+                self.store(record)
+                if random.random() < settings.SLOW_QUERY_EXPLAIN_RATE:
+                    self.explain(record)
+            except Exception as e:
+                logger.warning(f'Не удалось сохранить медленный запрос {record["key"]}: {e}')
+            finally:
+                for connection in connections.all(initialized_only=True):
+                    connection.close_if_unusable_or_obsolete()
+
+    @staticmethod
+    def store(record):
+        _get_summaries().store(record, settings.SLOW_QUERY_RETENTION)
+
+    @staticmethod
+    def explain(record):
+        if record['params'] is None or not record['raw_sql'].lstrip().upper().startswith('SELECT'):
+            return
+        if _LOCKING.search(record['raw_sql']):
+            return
+        if not cache.add(_plan_key(record['key']) + ':lock', 1, settings.SLOW_QUERY_EXPLAIN_INTERVAL):
+            return
+
+        # ANALYZE повторно выполняет и без того медленный запрос: при наличии реплик - не на основной базе.
+        replicas = get_replicas()
+        database = record['database']
+        if replicas and database not in replicas:
+            database = random.choice(replicas)
+        connection = connections[database]
+        if connection.vendor == 'postgresql':
+            # ANALYZE выполняет запрос, поэтому только SELECT и с откатом на всякий случай.
+            prefix = 'EXPLAIN (ANALYZE, BUFFERS)'
+        elif connection.vendor == 'sqlite':
+            prefix = 'EXPLAIN QUERY PLAN'
+        else:
+            return
+
+        with connection.cursor() as cursor:
+            connection.set_autocommit(False)
+            try:
+                if connection.vendor == 'postgresql':
+                    cursor.execute(f"SET LOCAL statement_timeout = {int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT * 1000)}")
+                cursor.execute(f'{prefix} {record["raw_sql"]}', record['params'])
+                rows = cursor.fetchall()
+            finally:
+                connection.rollback()
+                connection.set_autocommit(True)
+
+        plan = '\n'.join(' '.join(str(value) for value in row) for row in rows)
+        cache.set(_plan_key(record['key']), {
+            'plan': plan,
+            'ms': record['ms'],
+            'origin': record['origin'],
+            'at': record['at'],
+        }, settings.SLOW_QUERY_RETENTION)
+
+
+class RedisSummaries:
+    """Сводки в хешах Redis: счётчики HINCRBY, отпечатки - в множестве-индексе."""
+
+    def __init__(self):
+        from django_redis import get_redis_connection
+
+        self.redis = get_redis_connection('default')
+        self._script = self.redis.register_script(STORE_SCRIPT)
+
+    def store(self, record, retention):
+        self._script(keys=[_entry_key(record['key']), _index_key()], args=[
+            record['key'], record['sql'], record['ms'], record['origin'],
+            json.dumps(record['stack']), record['database'], record['at'], retention,
+        ])
+
+    def keys(self):
+        return sorted(key.decode() for key in self.redis.smembers(_index_key()))
+
+    def entries(self, keys):
+        pipeline = self.redis.pipeline()
+        for key in keys:
+            pipeline.hgetall(_entry_key(key))
+        entries = {}
+        for key, raw in zip(keys, pipeline.execute()):
+            if not raw:
+                continue
+            fields = {name.decode(): value.decode() for name, value in raw.items()}
+            entries[key] = {
+                'sql': fields['sql'],
+                'count': int(fields['count']),
+                'total_ms': float(fields['total_ms']),
+                'max_ms': float(fields['max_ms']),
+                'origins': {
+                    name[len('origin:'):]: int(value) for name, value in fields.items() if name.startswith('origin:')
+                },
+                'stack': json.loads(fields['stack']),
+                'database': fields['database'],
+                'last_seen': float(fields['last_seen']),
+            }
+        return entries
+
+    def delete(self, keys):
+        self.redis.delete(*[_entry_key(key) for key in keys], _index_key())
+
+
+class CacheSummaries:
+    """
+    Те же сводки в кэше Django, если он не в Redis (разработка, тесты): там
+    один процесс с одним сборщиком, и обновлять записи некому, кроме него.
+    """
+
+    def store(self, record, retention):
+        key = record['key']
+        entry = cache.get(_entry_key(key)) or {
+            'sql': record['sql'],
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'origins': {},
+        }
+        entry['count'] += 1
+        entry['total_ms'] += record['ms']
+        entry['origins'][record['origin']] = entry['origins'].get(record['origin'], 0) + 1
+        if record['ms'] >= entry['max_ms']:
+            entry.update(max_ms=record['ms'], stack=record['stack'], database=record['database'])
+        entry['last_seen'] = max(entry.get('last_seen', 0), record['at'])
+        cache.set(_entry_key(key), entry, retention)
+
+        index = cache.get(_index_key()) or []
+        if key not in index:
+            cache.set(_index_key(), [*index, key], retention)
+
+    def keys(self):
+        return cache.get(_index_key()) or []
+
+    def entries(self, keys):
+        entries = cache.get_many([_entry_key(key) for key in keys])
+        return {key: entries[_entry_key(key)] for key in keys if _entry_key(key) in entries}
+
+    def delete(self, keys):
+        cache.delete_many([_entry_key(key) for key in keys] + [_index_key()])
+
+
+_summaries = None
+
+
+def _get_summaries():
+    global _summaries
+    if _summaries is None:
+        redis = settings.CACHES['default']['BACKEND'].startswith('django_redis')
+        _summaries = RedisSummaries() if redis else CacheSummaries()
+    return _summaries
+
+
+_collector = None
+_collector_lock = threading.Lock()
+
+
+def _get_collector():
+    global _collector
+    if _collector is None or _collector.pid != os.getpid():
+        with _collector_lock:
+            if _collector is None or _collector.pid != os.getpid():
+                _collector = Collector()
+                _collector.start()
+    return _collector
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        if elapsed >= settings.SLOW_QUERY_MS and not _collecting.get():
+            normalized = normalize(sql)[:MAX_SQL_LENGTH]
+            _get_collector().submit({
+                'key': fingerprint(normalized),
+                'sql': normalized,
+                'raw_sql': sql,
+                'params': None if many else params,
+                'ms': elapsed,
+                'database': context['connection'].alias,
+                'origin': current_origin(),
+                'stack': stack_summary(),
+                'at': time.time(),
+            })
+
+
+def _install_sql_wrapper(sender, connection, **kwargs):
+    if _sql_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_sql_wrapper)
+
+
+def connect_signals():
+    if settings.SLOW_QUERY_MS > 0:
+        connection_created.connect(_install_sql_wrapper, dispatch_uid='slow_query_wrapper')
+
+
+def get_report():
+    """Сводки медленных запросов с планами (если сняты), без порядка."""
+    summaries = _get_summaries()
+    keys = summaries.keys()
+    entries = summaries.entries(keys)
+    plans = cache.get_many([_plan_key(key) for key in keys])
+    return [
+        {'key': key, **entry, 'plan': plans.get(_plan_key(key))}
+        for key, entry in entries.items()
+    ]
+
+
+def reset():
+    summaries = _get_summaries()
+    keys = summaries.keys()
+    summaries.delete(keys)
+    cache.delete_many([_plan_key(key) for key in keys] + [f'{_plan_key(key)}:lock' for key in keys])
@@ -0,0 +1,391 @@
+import random
+import time as clock
+import uuid
+from array import array
+from datetime import time, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from advertisement.models import Banner
+from cities.models import City
+from notifications.models import Notification, NotificationStatus, NotificationType
+from offers.models import Offer, OfferItem, OfferReservation, OfferType
+from products.models import Menu, MenuType
+from restaurant.models import Restaurant, Section, Table, Review
+from room.models import Reservation, ReservationMenuItem, ReservationStatus
+from table_service.models import Order, OrderItem
+
+User = get_user_model()
+
+DEFAULT_SIZES = {
+    'cities': 5,
+    'users': 300,
+    'restaurants': 60,
+    'sections_per_restaurant': 3,
+    'tables_per_section': 10,
+    'menu_types': 8,
+    'menus_per_restaurant': 25,
+    'reservations': 3000,
+    'reservation_items': 2,
+    'orders': 500,
+    'order_items': 3,
+    'notifications': 3000,
+    'reviews_per_restaurant': 20,
+    'banners': 30,
+    'offers_per_restaurant': 2,
+    'offer_items': 3,
+    'offer_reservations': 500,
+}
+
+# Пресеты generate_load_data. large даёт порядка десяти миллионов строк.
+PRESETS = {
+    'small': DEFAULT_SIZES,
+    'medium': {
+        **DEFAULT_SIZES,
+        'cities': 20,
+        'users': 20000,
+        'restaurants': 1000,
+        'menus_per_restaurant': 60,
+        'reservations': 200000,
+        'orders': 100000,
+        'notifications': 200000,
+        'reviews_per_restaurant': 50,
+        'banners': 500,
+        'offer_reservations': 20000,
+    },
+    'large': {
+        **DEFAULT_SIZES,
+        'cities': 50,
+        'users': 200000,
+        'restaurants': 5000,
+        'sections_per_restaurant': 4,
+        'tables_per_section': 15,
+        'menus_per_restaurant': 80,
+        'reservations': 2000000,
+        'orders': 1000000,
+        'notifications': 2000000,
+        'reviews_per_restaurant': 100,
+        'banners': 2000,
+        'offer_reservations': 200000,
+    },
+}
+
+
+# Абсолютные объёмы; размеры вида *_per_* и *_items задают форму данных и не масштабируются.
+SCALED_SIZES = ('cities', 'users', 'restaurants', 'reservations', 'orders', 'notifications', 'banners', 'offer_reservations')
+
+
+def scale_sizes(sizes, factor):
+    return {
+        key: max(1, int(value * factor)) if key in SCALED_SIZES else value
+        for key, value in sizes.items()
+    }
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class SyntheticDataBuilder:
+    """
+    Наполняет базу детерминированными синтетическими данными для профилирования.
+
+    Строки пишутся через bulk_create порциями по chunk_size, в памяти держатся
+    только идентификаторы. Table.save и Review.save не вызываются: QR-коды не
+    рендерятся, а рейтинги ресторанов пересчитываются одним UPDATE в конце.
+    """
+
+    def __init__(self, sizes=None, seed=42, chunk_size=5000, progress=None):
+        self.sizes = {**DEFAULT_SIZES, **(sizes or {})}
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.random = random.Random(seed)
+        self.now = timezone.now()
+        self.first = {}
+        self.counts = {}
+
+    def build(self):
+        self._build_cities()
+        self._build_users()
+        self._build_restaurants()
+        self._build_sections()
+        self._build_tables()
+        self._build_menu_types()
+        self._build_menus()
+        self._build_reservations()
+        self._build_orders()
+        self._build_notifications()
+        self._build_reviews()
+        self._build_banners()
+        self._build_offers()
+        self._build_offer_reservations()
+        return self
+
+    def _bulk(self, label, model, rows, on_chunk=None):
+        """Пишет строки порциями и возвращает первичные ключи созданных объектов."""
+        started = clock.monotonic()
+        total = 0
+        for chunk in chunked(rows, self.chunk_size):
+            created = model.objects.bulk_create(chunk)
+            self.first.setdefault(label, created[0])
+            if on_chunk:
+                on_chunk(created)
+            total += len(created)
+            yield from (obj.pk for obj in created)
+            if self.progress:
+                self.progress(label, total, clock.monotonic() - started)
+        self.counts[label] = self.counts.get(label, 0) + total
+
+    def _collect(self, label, model, rows, on_chunk=None, typecode='q'):
+        pks = self._bulk(label, model, rows, on_chunk)
+        return array(typecode, pks) if typecode else list(pks)
+
+    def _drain(self, label, model, rows, on_chunk=None):
+        for _ in self._bulk(label, model, rows, on_chunk):
+            pass
+
+    def _pick(self, ids):
+        return ids[self.random.randrange(len(ids))]
+
+    def _user_email(self, index):
+        return f'load{self.seed}_{index}@example.com'
+
+    def _user_phone(self, index):
+        return f'+7{self.seed % 1000:03d}{index:09d}'
+
+    def _build_cities(self):
+        self.city_ids = self._collect('cities', City, (
+            City(name=f'Город {i} [{self.seed}]', name_ru=f'Город {i}', name_kz=f'Қала {i}', position=i)
+            for i in range(1, self.sizes['cities'] + 1)
+        ))
+
+    def _build_users(self):
+        password = make_password('password')
+        self.user_ids = self._collect('users', User, (
+            User(
+                phone_number=self._user_phone(i),
+                username=f'load{self.seed}_{i}',
+                email=self._user_email(i),
+                city_id=self._pick(self.city_ids),
+                language=self.random.choice(['ru', 'kz']),
+                password=password,
+            )
+            for i in range(self.sizes['users'])
+        ))
+
+    def _build_restaurants(self):
+        self.restaurant_ids = self._collect('restaurants', Restaurant, (
+            Restaurant(
+                name=f'Ресторан {i}',
+                city_id=self._pick(self.city_ids),
+                description_ru='Описание ресторана ' * 10,
+                description_kz='Мейрамхана сипаттамасы ' * 10,
+                opening_time=time(10, 0),
+                closing_time=time(23, 0),
+                iiko_organization_id=str(uuid.UUID(int=self.random.getrandbits(128))),
+                external_menu_id=str(self.random.randint(1, 10 ** 6)),
+            )
+            for i in range(1, self.sizes['restaurants'] + 1)
+        ))
+
+    def _build_sections(self):
+        self.section_ids = self._collect('sections', Section, (
+            Section(restaurant_id=restaurant_id, name=f'Зал {i}')
+            for restaurant_id in self.restaurant_ids
+            for i in range(1, self.sizes['sections_per_restaurant'] + 1)
+        ))
+
+    def _build_tables(self):
+        sections_per_restaurant = self.sizes['sections_per_restaurant']
+        # (uuid стола, id ресторана): секции созданы подряд по ресторанам.
+        self.tables = [
+            (table_uuid, self.restaurant_ids[index // (sections_per_restaurant * self.sizes['tables_per_section'])])
+            for index, table_uuid in enumerate(self._bulk('tables', Table, (
+                Table(uuid=uuid.UUID(int=self.random.getrandbits(128)), section_id=section_id, number=number)
+                for section_id in self.section_ids
+                for number in range(1, self.sizes['tables_per_section'] + 1)
+            )))
+        ]
+
+    def _build_menu_types(self):
+        self.menu_type_ids = self._collect('menu_types', MenuType, (
+            MenuType(name_ru=f'Тип меню {i} [{self.seed}]', name_kz=f'Мәзір түрі {i}')
+            for i in range(1, self.sizes['menu_types'] + 1)
+        ))
+
+    def _build_menus(self):
+        self.menus_by_restaurant = {}
+
+        def remember(created):
+            for menu in created:
+                self.menus_by_restaurant.setdefault(menu.restaurant_id, []).append((menu.pk, menu.price))
+
+        self._drain('menus', Menu, (
+            Menu(
+                restaurant_id=restaurant_id,
+                menu_type_id=self._pick(self.menu_type_ids),
+                name_ru=f'Блюдо {i}',
+                name_kz=f'Тағам {i}',
+                description_ru='Описание блюда ' * 5,
+                description_kz='Тағам сипаттамасы ' * 5,
+                calories=self.random.randint(100, 1200),
+                proteins=Decimal(self.random.randint(0, 9999)) / 100,
+                fats=Decimal(self.random.randint(0, 9999)) / 100,
+                carbohydrates=Decimal(self.random.randint(0, 9999)) / 100,
+                price=Decimal(self.random.randint(500, 15000)),
+                is_available=self.random.random() > 0.1,
+                is_popular=self.random.random() < 0.2,
+            )
+            for restaurant_id in self.restaurant_ids
+            for i in range(1, self.sizes['menus_per_restaurant'] + 1)
+        ), on_chunk=remember)
+
+    def _sample_menus(self, restaurant_id, count):
+        menus = self.menus_by_restaurant.get(restaurant_id, [])
+        return self.random.sample(menus, min(count, len(menus)))
+
+    def _build_reservations(self):
+        today = self.now.date()
+        statuses = ReservationStatus.values
+
+        def rows():
+            for i in range(self.sizes['reservations']):
+                table_uuid, restaurant_id = self.random.choice(self.tables)
+                start_hour = self.random.randint(10, 20)
+                yield Reservation(
+                    restaurant_id=restaurant_id,
+                    table_id=table_uuid,
+                    reservation_date=today + timedelta(days=self.random.randint(-60, 60)),
+                    start_time=time(start_hour, 0),
+                    end_time=time(start_hour + 2, 0),
+                    guest_count=self.random.randint(1, 8),
+                    guest_name=f'Гость {i}',
+                    guest_phone=f'+7701{i:07d}',
+                    guest_email=f'guest{i}@example.com',
+                    status=self.random.choice(statuses),
+                )
+
+        def add_items(created):
+            self._drain('reservation_items', ReservationMenuItem, [
+                ReservationMenuItem(reservation_id=reservation.pk, menu_item_id=menu_id, quantity=self.random.randint(1, 3))
+                for reservation in created
+                for menu_id, _ in self._sample_menus(reservation.restaurant_id, self.sizes['reservation_items'])
+            ])
+
+        self.reservation_ids = self._collect('reservations', Reservation, rows(), on_chunk=add_items)
+
+    def _build_orders(self):
+        statuses = [choice for choice, _ in Order.STATUS_CHOICES]
+        restaurant_by_table = dict(self.tables)
+
+        def add_items(created):
+            self._drain('order_items', OrderItem, [
+                OrderItem(order_id=order.pk, menu_item_id=menu_id, quantity=self.random.randint(1, 3), price=price)
+                for order in created
+                for menu_id, price in self._sample_menus(restaurant_by_table[order.table_id], self.sizes['order_items'])
+            ])
+
+        self._drain('orders', Order, (
+            Order(
+                table_id=self.random.choice(self.tables)[0],
+                user_id=self._pick(self.user_ids) if self.random.random() < 0.5 else None,
+                status=self.random.choice(statuses),
+            )
+            for _ in range(self.sizes['orders'])
+        ), on_chunk=add_items)
+
+    def _build_notifications(self):
+        def rows():
+            for i in range(self.sizes['notifications']):
+                index = self.random.randrange(len(self.user_ids))
+                yield Notification(
+                    recipient_email=self._user_email(index),
+                    recipient_phone=self._user_phone(index),
+                    title=f'Уведомление {i}',
+                    message='Текст уведомления ' * 10,
+                    notification_type=self.random.choice(NotificationType.values),
+                    status=self.random.choice(NotificationStatus.values),
+                    reservation_id=self._pick(self.reservation_ids) if self.reservation_ids and self.random.random() < 0.7 else None,
+                    user_id=self.user_ids[index],
+                )
+
+        self._drain('notifications', Notification, rows())
+
+    def _build_reviews(self):
+        count = min(self.sizes['reviews_per_restaurant'], len(self.user_ids))
+        self._drain('reviews', Review, (
+            Review(
+                restaurant_id=restaurant_id,
+                user_id=self.user_ids[index],
+                rating=self.random.randint(1, 5),
+                comment='Отличное место',
+            )
+            for restaurant_id in self.restaurant_ids
+            for index in self.random.sample(range(len(self.user_ids)), count)
+        ))
+        self._update_ratings()
+
+    def _update_ratings(self):
+        """Пересчитывает агрегаты отзывов, которые Review.save обновил бы построчно."""
+        Restaurant.recompute_ratings(self.restaurant_ids)
+
+    def _build_banners(self):
+        positions = [choice for choice, _ in Banner.POSITION_CHOICES]
+        self._drain('banners', Banner, (
+            Banner(
+                title=f'Баннер {i}',
+                subtitle='Подзаголовок',
+                image=f'banners/synthetic/banner-{i}.jpg',
+                position=self.random.choice(positions),
+                priority=self.random.randint(1, 10),
+                start_date=self.now - timedelta(days=1),
+            )
+            for i in range(1, self.sizes['banners'] + 1)
+        ))
+
+    def _build_offers(self):
+        def add_items(created):
+            self._drain('offer_items', OfferItem, [
+                OfferItem(offer_id=offer.pk, description_ru=f'Позиция {i}', description_kz=f'Позиция {i}', order=i)
+                for offer in created
+                for i in range(self.sizes['offer_items'])
+            ])
+
+        self.offer_ids = self._collect('offers', Offer, (
+            Offer(
+                restaurant_id=restaurant_id,
+                title_ru=f'Предложение {i}',
+                title_kz=f'Ұсыныс {i}',
+                image=f'offers/images/synthetic-{restaurant_id}-{i}.jpg',
+                old_price=Decimal(20000),
+                new_price=Decimal(self.random.randint(8000, 19000)),
+                badge='-20%',
+                people_count=self.random.randint(1, 6),
+                offer_type=self.random.choice(OfferType.values),
+            )
+            for restaurant_id in self.restaurant_ids
+            for i in range(1, self.sizes['offers_per_restaurant'] + 1)
+        ), on_chunk=add_items)
+
+    def _build_offer_reservations(self):
+        if not self.offer_ids:
+            return
+        today = self.now.date()
+        self._drain('offer_reservations', OfferReservation, (
+            OfferReservation(
+                offer_id=self._pick(self.offer_ids),
+                user_id=self._pick(self.user_ids),
+                date=today + timedelta(days=self.random.randint(-30, 30)),
+                time=time(self.random.randint(10, 21), 0),
+                guest_count=1,
+                status=self.random.choice(['pending', 'confirmed', 'completed', 'cancelled']),
+            )
+            for _ in range(self.sizes['offer_reservations'])
+        ))
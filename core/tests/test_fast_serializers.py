@@ -0,0 +1,86 @@
+import time
+
+import pytest
+from django.core.cache import cache as django_cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+pytestmark = pytest.mark.django_db
+
+# Маршрут, параметры и пользователь (None - аноним, 'kz' - пользователь с казахским языком).
+CASES = [
+    ('products:menu-item-list', {}, None),
+    ('products:menu-item-list', {}, 'kz'),
+    ('products:menu-item-list', {'fields': 'id,name,restaurant_details,menu_type_details.name'}, None),
+    ('products:menu-item-list', {'expand': '', 'ordering': '-price'}, None),
+    ('products:menu-item-available', {}, None),
+    ('products:menu-item-available', {}, 'kz'),
+    ('products:menu-item-popular', {}, None),
+    ('offers:offer-list', {}, None),
+    ('offers:offer-list', {}, 'kz'),
+    ('offers:offer-list', {'fields': 'id,title,items.description,discount_percentage'}, None),
+    ('room:reservation-list', {}, None),
+    ('room:reservation-list', {'pagination': 'keyset', 'page_size': 100}, None),
+    ('room:reservation-list', {'pagination': 'keyset', 'page_size': 100}, 'kz'),
+    ('room:reservation-list', {'expand': 'table_details', 'fields': 'id,status_display,table_details.number'}, None),
+]
+# Замеров на сценарий, берётся лучший.
+REPEAT = 3
+
+REPORT_TITLE = 'Быстрые сериализаторы списков'
+REPORT_HEADER = f"{'Сценарий':<100}{'байт':>10}{'DRF, мс':>10}{'fast, мс':>10}{'ускорение':>11}"
+
+
+def _case_id(case):
+    name, params, language = case
+    return f"{name}{params or ''}{'[kz]' if language else ''}"
+
+
+def _first_difference(expected, actual):
+    if expected == actual:
+        return None
+    for index, (left, right) in enumerate(zip(expected, actual)):
+        if left != right:
+            return index
+    return min(len(expected), len(actual))
+
+
+def _measure(request, fast):
+    best, response = float('inf'), None
+    with override_settings(FAST_SERIALIZERS=fast):
+        for _ in range(REPEAT):
+            # Кэш ответов не должен подменять сериализацию.
+            django_cache.clear()
+            started = time.perf_counter()
+            response = request()
+            best = min(best, time.perf_counter() - started)
+    return response, best * 1000
+
+
+@pytest.mark.parametrize('case', CASES, ids=[_case_id(case) for case in CASES])
+def test_fast_serializer_matches_drf(case, synthetic_data, client, report):
+    name, params, language = case
+    headers = {}
+    if language:
+        user = synthetic_data.first['users']
+        user.language = language
+        user.save(update_fields=['language'])
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+    path = reverse(name)
+    request = lambda: client.get(path, params, **headers)
+    drf, drf_ms = _measure(request, fast=False)
+    fast, fast_ms = _measure(request, fast=True)
+
+    report(REPORT_TITLE, REPORT_HEADER, (
+        f'{_case_id(case)[:99]:<100}{len(drf.content):>10}{drf_ms:>10.1f}{fast_ms:>10.1f}{drf_ms / fast_ms:>10.1f}x'
+    ))
+
+    assert (drf.status_code, fast.status_code) == (200, 200)
+    difference = _first_difference(drf.content, fast.content)
+    assert difference is None, (
+        f'Вывод расходится с DRF с байта {difference}:\n'
+        f'DRF:  {drf.content[max(0, difference - 80):difference + 80]!r}\n'
+        f'fast: {fast.content[max(0, difference - 80):difference + 80]!r}'
+    )
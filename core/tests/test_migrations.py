@@ -0,0 +1,14 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+def test_models_match_migrations():
+    # Изменение модели без миграции: в проде колонки и индексы не появятся.
+    output = StringIO()
+    try:
+        call_command('makemigrations', check=True, dry_run=True, stdout=output)
+    except SystemExit:
+        pytest.fail(f'Модели расходятся с миграциями, нужен makemigrations:\n{output.getvalue()}')
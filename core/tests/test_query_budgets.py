@@ -0,0 +1,217 @@
+import gc
+import json
+import re
+import time
+import warnings
+from collections import Counter
+
+import pytest
+from django.core.cache import cache as django_cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, resolve, reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from restaurant.models import Table
+
+pytestmark = pytest.mark.django_db
+
+# Бюджет эндпоинта: имя маршрута, аргументы URL по набору данных, параметры,
+# допустимое число SQL-запросов и время в миллисекундах.
+# Число запросов не должно зависеть от объёма данных, поэтому бюджеты
+# задаются константами: N+1 в сериализаторе сразу выводит эндпоинт за лимит.
+# Для запросов с JWT в бюджет входит загрузка пользователя.
+# Бюджеты сняты на PostgreSQL: запись модели, за которой следит шина сброса
+# (core.invalidation.watch), добавляет SELECT pg_notify(...), поэтому на SQLite
+# запросов бывает меньше бюджета.
+# Некэшируемые списки с условным GET тратят ещё один запрос на MAX(updated_at) и COUNT(*).
+BUDGETS = [
+    {'name': 'city-list', 'queries': 2, 'ms': 150},
+    {'name': 'city-detail', 'kwargs': lambda d: {'pk': d.first['cities'].pk}, 'queries': 1, 'ms': 100},
+    {'name': 'restaurant:restaurant-list', 'queries': 2, 'ms': 200},
+    {'name': 'restaurant:restaurant-detail', 'kwargs': lambda d: {'pk': d.first['restaurants'].pk}, 'queries': 1, 'ms': 100},
+    {'name': 'restaurant:restaurant-top', 'params': lambda d: {'city': d.first['cities'].pk}, 'queries': 1, 'ms': 100},
+    {'name': 'restaurant:restaurant-reviews', 'kwargs': lambda d: {'pk': d.first['restaurants'].pk}, 'queries': 3, 'ms': 150},
+    {'name': 'restaurant:section-list', 'queries': 2, 'ms': 150},
+    {'name': 'restaurant:section-detail', 'kwargs': lambda d: {'pk': d.first['sections'].pk}, 'queries': 1, 'ms': 100},
+    {'name': 'restaurant:table-list', 'queries': 2, 'ms': 200},
+    {'name': 'restaurant:table-detail', 'kwargs': lambda d: {'pk': d.first['tables'].pk}, 'queries': 1, 'ms': 100},
+    {'name': 'restaurant:review-list', 'queries': 3, 'ms': 200},
+    {'name': 'restaurant:review-list', 'params': {'pagination': 'keyset'}, 'queries': 2, 'ms': 200},
+    {'name': 'restaurant:review-detail', 'kwargs': lambda d: {'pk': d.first['reviews'].pk}, 'queries': 1, 'ms': 100},
+    {'name': 'restaurant:review-my-reviews', 'auth': True, 'queries': 2, 'ms': 150},
+    {'name': 'products:menu-item-list', 'queries': 2, 'ms': 200},
+    {'name': 'products:menu-item-list', 'params': lambda d: {'restaurant': d.first['restaurants'].pk}, 'queries': 3, 'ms': 200},
+    {'name': 'products:menu-item-detail', 'kwargs': lambda d: {'pk': d.first['menus'].pk}, 'queries': 1, 'ms': 100},
+    {'name': 'products:menu-item-available', 'params': lambda d: {'restaurant': d.first['restaurants'].pk}, 'queries': 1, 'ms': 200},
+    {'name': 'products:menu-item-popular', 'params': lambda d: {'restaurant': d.first['restaurants'].pk}, 'queries': 1, 'ms': 200},
+    {'name': 'products:menu-type-list', 'queries': 2, 'ms': 150},
+    {'name': 'products:menu-type-detail', 'kwargs': lambda d: {'pk': d.first['menu_types'].pk}, 'queries': 1, 'ms': 100},
+    {'name': 'products:dish_details', 'skip': 'представление обращается к несуществующему полю MenuType.name'},
+    {'name': 'advertisement:api:banner-list', 'queries': 1, 'ms': 150},
+    {'name': 'advertisement:api:banner-detail', 'kwargs': lambda d: {'pk': d.first['banners'].pk}, 'queries': 1, 'ms': 100},
+    {'name': 'advertisement:api:banner-by-position', 'params': {'position': 'hero', 'limit': 5}, 'queries': 1, 'ms': 100},
+    {'name': 'room:reservation-list', 'queries': 3, 'ms': 250},
+    {'name': 'room:reservation-list', 'params': {'pagination': 'keyset'}, 'queries': 2, 'ms': 250},
+    {'name': 'room:reservation-list', 'params': {'expand': ''}, 'queries': 2, 'ms': 150},
+    {'name': 'room:reservation-detail', 'kwargs': lambda d: {'pk': d.first['reservations'].pk}, 'queries': 2, 'ms': 100},
+    {'name': 'room:reservation-my-reservations', 'params': lambda d: {'phone': d.first['reservations'].guest_phone}, 'queries': 2, 'ms': 150},
+    {'name': 'room:available-times', 'params': lambda d: {
+        'restaurant': d.first['reservations'].restaurant_id,
+        'table': d.first['reservations'].table_id,
+        'date': d.first['reservations'].reservation_date.isoformat(),
+    }, 'queries': 7, 'ms': 150},
+    {'name': 'room:check-conflict', 'method': 'post', 'data': lambda d: {
+        'table': str(d.first['reservations'].table_id),
+        'reservation_date': d.first['reservations'].reservation_date.isoformat(),
+        'start_time': '12:00',
+        'end_time': '14:00',
+    }, 'queries': 1, 'ms': 100},
+    {'name': 'room:restaurant-tables', 'kwargs': lambda d: {'restaurant_id': d.first['restaurants'].pk}, 'queries': 3, 'ms': 200},
+    {'name': 'room:table-availability', 'skip': 'представление фильтрует по несуществующему полю Table.capacity'},
+    {'name': 'offers:offer-list', 'queries': 3, 'ms': 200},
+    {'name': 'offers:offer-detail', 'kwargs': lambda d: {'pk': d.first['offers'].pk}, 'queries': 2, 'ms': 100},
+    {'name': 'offers:offer-by-city', 'params': lambda d: {'city_id': d.first['cities'].pk}, 'queries': 3, 'ms': 250},
+    {'name': 'offers:offer-available-tables', 'kwargs': lambda d: {'pk': d.first['offers'].pk}, 'params': lambda d: {
+        'date': d.now.date().isoformat(),
+        'time': '19:00',
+    }, 'queries': 4, 'ms': 200},
+    {'name': 'offers:offer-item-list', 'auth': True, 'queries': 3, 'ms': 150},
+    {'name': 'notifications:notification-list', 'auth': True, 'queries': 4, 'ms': 200},
+    {'name': 'notifications:notification-list', 'auth': True, 'params': {'pagination': 'keyset'}, 'queries': 3, 'ms': 200},
+    {'name': 'notifications:notification-unread', 'auth': True, 'queries': 2, 'ms': 200},
+    {'name': 'notifications:guest-notifications', 'skip': 'маршрут перекрыт detail-маршрутом NotificationViewSet'},
+    {'name': 'user-list', 'skip': 'маршрут перекрыт api-root роутера профиля'},
+    {'name': 'user-detail', 'auth': True, 'kwargs': lambda d: {'pk': d.first['users'].pk}, 'queries': 2, 'ms': 100},
+    {'name': 'user-me', 'auth': True, 'queries': 2, 'ms': 100},
+    {'name': 'profile-me', 'auth': True, 'queries': 2, 'ms': 100},
+    {'name': 'table_service:table_service', 'kwargs': lambda d: {'table_uuid': d.first['orders'].table_id}, 'queries': 2, 'ms': 200},
+    {'name': 'table_service:menu', 'kwargs': lambda d: {'table_uuid': d.first['orders'].table_id}, 'queries': 3, 'ms': 250},
+    {'name': 'table_service:bill', 'kwargs': lambda d: {'table_uuid': d.first['orders'].table_id}, 'queries': 2, 'ms': 200},
+    {'name': 'table_service:review', 'kwargs': lambda d: {'table_uuid': d.first['orders'].table_id}, 'queries': 1, 'ms': 150},
+    {'name': 'table_service:api_menu_items', 'kwargs': lambda d: {'table_uuid': d.first['orders'].table_id}, 'queries': 3, 'ms': 200},
+    {'name': 'table_service:api_order_status', 'kwargs': lambda d: {'table_uuid': d.first['orders'].table_id}, 'queries': 4, 'ms': 150},
+    {'name': 'table_service:call_waiter', 'method': 'post', 'kwargs': lambda d: {'table_uuid': d.first['tables'].pk}, 'queries': 3, 'ms': 100},
+    {'name': 'table_service:request_bill', 'method': 'post', 'kwargs': lambda d: {'table_uuid': d.first['tables'].pk}, 'queries': 3, 'ms': 100},
+    {'name': 'table_service:api_add_to_order', 'method': 'post', 'kwargs': lambda d: {'table_uuid': d.first['tables'].pk}, 'data': lambda d: {
+        'menu_item_id': d.first['menus'].pk,
+        'quantity': 2,
+    }, 'queries': 10, 'ms': 200},
+    # Отзыв и рейтинг ресторана пишутся в одной транзакции. Внутри тестовой транзакции
+    # она открывается как SAVEPOINT и закрывается RELEASE SAVEPOINT - оба считаются запросами.
+    {'name': 'table_service:api_submit_review', 'method': 'post', 'kwargs': lambda d: {'table_uuid': d.first['tables'].pk}, 'data': {
+        'rating': 5,
+        'comment': 'Проверка бюджета',
+    }, 'queries': 6, 'ms': 200},
+    # Пакет стоит столько же, сколько его подзапросы: пользователь загружается один раз на весь пакет.
+    {'name': 'batch', 'method': 'post', 'auth': True, 'data': {'requests': [
+        {'path': '/api/v1/cities/'},
+        {'path': '/api/v1/products/menu-items/'},
+        {'path': '/api/v1/notifications/unread/'},
+    ]}, 'queries': 7, 'ms': 250},
+    {'name': 'chat', 'skip': 'обращается к внешнему API Gemini'},
+    {'name': 'chat-history', 'auth': True, 'queries': 2, 'ms': 150},
+    {'name': 'checkout-session', 'skip': 'обращается к внешнему API Stripe'},
+    {'name': 'payment-success', 'skip': 'обращается к внешнему API Stripe'},
+    {'name': 'google_login', 'skip': 'обращается к внешнему API Google'},
+]
+
+# Маршруты, для которых бюджет не имеет смысла: админка и документация.
+IGNORED_PREFIXES = ('admin:', 'schema-', 'advertisement_templates:')
+
+REPORT_TITLE = 'Бюджеты SQL-запросов и времени ответа'
+REPORT_HEADER = f"{'Маршрут':<42}{'Представление':<28}{'Сериализатор':<28}{'HTTP':>6}{'SQL':>10}{'мс':>14}"
+
+
+def _resolve_value(value, dataset):
+    return value(dataset) if callable(value) else value
+
+
+def _walk_names(patterns, namespace=''):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            nested = f'{namespace}{pattern.namespace}:' if pattern.namespace else namespace
+            yield from _walk_names(pattern.url_patterns, nested)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield f'{namespace}{pattern.name}'
+
+
+def _describe_view(path):
+    match = resolve(path)
+    view_class = getattr(match.func, 'cls', None) or getattr(match.func, 'view_class', None)
+    if view_class is None:
+        return match.func.__name__, '-'
+
+    serializer_class = getattr(view_class, 'serializer_class', None)
+    actions = getattr(match.func, 'actions', None) or {}
+    handler = getattr(view_class, next(iter(actions.values()), ''), None)
+    serializer_class = (getattr(handler, 'kwargs', {}) or {}).get('serializer_class', serializer_class)
+    return view_class.__name__, serializer_class.__name__ if serializer_class else '-'
+
+
+@pytest.fixture
+def staff_token(synthetic_data):
+    # В проде у каждого стола уже есть QR, иначе Table.save отрисует его прямо в запросе.
+    Table.objects.filter(pk=synthetic_data.first['tables'].pk).update(qr='qr_codes/budget-check.png')
+
+    staff = synthetic_data.first['users']
+    staff.is_staff = True
+    staff.save(update_fields=['is_staff'])
+    return str(RefreshToken.for_user(staff).access_token)
+
+
+@pytest.mark.parametrize('budget', BUDGETS, ids=[budget['name'] for budget in BUDGETS])
+def test_query_budget(budget, synthetic_data, staff_token, client, report, pytestconfig):
+    if budget.get('skip'):
+        pytest.skip(budget['skip'])
+
+    path = reverse(budget['name'], kwargs=_resolve_value(budget.get('kwargs'), synthetic_data))
+    view, serializer = _describe_view(path)
+
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {staff_token}'} if budget.get('auth') else {}
+    method = budget.get('method', 'get')
+    if method == 'get':
+        params = _resolve_value(budget.get('params'), synthetic_data) or {}
+        request = lambda: client.get(path, params, **headers)
+    else:
+        payload = json.dumps(_resolve_value(budget.get('data'), synthetic_data) or {})
+        request = lambda: getattr(client, method)(path, payload, content_type='application/json', **headers)
+
+    # Кэшированные эндпоинты меряются по пути промаха.
+    django_cache.clear()
+    # Полная сборка мусора по куче тестового процесса не должна попадать в замер.
+    gc.collect()
+
+    with CaptureQueriesContext(connection) as captured:
+        started = time.perf_counter()
+        response = request()
+        elapsed = (time.perf_counter() - started) * 1000
+    queries = len(captured.captured_queries)
+
+    report(REPORT_TITLE, REPORT_HEADER, (
+        f"{budget['name']:<42}{view:<28}{serializer:<28}{response.status_code:>6}"
+        f"{queries:>5}/{budget['queries']:<4}{elapsed:>7.0f}/{budget['ms']:<6}"
+    ))
+
+    assert response.status_code < 500, f"{budget['name']}: HTTP {response.status_code}"
+    # Одинаковые запросы с разными id - типичный признак N+1.
+    shapes = Counter(re.sub(r'\b\d+\b', 'N', query['sql']) for query in captured.captured_queries)
+    repeated = '\n'.join(f'    x{count} {sql[:160]}' for sql, count in shapes.most_common() if count > 1)
+    assert queries <= budget['queries'], (
+        f"{budget['name']} ({view}, {serializer}): {queries} SQL-запросов при бюджете {budget['queries']}\n{repeated}"
+    )
+    if not pytestconfig.getoption('no_time_budget'):
+        assert elapsed <= budget['ms'], f"{budget['name']} ({view}): {elapsed:.0f} мс при бюджете {budget['ms']} мс"
+
+
+def test_budgets_cover_routes():
+    routes = set(_walk_names(get_resolver().url_patterns))
+    budgeted = {budget['name'] for budget in BUDGETS}
+    assert not budgeted - routes, f"Бюджеты для несуществующих маршрутов: {', '.join(sorted(budgeted - routes))}"
+
+    missing = sorted(
+        name for name in routes
+        if name not in budgeted and not name.startswith(IGNORED_PREFIXES) and not name.endswith('api-root')
+    )
+    if missing:
+        warnings.warn(f"Маршруты без бюджета: {', '.join(missing)}")
@@ -0,0 +1,409 @@
+import atexit
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+import orjson
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Виды спанов OTLP.
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+STATUS_OK, STATUS_ERROR = 1, 2
+MAX_STATEMENT_LENGTH = 2000
+EXPORT_BATCH = 100
+EXPORT_QUEUE_SIZE = 1000
+
+
+class Span:
+    __slots__ = ('span_id', 'parent_id', 'name', 'kind', 'start', 'end', 'attributes', 'status', 'message')
+
+    def __init__(self, name, kind, parent_id, attributes):
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.status = None
+        self.message = None
+        self.start = time.time_ns()
+        self.end = None
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    def fail(self, exc):
+        self.status = STATUS_ERROR
+        self.message = f'{type(exc).__name__}: {exc}'
+
+
+class Trace:
+    __slots__ = ('trace_id', 'spans', 'dropped')
+
+    def __init__(self, trace_id=None):
+        self.trace_id = trace_id or f'{random.getrandbits(128):032x}'
+        self.spans = []
+        self.dropped = 0
+
+
+# Текущий трейс и спан. ContextVar переходит и в потоки sync_to_async.
+_trace = ContextVar('epicure_trace', default=None)
+_span = ContextVar('epicure_span', default=None)
+
+
+def enabled():
+    return bool(settings.TRACE_EXPORT)
+
+
+def current_trace_id():
+    trace = _trace.get()
+    return trace.trace_id if trace is not None else None
+
+
+@contextmanager
+def span(name, kind=INTERNAL, **attributes):
+    """Вложенный спан текущего трейса; вне трейса ничего не делает."""
+    trace = _trace.get()
+    if trace is None:
+        yield None
+        return
+    if len(trace.spans) >= settings.TRACE_MAX_SPANS:
+        trace.dropped += 1
+        yield None
+        return
+
+    parent = _span.get()
+    current = Span(name, kind, parent.span_id if parent else None, attributes)
+    trace.spans.append(current)
+    token = _span.set(current)
+    try:
+        yield current
+    except Exception as e:
+        current.fail(e)
+        raise
+    finally:
+        _span.reset(token)
+        current.end = time.time_ns()
+
+
+@contextmanager
+def start_trace(name, kind=SERVER, parent=None, sampled=None, **attributes):
+    """
+    Корневой спан нового трейса. parent - (trace_id, span_id) из traceparent.
+    Без явного sampled трейс попадает в выборку с вероятностью TRACE_SAMPLE_RATE.
+    Внутри другого трейса это обычный вложенный спан.
+    """
+    if _trace.get() is not None:
+        with span(name, kind, **attributes) as current:
+            yield current
+        return
+    if sampled is None:
+        sampled = random.random() < settings.TRACE_SAMPLE_RATE
+    if not enabled() or not sampled:
+        yield None
+        return
+
+    trace = Trace(parent[0] if parent else None)
+    trace_token = _trace.set(trace)
+    span_token = _span.set(None)
+    try:
+        with span(name, kind, **attributes) as root:
+            if parent:
+                root.parent_id = parent[1]
+            yield root
+    finally:
+        _span.reset(span_token)
+        _trace.reset(trace_token)
+        if trace.dropped:
+            trace.spans[0].set('epicure.dropped_spans', trace.dropped)
+        _get_exporter().submit(trace)
+
+
+def traced(name):
+    """
+    Декоратор фоновых задач: каждый запуск - отдельный трейс в выборке.
+    Имя задачи также указывается источником медленных запросов.
+    """
+    from core.slow_queries import task_origin
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with task_origin(name), start_trace(name, kind=INTERNAL, sampled=True):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def parse_traceparent(header):
+    """W3C traceparent -> ((trace_id, span_id), sampled); некорректный заголовок игнорируется."""
+    parts = (header or '').strip().split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None, None
+    try:
+        flags = int(parts[3], 16)
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None, None
+    return (parts[1], parts[2]), bool(flags & 1)
+
+
+def _attribute(key, value):
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+
+def _span_json(trace, span):
+    data = {
+        'traceId': trace.trace_id,
+        'spanId': span.span_id,
+        'name': span.name,
+        'kind': span.kind,
+        'startTimeUnixNano': str(span.start),
+        'endTimeUnixNano': str(span.end or span.start),
+        'attributes': [_attribute(key, value) for key, value in span.attributes.items()],
+    }
+    if span.parent_id:
+        data['parentSpanId'] = span.parent_id
+    if span.status is not None:
+        data['status'] = {'code': span.status, 'message': span.message or ''}
+    return data
+
+
+def to_otlp(traces):
+    """Трейсы в формате OTLP/JSON (ExportTraceServiceRequest)."""
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': [
+                _attribute('service.name', settings.TRACE_SERVICE_NAME),
+                _attribute('process.pid', os.getpid()),
+            ]},
+            'scopeSpans': [{
+                'scope': {'name': 'core.tracing'},
+                'spans': [_span_json(trace, span) for trace in traces for span in trace.spans],
+            }],
+        }],
+    }
+
+
+class Exporter(threading.Thread):
+    """
+    Отправляет трейсы из очереди пачками вне запроса: в файл JSON Lines
+    (TRACE_EXPORT=file:///путь, формат приёмника otlpjsonfile) или
+    POST-ом на OTLP/HTTP (TRACE_EXPORT=http://collector:4318/v1/traces).
+    При переполненной очереди новые трейсы отбрасываются.
+    """
+
+    def __init__(self, target):
+        super().__init__(name='trace-exporter', daemon=True)
+        self.target = target
+        self.pid = os.getpid()
+        self.queue = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+
+    def submit(self, trace):
+        try:
+            self.queue.put_nowait(trace)
+        except queue.Full:
+            logger.warning('Очередь экспорта трейсов переполнена, трейс отброшен')
+
+    def run(self):
+        while True:
+            self._export_batch([self.queue.get()])
+
+    def flush(self):
+        """Выгружает остаток очереди при завершении процесса (разовые задачи, команды)."""
+        while not self.queue.empty():
+            self._export_batch([])
+
+    def _export_batch(self, batch):
+        while len(batch) < EXPORT_BATCH:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            try:
+                self.export(orjson.dumps(to_otlp(batch)))
+            except Exception as e:
+                logger.warning(f'Не удалось экспортировать {len(batch)} трейсов: {e}')
+
+    def export(self, payload):
+        if self.target.startswith('file://'):
+            with open(self.target[len('file://'):], 'ab') as stream:
+                stream.write(payload + b'\n')
+            return
+        request = urllib.request.Request(
+            self.target, data=payload, method='POST', headers={'Content-Type': 'application/json'},
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            response.read()
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def _get_exporter():
+    global _exporter
+    if _exporter is None or _exporter.pid != os.getpid():
+        with _exporter_lock:
+            if _exporter is None or _exporter.pid != os.getpid():
+                _exporter = Exporter(settings.TRACE_EXPORT)
+                _exporter.start()
+                atexit.register(_exporter.flush)
+    return _exporter
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    if _trace.get() is None:
+        return execute(sql, params, many, context)
+    connection = context['connection']
+    with span('db.query', CLIENT, **{
+        'db.system': connection.vendor,
+        'db.name': connection.alias,
+        'db.statement': sql[:MAX_STATEMENT_LENGTH],
+        'db.operation': sql.lstrip().split(' ', 1)[0].upper(),
+    }):
+        return execute(sql, params, many, context)
+
+
+def _install_sql_wrapper(sender, connection, **kwargs):
+    if _sql_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_sql_wrapper)
+
+
+def _instrument_templates():
+    from django.template.backends.django import Template
+
+    render = Template.render
+
+    @wraps(render)
+    def traced_render(self, context=None, request=None):
+        name = self.template.name or '<string>'
+        with span(f'template {name}', **{'template.name': name}):
+            return render(self, context, request)
+    Template.render = traced_render
+
+
+def _instrument_serializers():
+    from rest_framework.serializers import BaseSerializer
+
+    data = BaseSerializer.data.fget
+
+    @wraps(data)
+    def traced_data(self):
+        # Вложенные .data (сериализаторы внутри SerializerMethodField) входят в спан внешнего.
+        current = _span.get()
+        if _trace.get() is None or (current is not None and current.name.startswith('serialize ')):
+            return data(self)
+        serializer = getattr(self, 'child', self)
+        with span(f'serialize {type(serializer).__name__}', **{'serializer.many': serializer is not self}):
+            return data(self)
+    BaseSerializer.data = property(traced_data)
+
+
+def install():
+    """Подключает спаны SQL, шаблонов и сериализаторов, если трейсинг включён."""
+    if not enabled():
+        return
+    connection_created.connect(_install_sql_wrapper, dispatch_uid='tracing_sql_wrapper')
+    _instrument_templates()
+    _instrument_serializers()
+
+
+class _TracingMiddlewareBase:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+
+class TracingMiddleware(_TracingMiddlewareBase):
+    """
+    Корневой спан запроса. Ставится первым в MIDDLEWARE: всё, что вне спана
+    view (его открывает ViewSpanMiddleware), - время middleware. В выборку
+    запрос попадает по заголовку traceparent с флагом sampled или с
+    вероятностью TRACE_SAMPLE_RATE; id трейса возвращается в X-Trace-Id.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with self._trace(request) as root:
+            response = self.get_response(request)
+            self._finish(request, response, root)
+        return response
+
+    async def __acall__(self, request):
+        with self._trace(request) as root:
+            response = await self.get_response(request)
+            self._finish(request, response, root)
+        return response
+
+    @staticmethod
+    def _trace(request):
+        parent, sampled = parse_traceparent(request.META.get('HTTP_TRACEPARENT'))
+        return start_trace(
+            f'{request.method} {request.path}', SERVER, parent=parent, sampled=sampled,
+            **{'http.method': request.method, 'url.path': request.path},
+        )
+
+    @staticmethod
+    def _finish(request, response, root):
+        if root is None:
+            return
+        from core.metrics import get_view_name
+
+        view = get_view_name(request)
+        root.name = f'{request.method} {view}'
+        root.set('http.route', view)
+        root.set('http.status_code', response.status_code)
+        if response.status_code >= 500:
+            root.status = STATUS_ERROR
+        response['X-Trace-Id'] = current_trace_id()
+
+
+class ViewSpanMiddleware(_TracingMiddlewareBase):
+    """Спан вызова представления; ставится последним в MIDDLEWARE."""
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with span('view') as current:
+            response = self.get_response(request)
+            self._name(request, current)
+        return response
+
+    async def __acall__(self, request):
+        with span('view') as current:
+            response = await self.get_response(request)
+            self._name(request, current)
+        return response
+
+    @staticmethod
+    def _name(request, current):
+        match = getattr(request, 'resolver_match', None)
+        if current is not None and match is not None:
+            current.name = f'view {match.view_name or match._func_path}'
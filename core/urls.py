@@ -6,6 +6,9 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from users.template_views import home_view
+from core.batch import BatchView
+from core.metrics import metrics_view
+from core.openapi import schema_file_view
 
 api_info = openapi.Info(
     title="Epicure API",
@@ -29,6 +32,7 @@ api_url_patterns = [
         path('offers/', include('offers.urls', namespace='offers')),
         path('chat/', include('chat.urls')),
         path('notifications/', include('notifications.urls', namespace='notifications')),
+        path('batch/', BatchView.as_view(), name='batch'),
     ])),
 ]
 
@@ -42,6 +46,7 @@ schema_view = get_schema_view(
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('', include('table_service.urls')),
 
 
@@ -56,11 +61,12 @@ urlpatterns = [
         path('offers/', include('offers.urls', namespace='offers')),
         path('chat/', include('chat.urls')),
         path('notifications/', include('notifications.urls', namespace='notifications')),
+        path('batch/', BatchView.as_view(), name='batch'),
     ])),
 
 
     path('api/docs/', include([
-        re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
+        re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_file_view, name='schema-json'),
         path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
         path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
     ])),
@@ -8,6 +8,12 @@ echo "PostgreSQL started"
 
 python manage.py makemigrations
 python manage.py migrate
+python manage.py recompute_ratings --missing
 python manage.py collectstatic --noinput
+python manage.py generate_openapi_schema
+
+if [ "$WEB_SERVER" = "asgi" ]; then
+  exec gunicorn core.asgi:application -c gunicorn.conf.py
+fi
 
 python manage.py runserver 0.0.0.0:8000
\ No newline at end of file
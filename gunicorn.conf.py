@@ -0,0 +1,34 @@
+"""
+Профиль gunicorn с воркерами uvicorn для ASGI (core.asgi).
+
+Каждый воркер - отдельный процесс с циклом событий: асинхронные
+представления table_service обслуживают много гостей одновременно без
+потока на запрос. Синхронные представления Django выполняет в пуле потоков.
+
+    gunicorn core.asgi:application -c gunicorn.conf.py
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = 'uvicorn_worker.UvicornWorker'
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+
+# Воркер перезапускается после N запросов, jitter разносит перезапуски во времени.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def child_exit(server, worker):
+    # Метрики завершившегося воркера не должны остаться в PROMETHEUS_MULTIPROC_DIR как живые gauge.
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
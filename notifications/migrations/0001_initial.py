@@ -0,0 +1,139 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("room", "0002_reservation_room_reserv_reserva_c25452_idx_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Notification",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "recipient_email",
+                    models.EmailField(max_length=254, verbose_name="Email получателя"),
+                ),
+                (
+                    "recipient_phone",
+                    models.CharField(
+                        blank=True,
+                        max_length=20,
+                        null=True,
+                        verbose_name="Телефон получателя",
+                    ),
+                ),
+                ("title", models.CharField(max_length=255, verbose_name="Заголовок")),
+                ("message", models.TextField(verbose_name="Сообщение")),
+                (
+                    "notification_type",
+                    models.CharField(
+                        choices=[
+                            ("welcome", "Приветственное сообщение"),
+                            ("payment_success", "Успешная оплата"),
+                            ("reservation_reminder", "Напоминание о бронировании"),
+                            ("reservation_created", "Бронирование создано"),
+                            ("reservation_canceled", "Бронирование отменено"),
+                            ("reservation_confirmed", "Бронирование подтверждено"),
+                        ],
+                        max_length=30,
+                        verbose_name="Тип уведомления",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "В ожидании"),
+                            ("sent", "Отправлено"),
+                            ("read", "Прочитано"),
+                            ("failed", "Ошибка"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                        verbose_name="Статус уведомления",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Дата обновления"),
+                ),
+                (
+                    "read_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Дата прочтения"
+                    ),
+                ),
+                (
+                    "reservation",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="notifications",
+                        to="room.reservation",
+                        verbose_name="Бронирование",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="notifications",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Уведомление",
+                "verbose_name_plural": "Уведомления",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["notification_type"],
+                        name="notificatio_notific_f2898f_idx",
+                    ),
+                    models.Index(
+                        fields=["status"], name="notificatio_status_d92267_idx"
+                    ),
+                    models.Index(
+                        fields=["recipient_email"],
+                        name="notificatio_recipie_86db99_idx",
+                    ),
+                    models.Index(
+                        fields=["created_at"], name="notificatio_created_46ad24_idx"
+                    ),
+                    models.Index(
+                        fields=["-created_at", "-id"],
+                        name="notificatio_created_cf8b4e_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -66,6 +66,7 @@ class Notification(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['recipient_email']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['-created_at', '-id']),
         ]
     
     def __str__(self):
@@ -74,12 +75,12 @@ class Notification(models.Model):
     def mark_as_read(self):
         self.status = NotificationStatus.READ
         self.read_at = timezone.now()
-        self.save(update_fields=['status', 'read_at'])
+        self.save(update_fields=['status', 'read_at', 'updated_at'])
     
     def mark_as_sent(self):
         self.status = NotificationStatus.SENT
-        self.save(update_fields=['status'])
+        self.save(update_fields=['status', 'updated_at'])
     
     def mark_as_failed(self):
         self.status = NotificationStatus.FAILED
-        self.save(update_fields=['status'])
\ No newline at end of file
+        self.save(update_fields=['status', 'updated_at'])
\ No newline at end of file
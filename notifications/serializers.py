@@ -2,9 +2,10 @@ from rest_framework import serializers
 from django.utils import timezone
 
 from .models import Notification
+from core.serializers import SparseFieldsetMixin
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     notification_type_display = serializers.CharField(source='get_notification_type_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     reservation_details = serializers.SerializerMethodField()
@@ -21,6 +22,8 @@ class NotificationSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'read_at'
         ]
         read_only_fields = ['created_at', 'updated_at', 'read_at']
+        related_paths = {'reservation_details': ['reservation__restaurant']}
+        expandable_fields = ['reservation_details']
     
     def get_reservation_details(self, obj):
         if obj.reservation:
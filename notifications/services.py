@@ -7,6 +7,7 @@ from django.utils import timezone
 import logging
 from datetime import timedelta
 
+from core.metrics import observe_external
 from .models import Notification, NotificationType, NotificationStatus
 from room.models import Reservation, ReservationStatus
 
@@ -178,24 +179,25 @@ class NotificationService:
             )
             plain_message = strip_tags(html_message)
             
-            if settings.DEBUG and settings.EMAIL_BACKEND == 'django.core.mail.backends.console.EmailBackend':
-                send_mail(
-                    subject=notification.title,
-                    message=plain_message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[notification.recipient_email],
-                    html_message=html_message,
-                    fail_silently=True,
-                )
-            else:
-                send_mail(
-                    subject=notification.title,
-                    message=plain_message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[notification.recipient_email],
-                    html_message=html_message,
-                    fail_silently=False,
-                )
+            with observe_external('smtp', 'send_mail'):
+                if settings.DEBUG and settings.EMAIL_BACKEND == 'django.core.mail.backends.console.EmailBackend':
+                    send_mail(
+                        subject=notification.title,
+                        message=plain_message,
+                        from_email=settings.DEFAULT_FROM_EMAIL,
+                        recipient_list=[notification.recipient_email],
+                        html_message=html_message,
+                        fail_silently=True,
+                    )
+                else:
+                    send_mail(
+                        subject=notification.title,
+                        message=plain_message,
+                        from_email=settings.DEFAULT_FROM_EMAIL,
+                        recipient_list=[notification.recipient_email],
+                        html_message=html_message,
+                        fail_silently=False,
+                    )
             
             notification.mark_as_sent()
             logger.info(f"Отправлено email-уведомление: {notification.id}")
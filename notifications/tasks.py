@@ -5,6 +5,7 @@ from django.utils import timezone
 from django.db import transaction
 from django.db.models import Q
 
+from core.tracing import traced
 from .models import Notification, NotificationStatus, NotificationType
 from .services import NotificationService
 from room.models import Reservation, ReservationStatus
@@ -12,6 +13,7 @@ from room.models import Reservation, ReservationStatus
 logger = logging.getLogger(__name__)
 
 
+@traced('notifications.send_reservation_reminders')
 def send_reservation_reminders():
     logger.info("Запущена задача отправки напоминаний о бронированиях")
     start_time = timezone.now()
@@ -27,6 +29,7 @@ def send_reservation_reminders():
         return {"success": False, "error": str(e)}
 
 
+@traced('notifications.resend_failed_notifications')
 def resend_failed_notifications():
     logger.info("Запущена задача повторной отправки неудачных уведомлений")
     start_time = timezone.now()
@@ -56,6 +59,7 @@ def resend_failed_notifications():
         return {"success": False, "error": str(e)}
 
 
+@traced('notifications.clean_old_notifications')
 def clean_old_notifications():
     logger.info("Запущена задача очистки старых уведомлений")
     start_time = timezone.now()
@@ -76,6 +80,7 @@ def clean_old_notifications():
         return {"success": False, "error": str(e)}
 
 
+@traced('notifications.send_daily_summary_to_users')
 def send_daily_summary_to_users():
     logger.info("Запущена задача отправки дневных сводок пользователям")
     start_time = timezone.now()
@@ -9,6 +9,10 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 import logging
 
+from core.conditional import ConditionalGetMixin, conditional_get
+from core.pagination import SelectablePagination
+from core.query_plan import QueryPlanMixin
+from core.ratelimit import rate_limit
 from .models import Notification, NotificationStatus
 from .serializers import NotificationSerializer
 from .services import NotificationService
@@ -16,18 +20,24 @@ from .services import NotificationService
 logger = logging.getLogger(__name__)
 
 
-class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+class NotificationViewSet(ConditionalGetMixin, QueryPlanMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = SelectablePagination
+    # Бронь и название её ресторана вложены в ответ, time_since меняется с течением времени.
+    conditional_related = ('reservation',)
+    conditional_namespaces = ('restaurants',)
+    conditional_period = 60
     
     def get_queryset(self):
         user = self.request.user
         if user.is_authenticated:
-            return Notification.objects.filter(
+            return self.plan_queryset(Notification.objects.filter(
                 Q(user=user) | Q(recipient_email=user.email)
-            ).select_related('reservation').order_by('-created_at')
+            ).order_by('-created_at'))
         return Notification.objects.none()
     
+    @conditional_get
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
         page = self.paginate_queryset(queryset)
@@ -38,6 +48,10 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
         
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
+
+    @conditional_get
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
     
     @swagger_auto_schema(
         responses={
@@ -97,7 +111,7 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
         )
         
         now = timezone.now()
-        updated_count = queryset.update(status=NotificationStatus.READ, read_at=now)
+        updated_count = queryset.update(status=NotificationStatus.READ, read_at=now, updated_at=now)
         
         logger.info(f"Пользователь {user.id} отметил все уведомления как прочитанные ({updated_count} уведомлений)")
         
@@ -108,7 +122,9 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
         })
 
 
-class GuestNotificationsView(generics.ListAPIView):
+# Поиск по email или телефону: без лимита позволяет перебирать чужие контакты.
+@rate_limit('guest-notifications', '10/m')
+class GuestNotificationsView(QueryPlanMixin, generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [AllowAny]
     
@@ -136,7 +152,7 @@ class GuestNotificationsView(generics.ListAPIView):
         if phone:
             queryset = queryset.filter(recipient_phone=phone)
             
-        return queryset.order_by('-created_at')
+        return self.plan_queryset(queryset.order_by('-created_at'))
     
     def list(self, request, *args, **kwargs):
         email = request.query_params.get('email')
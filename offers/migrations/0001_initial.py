@@ -0,0 +1,303 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("restaurant", "0003_review_restaurant__created_49afb3_idx_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Offer",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "title_ru",
+                    models.CharField(max_length=100, verbose_name="Название (Русский)"),
+                ),
+                (
+                    "title_kz",
+                    models.CharField(
+                        blank=True,
+                        max_length=100,
+                        null=True,
+                        verbose_name="Название (Казахский)",
+                    ),
+                ),
+                (
+                    "image",
+                    models.ImageField(
+                        upload_to="offers/images/", verbose_name="Фото предложения"
+                    ),
+                ),
+                (
+                    "old_price",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=10, verbose_name="Старая цена"
+                    ),
+                ),
+                (
+                    "new_price",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=10, verbose_name="Новая цена"
+                    ),
+                ),
+                (
+                    "badge",
+                    models.CharField(
+                        help_text='Например: "Хит", "-20%", "Быстро"',
+                        max_length=50,
+                        verbose_name="Значок предложения",
+                    ),
+                ),
+                (
+                    "people_count",
+                    models.PositiveSmallIntegerField(
+                        default=1,
+                        help_text="На сколько человек рассчитано предложение",
+                        verbose_name="Количество человек",
+                    ),
+                ),
+                (
+                    "per_person",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Указывать ли цену за человека или за всё предложение",
+                        verbose_name="Цена за человека",
+                    ),
+                ),
+                (
+                    "offer_type",
+                    models.CharField(
+                        choices=[
+                            ("romantic", "Романтический"),
+                            ("family", "Семейный"),
+                            ("business", "Бизнес"),
+                            ("celebration", "Праздничный"),
+                            ("special", "Специальный"),
+                        ],
+                        default="special",
+                        max_length=20,
+                        verbose_name="Тип предложения",
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(default=True, verbose_name="Активно"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Дата обновления"),
+                ),
+                (
+                    "restaurant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="offers",
+                        to="restaurant.restaurant",
+                        verbose_name="Ресторан",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Пакетное предложение",
+                "verbose_name_plural": "Пакетные предложения",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="OfferItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "description_ru",
+                    models.CharField(
+                        max_length=255, verbose_name="Описание элемента (Русский)"
+                    ),
+                ),
+                (
+                    "description_kz",
+                    models.CharField(
+                        blank=True,
+                        max_length=255,
+                        null=True,
+                        verbose_name="Описание элемента (Казахский)",
+                    ),
+                ),
+                (
+                    "order",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="Порядок отображения"
+                    ),
+                ),
+                (
+                    "offer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="items",
+                        to="offers.offer",
+                        verbose_name="Предложение",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Элемент предложения",
+                "verbose_name_plural": "Элементы предложения",
+                "ordering": ["order"],
+            },
+        ),
+        migrations.CreateModel(
+            name="OfferReservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Дата бронирования")),
+                ("time", models.TimeField(verbose_name="Время бронирования")),
+                (
+                    "guest_count",
+                    models.PositiveSmallIntegerField(
+                        default=1, verbose_name="Количество гостей"
+                    ),
+                ),
+                (
+                    "special_requests",
+                    models.TextField(
+                        blank=True, null=True, verbose_name="Особые пожелания"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Ожидает подтверждения"),
+                            ("confirmed", "Подтверждено"),
+                            ("completed", "Завершено"),
+                            ("cancelled", "Отменено"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                        verbose_name="Статус бронирования",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Дата обновления"),
+                ),
+                (
+                    "offer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to="offers.offer",
+                        verbose_name="Предложение",
+                    ),
+                ),
+                (
+                    "table",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="offer_reservations",
+                        to="restaurant.table",
+                        verbose_name="Зарезервированный стол",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="offer_reservations",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Бронирование предложения",
+                "verbose_name_plural": "Бронирования предложений",
+                "ordering": ["-date", "-time"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="offer",
+            index=models.Index(
+                fields=["restaurant", "offer_type"],
+                name="offers_offe_restaur_a4515f_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="offer",
+            index=models.Index(
+                fields=["is_active"], name="offers_offe_is_acti_01b328_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="offerreservation",
+            index=models.Index(
+                fields=["offer", "date"], name="offers_offe_offer_i_cb6d4c_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="offerreservation",
+            index=models.Index(
+                fields=["user", "status"], name="offers_offe_user_id_a8ffb9_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="offerreservation",
+            index=models.Index(
+                fields=["-date", "-time", "-id"], name="offers_offe_date_ad3fe6_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="offerreservation",
+            index=models.Index(
+                fields=["user", "-date", "-time", "-id"],
+                name="offers_offe_user_id_cdbf16_idx",
+            ),
+        ),
+    ]
@@ -187,4 +187,6 @@ class OfferReservation(models.Model):
         indexes = [
             models.Index(fields=['offer', 'date']),
             models.Index(fields=['user', 'status']),
+            models.Index(fields=['-date', '-time', '-id']),
+            models.Index(fields=['user', '-date', '-time', '-id']),
         ]
\ No newline at end of file
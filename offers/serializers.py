@@ -2,9 +2,19 @@ from rest_framework import serializers
 from django.utils import timezone
 from .models import Offer, OfferItem, OfferReservation
 from restaurant.serializers import RestaurantMinSerializer, TableSerializer
+from core.cache import get_language
+from core.fast_serializers import Computed, absolute_file_url, localized
+from core.serializers import SparseFieldsetMixin
 
 
-class OfferItemSerializer(serializers.ModelSerializer):
+def discount_percentage(old_price, new_price):
+    if old_price and old_price > new_price:
+        discount = ((old_price - new_price) / old_price) * 100
+        return round(discount)
+    return 0
+
+
+class OfferItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     description = serializers.SerializerMethodField()
 
     class Meta:
@@ -16,8 +26,11 @@ class OfferItemSerializer(serializers.ModelSerializer):
         lang = getattr(request.user, 'language', 'ru') if request and request.user.is_authenticated else 'ru'
         return obj.description_kz if lang == 'kz' and obj.description_kz else obj.description_ru
 
+    def fast_description(self):
+        return Computed(['description_ru', 'description_kz'], localized(get_language(self.context.get('request'))))
+
 
-class OfferSerializer(serializers.ModelSerializer):
+class OfferSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     restaurant_details = RestaurantMinSerializer(source='restaurant', read_only=True)
     items = OfferItemSerializer(many=True, read_only=True)
     discount_percentage = serializers.SerializerMethodField()
@@ -39,10 +52,7 @@ class OfferSerializer(serializers.ModelSerializer):
         return obj.title_kz if lang == 'kz' and obj.title_kz else obj.title_ru
 
     def get_discount_percentage(self, obj):
-        if obj.old_price and obj.old_price > obj.new_price:
-            discount = ((obj.old_price - obj.new_price) / obj.old_price) * 100
-            return round(discount)
-        return 0
+        return discount_percentage(obj.old_price, obj.new_price)
         
     def get_image_url(self, obj):
         request = self.context.get('request')
@@ -50,8 +60,18 @@ class OfferSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.image.url)
         return None
 
+    # Быстрый путь списков (core.fast_serializers): те же значения из колонок values().
+    def fast_title(self):
+        return Computed(['title_ru', 'title_kz'], localized(get_language(self.context.get('request'))))
+
+    def fast_discount_percentage(self):
+        return Computed(['old_price', 'new_price'], discount_percentage)
+
+    def fast_image_url(self):
+        return Computed(['image'], absolute_file_url(Offer._meta.get_field('image'), self.context.get('request')))
+
 
-class OfferDetailSerializer(serializers.ModelSerializer):
+class OfferDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     restaurant_details = RestaurantMinSerializer(source='restaurant', read_only=True)
     items = OfferItemSerializer(many=True, read_only=True)
     discount_percentage = serializers.SerializerMethodField()
@@ -74,10 +94,7 @@ class OfferDetailSerializer(serializers.ModelSerializer):
         return obj.title_kz if lang == 'kz' and obj.title_kz else obj.title_ru
     
     def get_discount_percentage(self, obj):
-        if obj.old_price and obj.old_price > obj.new_price:
-            discount = ((obj.old_price - obj.new_price) / obj.old_price) * 100
-            return round(discount)
-        return 0
+        return discount_percentage(obj.old_price, obj.new_price)
     
     def get_image_url(self, obj):
         request = self.context.get('request')
@@ -115,7 +132,7 @@ class OfferCreateSerializer(serializers.ModelSerializer):
         return offer
 
 
-class OfferReservationSerializer(serializers.ModelSerializer):
+class OfferReservationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     offer_details = OfferSerializer(source='offer', read_only=True)
     table_details = TableSerializer(source='table', read_only=True)
     
@@ -9,6 +9,10 @@ from drf_yasg import openapi
 import logging
 import uuid
 
+from core.conditional import ConditionalGetMixin, conditional_get
+from core.fast_serializers import FastListMixin
+from core.pagination import SelectablePagination
+from core.query_plan import QueryPlanMixin, apply_query_plan
 from .models import Offer, OfferItem, OfferReservation
 from .serializers import (
     OfferSerializer, 
@@ -19,15 +23,18 @@ from .serializers import (
 )
 from restaurant.models import Table, Restaurant
 from cities.models import City
+from core.cache import cache_response
 
 
-class OfferViewSet(viewsets.ModelViewSet):
+class OfferViewSet(ConditionalGetMixin, QueryPlanMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Offer.objects.filter(is_active=True)
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['restaurant', 'offer_type', 'people_count']
     search_fields = ['title_ru', 'title_kz']
     ordering_fields = ['new_price', 'created_at', 'people_count']
     ordering = ['new_price']
+    # Ресторан и пункты предложения вложены в ответ; их изменения меняют версию offers.
+    conditional_namespaces = ('offers',)
     
     def get_serializer_class(self):
         if self.action == 'create' or self.action == 'update':
@@ -57,6 +64,14 @@ class OfferViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(new_price__lte=max_price)
             
         return queryset
+
+    @cache_response('offers')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
     
     @swagger_auto_schema(
         operation_description="Получить список предложений по городу",
@@ -163,18 +178,18 @@ class OfferViewSet(viewsets.ModelViewSet):
             status__in=['pending', 'confirmed']
         ).values_list('table_id', flat=True)
         
-        available_tables = Table.objects.filter(
+        from restaurant.serializers import TableSerializer
+        available_tables = apply_query_plan(Table.objects.filter(
             section__restaurant=offer.restaurant
         ).exclude(
             uuid__in=booked_tables
-        )
+        ), TableSerializer())
         
-        from restaurant.serializers import TableSerializer
         serializer = TableSerializer(available_tables, many=True)
         return Response(serializer.data)
 
 
-class OfferItemViewSet(viewsets.ModelViewSet):
+class OfferItemViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = OfferItem.objects.all()
     serializer_class = OfferItemSerializer
     permission_classes = [IsAdminUser]
@@ -182,12 +197,13 @@ class OfferItemViewSet(viewsets.ModelViewSet):
     filterset_fields = ['offer']
 
 
-class OfferReservationViewSet(viewsets.ModelViewSet):
+class OfferReservationViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     serializer_class = OfferReservationSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['offer', 'date', 'status']
     ordering_fields = ['date', 'time', 'created_at']
     ordering = ['-date', '-time']
+    pagination_class = SelectablePagination
     
     def get_permissions(self):
         if self.action in ['create', 'list', 'retrieve']:
@@ -197,8 +213,8 @@ class OfferReservationViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.is_staff or user.is_superuser:
-            return OfferReservation.objects.all()
-        return OfferReservation.objects.filter(user=user)
+            return self.plan_queryset(OfferReservation.objects.all())
+        return self.plan_queryset(OfferReservation.objects.filter(user=user))
     
     @swagger_auto_schema(
         operation_description="Отменить бронирование",
@@ -274,6 +290,6 @@ class OfferReservationViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def my_reservations(self, request):
-        reservations = OfferReservation.objects.filter(user=request.user)
+        reservations = self.get_queryset().filter(user=request.user)
         serializer = self.get_serializer(reservations, many=True)
         return Response(serializer.data)
\ No newline at end of file
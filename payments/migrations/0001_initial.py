@@ -0,0 +1,136 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("room", "0002_reservation_room_reserv_reserva_c25452_idx_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PaymentType",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "payment_type_id",
+                    models.CharField(
+                        db_index=True,
+                        help_text="payment_type_id",
+                        max_length=255,
+                        unique=True,
+                        verbose_name="ID типа платежа",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=255, verbose_name="Название типа платежа"
+                    ),
+                ),
+                ("description", models.TextField(verbose_name="Описание типа платежа")),
+                (
+                    "payment_type_kind",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("Cash", "Наличные"),
+                            ("Card", "Карта"),
+                            ("LoyaltyCard", "Карта лояльности"),
+                            ("External", "Внешний"),
+                        ],
+                        help_text="payment_type_kind можно получить",
+                        max_length=255,
+                        null=True,
+                        verbose_name="Тип платежа в iiko",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Тип платежа",
+                "verbose_name_plural": "Типы платежей",
+                "ordering": ["name"],
+                "indexes": [
+                    models.Index(
+                        fields=["payment_type_id"],
+                        name="payments_pa_payment_bbf9dd_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="StripePayment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("currency", models.CharField(default="USD", max_length=3)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                            ("refunded", "Refunded"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "stripe_payment_intent_id",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "reservation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="room.reservation",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Платеж Stripe",
+                "verbose_name_plural": "Платежи Stripe",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["stripe_payment_intent_id"],
+                        name="payments_st_stripe__72303b_idx",
+                    )
+                ],
+            },
+        ),
+    ]
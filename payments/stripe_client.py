@@ -0,0 +1,16 @@
+from functools import lru_cache
+
+from django.conf import settings
+
+
+@lru_cache(maxsize=None)
+def _import_stripe():
+    # SDK тяжёлый (~0.7 с на импорт), поэтому загружается при первом платеже, а не при старте воркера.
+    import stripe
+    return stripe
+
+
+def get_stripe():
+    stripe = _import_stripe()
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+    return stripe
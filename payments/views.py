@@ -6,10 +6,10 @@ from .models import StripePayment
 from room.models import Reservation
 from decimal import Decimal
 from rest_framework.permissions import IsAuthenticated
-import stripe
 import logging
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
+from core.metrics import observe_external
+from .stripe_client import get_stripe
 
 
 logger = logging.getLogger(__name__)
@@ -17,6 +17,7 @@ logger = logging.getLogger(__name__)
 class CreateCheckoutSessionView(APIView):
 
     def post(self, request):
+        stripe = get_stripe()
         reservation_id = request.data.get('reservation_id')
 
         if not reservation_id:
@@ -101,21 +102,21 @@ class CreateCheckoutSessionView(APIView):
             )
 
             domain = settings.FRONTEND_BASE_URL
-            stripe.api_key = settings.STRIPE_SECRET_KEY
 
             try:
-                session = stripe.checkout.Session.create(
-                    payment_method_types=['card'],
-                    line_items=line_items,
-                    mode='payment',
-                    metadata={
-                        'reservation_id': str(reservation.id),
-                        'payment_id': str(payment.id)
-                    },
-                    customer_email=reservation.guest_email,
-                    success_url=f'{domain}/success',
-                    cancel_url=f'{domain}/cancelled',
-                )
+                with observe_external('stripe', 'checkout_session_create'):
+                    session = stripe.checkout.Session.create(
+                        payment_method_types=['card'],
+                        line_items=line_items,
+                        mode='payment',
+                        metadata={
+                            'reservation_id': str(reservation.id),
+                            'payment_id': str(payment.id)
+                        },
+                        customer_email=reservation.guest_email,
+                        success_url=f'{domain}/success',
+                        cancel_url=f'{domain}/cancelled',
+                    )
 
                 payment.stripe_payment_intent_id = session.payment_intent or session.id
                 payment.save()
@@ -170,11 +171,11 @@ class PaymentSuccessView(APIView):
         if not session_id:
             return Response({'error': 'Session ID is required'}, status=400)
         
+        stripe = get_stripe()
         try:
-            stripe.api_key = settings.STRIPE_SECRET_KEY
-            
             # Retrieve the session to verify its status
-            session = stripe.checkout.Session.retrieve(session_id)
+            with observe_external('stripe', 'checkout_session_retrieve'):
+                session = stripe.checkout.Session.retrieve(session_id)
             
             if session.payment_status != 'paid':
                 logger.warning(f"Payment not completed for session {session_id}")
@@ -231,25 +232,28 @@ class PaymentCancelView(APIView):
         
         # If no session_id provided, we'll still handle it
         if session_id:
+            stripe = get_stripe()
             try:
-                stripe.api_key = settings.STRIPE_SECRET_KEY
-                
                 # 1. Retrieve the Stripe session
-                session = stripe.checkout.Session.retrieve(session_id)
+                with observe_external('stripe', 'checkout_session_retrieve'):
+                    session = stripe.checkout.Session.retrieve(session_id)
                 
                 # 2. Cancel the payment intent (this will show as "Canceled" in the dashboard)
                 if hasattr(session, 'payment_intent') and session.payment_intent:
-                    payment_intent = stripe.PaymentIntent.retrieve(session.payment_intent)
+                    with observe_external('stripe', 'payment_intent_retrieve'):
+                        payment_intent = stripe.PaymentIntent.retrieve(session.payment_intent)
                     
                     # Only cancel if it's in a state that can be canceled
                     if payment_intent.status in ['requires_payment_method', 'requires_capture', 'requires_confirmation', 'requires_action', 'processing']:
                         # This is what creates the "Canceled" status in the Stripe dashboard
-                        stripe.PaymentIntent.cancel(payment_intent.id)
+                        with observe_external('stripe', 'payment_intent_cancel'):
+                            stripe.PaymentIntent.cancel(payment_intent.id)
                         logger.info(f"Payment intent {payment_intent.id} has been canceled")
                 
                 # 3. Also expire the checkout session if it's still open
                 if session.status == 'open':
-                    stripe.checkout.Session.expire(session_id)
+                    with observe_external('stripe', 'checkout_session_expire'):
+                        stripe.checkout.Session.expire(session_id)
                     logger.info(f"Session {session_id} has been expired")
                 
                 # 4. Update our database
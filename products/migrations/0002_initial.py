@@ -0,0 +1,51 @@
+# Generated by Django 5.1.6 on 2025-10-20 13:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("products", "0001_initial"),
+        ("restaurant", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="menu",
+            name="restaurant",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="menus",
+                to="restaurant.restaurant",
+                verbose_name="Ресторан",
+            ),
+        ),
+        migrations.AddField(
+            model_name="menu",
+            name="menu_type",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="menus",
+                to="products.menutype",
+                verbose_name="Тип меню",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="menu",
+            index=models.Index(
+                fields=["name_ru", "restaurant"], name="products_me_name_ru_a1009d_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="menu",
+            index=models.Index(
+                fields=["is_available"], name="products_me_is_avai_2255f0_idx"
+            ),
+        ),
+    ]
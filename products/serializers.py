@@ -2,9 +2,12 @@ from rest_framework import serializers
 from .models import Menu, MenuType
 from restaurant.models import Restaurant
 from restaurant.serializers import RestaurantSerializer
+from core.cache import get_language
+from core.fast_serializers import Computed, Nested, absolute_file_url, localized
+from core.serializers import SparseFieldsetMixin
 
 
-class MenuTypeSerializer(serializers.ModelSerializer):
+class MenuTypeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     name = serializers.SerializerMethodField()
 
     class Meta:
@@ -18,8 +21,11 @@ class MenuTypeSerializer(serializers.ModelSerializer):
             lang = getattr(request.user, 'language', 'ru') or 'ru'
         return obj.name_kz if lang == 'kz' and obj.name_kz else obj.name_ru
 
+    def fast_name(self):
+        return Computed(['name_ru', 'name_kz'], localized(get_language(self.context.get('request'))))
 
-class MenuSerializer(serializers.ModelSerializer):
+
+class MenuSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     menu_type_details = MenuTypeSerializer(source='menu_type', read_only=True)
     restaurant_details = serializers.SerializerMethodField()
     image_url = serializers.SerializerMethodField()
@@ -37,6 +43,8 @@ class MenuSerializer(serializers.ModelSerializer):
             'is_available', 'is_popular', 'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
+        related_paths = {'restaurant_details': ['restaurant__city']}
+        expandable_fields = ['restaurant_details']
 
     def get_restaurant_details(self, obj):
         from restaurant.serializers import RestaurantMinSerializer
@@ -62,8 +70,22 @@ class MenuSerializer(serializers.ModelSerializer):
             lang = getattr(request.user, 'language', 'ru') or 'ru'
         return obj.description_kz if lang == 'kz' and obj.description_kz else obj.description_ru
 
+    # Быстрый путь списков (core.fast_serializers): те же значения из колонок values().
+    def fast_restaurant_details(self):
+        from restaurant.serializers import RestaurantMinSerializer
+        return Nested('restaurant', RestaurantMinSerializer())
+
+    def fast_image_url(self):
+        return Computed(['image'], absolute_file_url(Menu._meta.get_field('image'), self.context.get('request')))
+
+    def fast_name(self):
+        return Computed(['name_ru', 'name_kz'], localized(get_language(self.context.get('request'))))
+
+    def fast_description(self):
+        return Computed(['description_ru', 'description_kz'], localized(get_language(self.context.get('request'))))
+
 
-class MenuMinSerializer(serializers.ModelSerializer):
+class MenuMinSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     name = serializers.SerializerMethodField()
 
     class Meta:
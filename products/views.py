@@ -8,6 +8,10 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
 
+from core.cache import cache_response
+from core.conditional import ConditionalGetMixin, conditional_get
+from core.fast_serializers import FastListMixin
+from core.query_plan import QueryPlanMixin
 from .models import Menu, MenuType
 from .serializers import MenuSerializer, MenuTypeSerializer
 
@@ -72,12 +76,14 @@ def get_dish_details(request, dish_id):
         return JsonResponse({'error': 'Произошла ошибка при получении данных о блюде'}, status=500)
 
 
-class MenuViewSet(viewsets.ModelViewSet):
+class MenuViewSet(ConditionalGetMixin, QueryPlanMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Menu.objects.all()
     serializer_class = MenuSerializer
     filterset_fields = ['restaurant', 'menu_type', 'is_available']
     search_fields = ['name_ru', 'name_kz', 'description_ru', 'description_kz']
     ordering_fields = ['price', 'calories', 'created_at']
+    # Тип блюда и ресторан вложены в ответ; их изменения меняют версию menu.
+    conditional_namespaces = ('menu',)
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -91,11 +97,19 @@ class MenuViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    @cache_response('menu')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(detail=False, methods=['GET'])
+    @cache_response('menu')
     def available(self, request):
         queryset = self.get_queryset().filter(is_available=True)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return Response(self.fast_data(queryset))
 
     @action(detail=True, methods=['POST'])
     def toggle_availability(self, request, pk=None):
@@ -106,10 +120,10 @@ class MenuViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=False, methods=['GET'])
+    @cache_response('menu')
     def popular(self, request):
         queryset = self.get_queryset().filter(is_popular=True)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return Response(self.fast_data(queryset))
 
     @action(detail=True, methods=['POST'])
     def toggle_popularity(self, request, pk=None):
@@ -123,3 +137,11 @@ class MenuViewSet(viewsets.ModelViewSet):
 class MenuTypeViewSet(viewsets.ModelViewSet):
     queryset = MenuType.objects.all()
     serializer_class = MenuTypeSerializer
+
+    @cache_response('menu-types')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response('menu-types')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -8,6 +8,12 @@ from django.conf import settings
 from django.utils import timezone
 import uuid
 from django.db.models import Q, Avg
+from django import forms
+from django.contrib import messages
+from django.template.response import TemplateResponse
+from .serializers import TableProvisionSerializer
+from .services import log_provision_progress, provision_tables
+from .qr_export import qr_export_response
 
 
 @admin.register(Restaurant)
@@ -15,7 +21,10 @@ class RestaurantAdmin(admin.ModelAdmin):
     list_display = ('name', 'city', 'opening_time', 'closing_time', 'display_rating', 'display_iiko_status', 'id', 'photo')
     list_filter = ('city',)
     search_fields = ('name', 'city__name', 'iiko_organization_id')
-    readonly_fields = ('get_created', 'get_modified', 'rating', 'reviews_count')
+    readonly_fields = (
+        'get_created', 'get_modified', 'rating', 'reviews_count', 'rating_sum', 'score',
+        'rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count',
+    )
 
     fieldsets = (
         ('Основная информация', {
@@ -27,7 +36,10 @@ class RestaurantAdmin(admin.ModelAdmin):
             'description': 'Описания ресторана на разных языках'
         }),
         ('Отзывы', {
-            'fields': ('rating', 'reviews_count'),
+            'fields': (
+                'rating', 'reviews_count', 'rating_sum', 'score',
+                'rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count',
+            ),
             'description': 'Статистика отзывов (только для чтения)'
         }),
         ('Интеграция c iiko', {
@@ -59,12 +71,20 @@ class RestaurantAdmin(admin.ModelAdmin):
         return getattr(obj, 'updated_at', 'Нет данных')
     get_modified.short_description = 'Последнее изменение'
 
-    actions = ['mark_no_iiko']
+    actions = ['mark_no_iiko', 'download_qr_zip', 'download_qr_pdf']
     
     def mark_no_iiko(self, request, queryset):
         queryset.update(iiko_organization_id=None, external_menu_id=None, price_category_id=None, department_id=None)
         self.message_user(request, f"Очищены данные интеграции iiko для {queryset.count()} ресторанов.")
     mark_no_iiko.short_description = "Очистить данные интеграции с iiko"
+
+    def download_qr_zip(self, request, queryset):
+        return qr_export_response(request, Table.objects.filter(section__restaurant__in=queryset), 'zip', 'qr-restaurants', 'QR-коды')
+    download_qr_zip.short_description = "Скачать QR-коды столов (ZIP)"
+
+    def download_qr_pdf(self, request, queryset):
+        return qr_export_response(request, Table.objects.filter(section__restaurant__in=queryset), 'pdf', 'qr-restaurants', 'QR-коды')
+    download_qr_pdf.short_description = "Скачать QR-коды столов для печати (PDF)"
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('city')
@@ -84,6 +104,28 @@ class TableInline(admin.TabularInline):
     qr_preview.short_description = 'Предпросмотр'
 
 
+class TableProvisionForm(forms.Form):
+    first_number = forms.IntegerField(label='Первый номер', min_value=1)
+    last_number = forms.IntegerField(label='Последний номер', min_value=1)
+    iiko_uuids = forms.CharField(
+        label='UUID столов в iiko',
+        required=False,
+        widget=forms.Textarea(attrs={'rows': 8, 'cols': 60}),
+        help_text='По строке на стол: «номер uuid». Необязательно.',
+    )
+
+    def clean_iiko_uuids(self):
+        mapping = {}
+        for line in self.cleaned_data['iiko_uuids'].splitlines():
+            if not line.strip():
+                continue
+            number, _, iiko_uuid = line.strip().partition(' ')
+            if not iiko_uuid.strip():
+                raise forms.ValidationError(f'Строка «{line.strip()}»: нужен номер и UUID через пробел')
+            mapping[number] = iiko_uuid.strip()
+        return mapping
+
+
 @admin.register(Section)
 class SectionAdmin(admin.ModelAdmin):
     list_display = ['name', 'restaurant', 'get_tables_count', 'photo']
@@ -91,6 +133,50 @@ class SectionAdmin(admin.ModelAdmin):
     search_fields = ['name', 'restaurant__name']
     autocomplete_fields = ['restaurant']
     inlines = [TableInline]
+    actions = ['provision_tables', 'download_qr_zip', 'download_qr_pdf']
+
+    def download_qr_zip(self, request, queryset):
+        return qr_export_response(request, Table.objects.filter(section__in=queryset), 'zip', 'qr-sections', 'QR-коды')
+    download_qr_zip.short_description = "Скачать QR-коды столов (ZIP)"
+
+    def download_qr_pdf(self, request, queryset):
+        return qr_export_response(request, Table.objects.filter(section__in=queryset), 'pdf', 'qr-sections', 'QR-коды')
+    download_qr_pdf.short_description = "Скачать QR-коды столов для печати (PDF)"
+
+    def provision_tables(self, request, queryset):
+        if queryset.count() != 1:
+            self.message_user(request, 'Выберите одну секцию', messages.WARNING)
+            return None
+        section = queryset.get()
+
+        form = TableProvisionForm(request.POST if 'apply' in request.POST else None)
+        if form.is_valid():
+            serializer = TableProvisionSerializer(data={'section': section.pk, **form.cleaned_data})
+            if serializer.is_valid():
+                data = serializer.validated_data
+                tables = provision_tables(section, data['numbers'], data['iiko_uuids'], progress=log_provision_progress)
+                self.message_user(request, f'В секции «{section.name}» создано столов с QR-кодами: {len(tables)}')
+                failed = [table.number for table in tables if not table.qr]
+                if failed:
+                    self.message_user(
+                        request,
+                        f"Не удалось сохранить QR-коды столов: {', '.join(map(str, failed))}. "
+                        "Они будут созданы при сохранении стола.",
+                        messages.WARNING,
+                    )
+                return None
+            for field, errors in serializer.errors.items():
+                form.add_error(field if field in form.fields else None, errors)
+
+        return TemplateResponse(request, 'admin/restaurant/section/provision_tables.html', {
+            **self.admin_site.each_context(request),
+            'title': f'Столы для секции «{section}»',
+            'opts': self.model._meta,
+            'section': section,
+            'form': form,
+            'action_checkbox_name': admin.helpers.ACTION_CHECKBOX_NAME,
+        })
+    provision_tables.short_description = 'Создать столы с QR-кодами'
 
     def get_tables_count(self, obj):
         return obj.tables.count()
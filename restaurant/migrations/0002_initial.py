@@ -0,0 +1,73 @@
+# Generated by Django 5.1.6 on 2025-10-20 13:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("restaurant", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="review",
+            name="user",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="reviews",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Пользователь",
+            ),
+        ),
+        migrations.AddField(
+            model_name="section",
+            name="restaurant",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="sections",
+                to="restaurant.restaurant",
+                verbose_name="Ресторан",
+            ),
+        ),
+        migrations.AddField(
+            model_name="table",
+            name="section",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="tables",
+                to="restaurant.section",
+                verbose_name="Секция",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="restaurant",
+            index=models.Index(fields=["name"], name="restaurant__name_cf5999_idx"),
+        ),
+        migrations.AlterUniqueTogether(
+            name="review",
+            unique_together={("restaurant", "user")},
+        ),
+        migrations.AddIndex(
+            model_name="section",
+            index=models.Index(
+                fields=["restaurant", "name"], name="restaurant__restaur_7d43bc_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="section",
+            unique_together={("restaurant", "name")},
+        ),
+        migrations.AlterUniqueTogether(
+            name="table",
+            unique_together={("section", "number")},
+        ),
+    ]
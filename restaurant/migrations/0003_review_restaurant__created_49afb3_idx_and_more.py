@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="restaurant__created_49afb3_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["restaurant", "-created_at", "-id"],
+                name="restaurant__restaur_6868c1_idx",
+            ),
+        ),
+    ]
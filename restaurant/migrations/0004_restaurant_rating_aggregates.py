@@ -0,0 +1,43 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0003_review_restaurant__created_49afb3_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="restaurant",
+            name="rating_1_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="Оценок 1"),
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="rating_2_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="Оценок 2"),
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="rating_3_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="Оценок 3"),
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="rating_4_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="Оценок 4"),
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="rating_5_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="Оценок 5"),
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0, verbose_name="Сумма оценок"),
+        ),
+    ]
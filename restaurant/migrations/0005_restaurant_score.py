@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cities", "0001_initial"),
+        ("restaurant", "0004_restaurant_rating_aggregates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="restaurant",
+            name="score",
+            field=models.DecimalField(
+                decimal_places=4,
+                default=0,
+                max_digits=5,
+                verbose_name="Взвешенный рейтинг",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="restaurant",
+            index=models.Index(
+                fields=["city", "-score", "id"], name="restaurant__city_id_e22d1f_idx"
+            ),
+        ),
+    ]
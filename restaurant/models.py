@@ -1,14 +1,20 @@
 import uuid
-import qrcode
-from io import BytesIO
-from PIL import Image
-
-from django.db import models
-from django.core.files import File
+from collections import Counter
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import Case, Count, DecimalField, F, FloatField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.core.files.base import ContentFile
 from django.conf import settings
 from cities.models import City
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+RATING_STARS = range(1, 6)
+
+
 class Restaurant(models.Model):
     name = models.CharField(
         max_length=100,
@@ -53,6 +59,24 @@ class Restaurant(models.Model):
         verbose_name='Количество отзывов'
     )
 
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Сумма оценок'
+    )
+
+    rating_1_count = models.PositiveIntegerField(default=0, verbose_name='Оценок 1')
+    rating_2_count = models.PositiveIntegerField(default=0, verbose_name='Оценок 2')
+    rating_3_count = models.PositiveIntegerField(default=0, verbose_name='Оценок 3')
+    rating_4_count = models.PositiveIntegerField(default=0, verbose_name='Оценок 4')
+    rating_5_count = models.PositiveIntegerField(default=0, verbose_name='Оценок 5')
+
+    score = models.DecimalField(
+        max_digits=5,
+        decimal_places=4,
+        default=0,
+        verbose_name='Взвешенный рейтинг'
+    )
+
     iiko_organization_id = models.CharField(
         max_length=255,
         verbose_name='ID организации из iiko Cloud API',
@@ -96,10 +120,87 @@ class Restaurant(models.Model):
     def __str__(self):
         return self.name
 
+    @property
+    def rating_histogram(self):
+        return {str(star): getattr(self, f'rating_{star}_count') for star in RATING_STARS}
+
+    @staticmethod
+    def _rating_values(total, count, has_reviews):
+        """
+        Средний и взвешенный по Байесу рейтинг из суммы и числа оценок:
+        score = (C * m + сумма) / (C + число), где m - RATING_PRIOR_MEAN, C - RATING_PRIOR_WEIGHT.
+        Пока отзывов мало, score близок к m, поэтому одна пятёрка не обгоняет сотни оценок 4.8.
+        """
+        weight = settings.RATING_PRIOR_WEIGHT
+        prior = weight * settings.RATING_PRIOR_MEAN
+        return {
+            'rating': Case(
+                When(has_reviews, then=Cast(
+                    Cast(total, FloatField()) / count,
+                    DecimalField(max_digits=3, decimal_places=2),
+                )),
+                default=Value(Decimal(0)),
+            ),
+            'score': Case(
+                When(has_reviews, then=Cast(
+                    (Cast(total, FloatField()) + prior) / (count + weight),
+                    DecimalField(max_digits=5, decimal_places=4),
+                )),
+                default=Value(Decimal(0)),
+            ),
+        }
+
+    @classmethod
+    def apply_review_change(cls, restaurant_id, added=(), removed=()):
+        """
+        Добавляет оценки added и убирает removed одним UPDATE с F(): конкурентные
+        отзывы не затирают друг друга, а стоимость не зависит от числа отзывов.
+        Сумма, число, гистограмма и оба рейтинга считаются в том же UPDATE
+        из значений строки до изменения.
+        """
+        stars = Counter(added)
+        stars.subtract(removed)
+        count_delta = len(added) - len(removed)
+        total = F('rating_sum') + (sum(added) - sum(removed))
+        count = F('reviews_count') + count_delta
+        cls.objects.filter(pk=restaurant_id).update(
+            rating_sum=total,
+            reviews_count=count,
+            **{
+                f'rating_{star}_count': F(f'rating_{star}_count') + delta
+                for star, delta in stars.items() if delta
+            },
+            **cls._rating_values(total, count, Q(reviews_count__gt=-count_delta)),
+        )
+
+    @classmethod
+    def recompute_ratings(cls, restaurant_ids):
+        """Пересчитывает агрегаты отзывов ресторанов по самим отзывам."""
+        reviews = Review.objects.filter(restaurant=OuterRef('pk')).order_by().values('restaurant')
+
+        def aggregate(expression):
+            return Coalesce(Subquery(reviews.annotate(value=expression).values('value')), Value(0))
+
+        restaurants = cls.objects.filter(pk__in=restaurant_ids)
+        updated = restaurants.update(
+            rating_sum=aggregate(Sum('rating')),
+            reviews_count=aggregate(Count('pk')),
+            **{
+                f'rating_{star}_count': aggregate(Count('pk', filter=Q(rating=star)))
+                for star in RATING_STARS
+            },
+        )
+        # Рейтинги - вторым UPDATE: F() в UPDATE видит значения строки до изменения.
+        restaurants.update(**cls._rating_values(F('rating_sum'), F('reviews_count'), Q(reviews_count__gt=0)))
+        return updated
+
     class Meta:
         verbose_name = 'Ресторан'
         verbose_name_plural = 'Ресторан'
-        indexes = [models.Index(fields=['name'])]
+        indexes = [
+            models.Index(fields=['name']),
+            models.Index(fields=['city', '-score', 'id']),
+        ]
 
 
 class Section(models.Model):
@@ -167,23 +268,46 @@ class Review(models.Model):
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         ordering = ['-created_at']
-        unique_together = ['restaurant', 'user']  
+        unique_together = ['restaurant', 'user']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['restaurant', '-created_at', '-id']),
+        ]
     
     def __str__(self):
         return f"Отзыв {self.user} о {self.restaurant.name}: {self.rating}⭐"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Сохранённые значения нужны, чтобы при изменении отзыва применить к рейтингу только разницу.
+        instance._stored_rating = (instance.__dict__.get('restaurant_id'), instance.__dict__.get('rating'))
+        return instance
+
     def save(self, *args, **kwargs):
-        is_new = self.pk is None
-        super().save(*args, **kwargs)
-        
-        restaurant = self.restaurant
-        reviews = Review.objects.filter(restaurant=restaurant)
-        total_rating = sum(review.rating for review in reviews)
-        count = reviews.count()
-        
-        restaurant.rating = total_rating / count if count > 0 else 0
-        restaurant.reviews_count = count
-        restaurant.save(update_fields=['rating', 'reviews_count'])
+        with transaction.atomic():
+            if self._state.adding:
+                stored = None
+            elif None in getattr(self, '_stored_rating', (None, None)):
+                stored = Review.objects.filter(pk=self.pk).values_list('restaurant_id', 'rating').first()
+            else:
+                stored = self._stored_rating
+            super().save(*args, **kwargs)
+
+            if stored is None:
+                Restaurant.apply_review_change(self.restaurant_id, added=[self.rating])
+            elif stored[0] != self.restaurant_id:
+                Restaurant.apply_review_change(stored[0], removed=[stored[1]])
+                Restaurant.apply_review_change(self.restaurant_id, added=[self.rating])
+            elif stored[1] != self.rating:
+                Restaurant.apply_review_change(self.restaurant_id, added=[self.rating], removed=[stored[1]])
+        self._stored_rating = (self.restaurant_id, self.rating)
+
+
+@receiver(post_delete, sender=Review, dispatch_uid='review_rating_delete')
+def _remove_review_rating(sender, instance, **kwargs):
+    # post_delete, а не Review.delete: удаление через QuerySet.delete (в том числе в админке) тоже учитывается.
+    Restaurant.apply_review_change(instance.restaurant_id, removed=[instance.rating])
 
 
 class Table(models.Model):
@@ -259,32 +383,13 @@ class Table(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.qr:
-            link = f"{settings.BASE_URL}/{self.uuid}/"
-
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=2,
-            )
-            qr.add_data(link)
-            qr.make(fit=True)
-
-            code_img = qr.make_image(fill_color="black", back_color="white")
-
-            canvas_size = 450
-            canvas = Image.new('RGB', (canvas_size, canvas_size), 'white')
-
-            qr_size = code_img.size[0]
-            position = ((canvas_size - qr_size) // 2, (canvas_size - qr_size) // 2)
-
-            canvas.paste(code_img, position)
-
-            buffer = BytesIO()
-            canvas.save(buffer, 'PNG')
-            file_name = f'table-{self.section.name}-{self.number}-qr.png' if self.section else f'table-{self.number}-qr.png'
-            self.qr.save(file_name, File(buffer), save=False)
-            buffer.close()
-            canvas.close()
+            from .qr import content_name, qr_file_name, render_qr_png, render_qr_svg, store_content_addressed, table_link
+
+            link = table_link(settings.BASE_URL, self.uuid)
+            if settings.QR_FORMAT == 'svg':
+                self.qr.name = store_content_addressed(self.qr.storage, content_name(link), lambda: render_qr_svg(link))
+            else:
+                file_name = qr_file_name(self.section.name if self.section else None, self.number)
+                self.qr.save(file_name, ContentFile(render_qr_png(link)), save=False)
 
         super().save(*args, **kwargs)
@@ -0,0 +1,101 @@
+import hashlib
+from io import BytesIO
+
+CANVAS_SIZE = 450
+QR_DIRECTORY = 'qr_codes'
+
+
+def table_link(base_url, table_uuid):
+    return f'{base_url}/{table_uuid}/'
+
+
+def qr_file_name(section_name, number):
+    return f'table-{section_name}-{number}-qr.png' if section_name else f'table-{number}-qr.png'
+
+
+def content_name(link):
+    """
+    Имя SVG по хешу закодированной ссылки: файл не зависит от названия секции
+    и номера стола, а одинаковые ссылки дают один файл.
+    """
+    return f"{QR_DIRECTORY}/{hashlib.sha256(link.encode('utf-8')).hexdigest()[:32]}.svg"
+
+
+def _matrix(link):
+    import qrcode
+
+    qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, border=2)
+    qr.add_data(link)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+def render_qr_svg(link):
+    """
+    Векторный QR-код: модули строки объединяются в горизонтальные полосы
+    одного пути, поэтому файл весит единицы килобайт. PIL не используется.
+    """
+    matrix = _matrix(link)
+    size = len(matrix)
+    runs = []
+    for y, row in enumerate(matrix):
+        x = 0
+        previous = None
+        while x < size:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < size and row[x]:
+                x += 1
+            # Первая полоса строки - абсолютно, следующие - относительно начала предыдущей.
+            move = f'M{start} {y}' if previous is None else f'm{start - previous} 0'
+            runs.append(f'{move}h{x - start}v1h-{x - start}z')
+            previous = start
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="#fff"/><path d="{"".join(runs)}"/></svg>'
+    ).encode('ascii')
+
+
+def store_content_addressed(storage, name, render):
+    """
+    Сохраняет файл с именем по содержимому, если его ещё нет. render() вызывается
+    только для нового файла; существующий переиспользуется без перезаписи.
+    """
+    if storage.exists(name):
+        return name
+    from django.core.files.base import ContentFile
+
+    return storage.save(name, ContentFile(render()))
+
+
+def render_qr_png(link):
+    """
+    PNG с QR-кодом ссылки по центру белого холста. Модуль не импортирует
+    Django, поэтому функция выполняется и в дочерних процессах пула.
+    """
+    # qrcode и PIL нужны только при создании стола, а не при загрузке моделей.
+    import qrcode
+    from PIL import Image
+
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=2,
+    )
+    qr.add_data(link)
+    qr.make(fit=True)
+
+    code_img = qr.make_image(fill_color="black", back_color="white")
+    canvas = Image.new('RGB', (CANVAS_SIZE, CANVAS_SIZE), 'white')
+
+    qr_size = code_img.size[0]
+    position = ((CANVAS_SIZE - qr_size) // 2, (CANVAS_SIZE - qr_size) // 2)
+    canvas.paste(code_img, position)
+
+    buffer = BytesIO()
+    canvas.save(buffer, 'PNG')
+    canvas.close()
+    return buffer.getvalue()
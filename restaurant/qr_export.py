@@ -0,0 +1,221 @@
+import os
+import time
+import zipfile
+import zlib
+from io import BytesIO
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+from .qr import render_qr_png, table_link
+
+CHUNK_SIZE = 64 * 1024
+ITERATOR_CHUNK_SIZE = 100
+
+# Лист A4 при 150 dpi, сетка 3 x 4 карточек.
+PAGE_SIZE = (1240, 1754)
+PAGE_POINTS = (595.28, 841.89)
+PAGE_MARGIN = 60
+GRID = (3, 4)
+QR_SIZE = 300
+
+
+def export_tables(queryset):
+    """Столы для выгрузки в порядке печати; читаются порциями, а не целиком."""
+    return (
+        queryset.select_related('section')
+        .only('uuid', 'number', 'qr', 'section__name')
+        .order_by('section__name', 'number')
+        .iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    )
+
+
+def _section_name(table):
+    return table.section.name if table.section else 'Без секции'
+
+
+def _open_qr(table, raster=False):
+    """
+    (файл, расширение) сохранённого QR-кода стола; если файла нет, PNG рисуется
+    без сохранения. raster=True - для листов PDF, где SVG тоже заменяется PNG.
+    """
+    if table.qr and not (raster and table.qr.name.endswith('.svg')):
+        try:
+            return table.qr.storage.open(table.qr.name, 'rb'), os.path.splitext(table.qr.name)[1]
+        except FileNotFoundError:
+            pass
+    return BytesIO(render_qr_png(table_link(settings.BASE_URL, table.uuid))), '.png'
+
+
+class _Buffer:
+    """Приёмник для zipfile без seek: накопленные байты отдаются ответу и сбрасываются."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(tables):
+    """
+    ZIP с QR-кодами столов по папкам секций. Архив пишется по мере чтения
+    файлов: в памяти не больше одного блока CHUNK_SIZE. PNG уже сжат,
+    поэтому хранится без сжатия; SVG сжимается.
+    """
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for table in tables:
+            section = _section_name(table).replace('/', '-')
+            source, extension = _open_qr(table)
+            info = zipfile.ZipInfo(f'{section}/table-{table.number}{extension}', time.localtime()[:6])
+            if extension == '.svg':
+                info.compress_type = zipfile.ZIP_DEFLATED
+            with source, archive.open(info, 'w') as target:
+                while chunk := source.read(CHUNK_SIZE):
+                    target.write(chunk)
+                    yield buffer.pop()
+            yield buffer.pop()
+    yield buffer.pop()
+
+
+def _load_font(size, bold=False):
+    from PIL import ImageFont
+
+    path = settings.QR_LABEL_FONT_BOLD if bold else settings.QR_LABEL_FONT
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def _pages(tables, title):
+    """Листы для печати: по GRID карточек с QR-кодом, номером стола и секцией."""
+    from PIL import Image, ImageDraw
+
+    columns, rows = GRID
+    cell_width = (PAGE_SIZE[0] - 2 * PAGE_MARGIN) // columns
+    cell_height = (PAGE_SIZE[1] - 2 * PAGE_MARGIN) // rows
+    number_font = _load_font(40, bold=True)
+    label_font = _load_font(26)
+
+    page = draw = None
+    position = 0
+    page_number = 0
+    for table in tables:
+        if page is None:
+            page = Image.new('L', PAGE_SIZE, 255)
+            draw = ImageDraw.Draw(page)
+            page_number += 1
+            draw.text((PAGE_MARGIN, PAGE_MARGIN // 3), f'{title}, лист {page_number}', fill=0, font=label_font)
+
+        column, row = position % columns, position // columns
+        left = PAGE_MARGIN + column * cell_width
+        top = PAGE_MARGIN + row * cell_height
+        # Линии реза.
+        draw.rectangle((left, top, left + cell_width, top + cell_height), outline=200)
+
+        source, _ = _open_qr(table, raster=True)
+        with source, Image.open(source) as code:
+            code = code.convert('L').resize((QR_SIZE, QR_SIZE), Image.NEAREST)
+            page.paste(code, (left + (cell_width - QR_SIZE) // 2, top + 20))
+        center = left + cell_width // 2
+        draw.text((center, top + QR_SIZE + 40), f'Стол №{table.number}', fill=0, font=number_font, anchor='mt')
+        draw.text((center, top + QR_SIZE + 95), _section_name(table), fill=0, font=label_font, anchor='mt')
+
+        position += 1
+        if position == columns * rows:
+            yield page
+            page, position = None, 0
+    if page is not None:
+        yield page
+
+
+def stream_pdf(tables, title):
+    """
+    PDF для печати: каждый лист - растровое изображение, которое пишется
+    в ответ сразу после отрисовки. Каталог страниц и таблица смещений
+    выводятся в конце, поэтому в памяти только текущий лист.
+    """
+    offset = 0
+    offsets = {}
+    kids = []
+
+    def emit(number, body, stream=None):
+        nonlocal offset
+        offsets[number] = offset
+        data = f'{number} 0 obj\n'.encode() + body
+        if stream is not None:
+            data += b'\nstream\n' + stream + b'\nendstream'
+        data += b'\nendobj\n'
+        offset += len(data)
+        return data
+
+    header = b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'
+    offset = len(header)
+    yield header
+    # 1 - каталог, 2 - дерево страниц (выводится последним, когда известны все листы).
+    yield emit(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+
+    next_number = 3
+    width, height = PAGE_POINTS
+    for page in _pages(tables, title):
+        image, content, page_object = next_number, next_number + 1, next_number + 2
+        next_number += 3
+
+        pixels = zlib.compress(page.tobytes())
+        yield emit(image, (
+            f'<< /Type /XObject /Subtype /Image /Width {page.width} /Height {page.height} '
+            f'/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode /Length {len(pixels)} >>'
+        ).encode(), pixels)
+        page.close()
+
+        drawing = f'q {width} 0 0 {height} 0 0 cm /Im0 Do Q'.encode()
+        yield emit(content, f'<< /Length {len(drawing)} >>'.encode(), drawing)
+        yield emit(page_object, (
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] '
+            f'/Resources << /XObject << /Im0 {image} 0 R >> >> /Contents {content} 0 R >>'
+        ).encode())
+        kids.append(page_object)
+
+    yield emit(2, (
+        f"<< /Type /Pages /Kids [{' '.join(f'{kid} 0 R' for kid in kids)}] /Count {len(kids)} >>"
+    ).encode())
+
+    xref = [f'xref\n0 {next_number}\n', '0000000000 65535 f \n']
+    xref.extend(f'{offsets[number]:010d} 00000 n \n' for number in range(1, next_number))
+    xref.append(f'trailer\n<< /Size {next_number} /Root 1 0 R >>\nstartxref\n{offset}\n%%EOF\n')
+    yield ''.join(xref).encode()
+
+
+async def _aiterate(chunks):
+    """
+    Асинхронный обход генератора блоков. Синхронный генератор под ASGI Django
+    сначала собирает целиком в список; здесь каждый следующий блок готовится
+    в потоке запроса, и в памяти по-прежнему только он.
+    """
+    next_chunk = sync_to_async(next)
+    while (chunk := await next_chunk(chunks, None)) is not None:
+        yield chunk
+
+
+def qr_export_response(request, queryset, kind, name, title):
+    """Потоковый ответ с QR-кодами столов: kind - 'zip' или 'pdf'."""
+    tables = export_tables(queryset)
+    chunks = stream_pdf(tables, title) if kind == 'pdf' else stream_zip(tables)
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        chunks = _aiterate(chunks)
+    response = StreamingHttpResponse(chunks, content_type=f'application/{kind}')
+    response['Content-Disposition'] = f'attachment; filename="{name}.{kind}"'
+    return response
@@ -1,49 +1,67 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import Restaurant, Table, Section, Review
+from .models import RATING_STARS, Restaurant, Table, Section, Review
 from cities.serializers import CitySerializer
 from users.serializers import UserSerializer
+from core.fast_serializers import Computed
+from core.serializers import SparseFieldsetMixin
+from .services import existing_numbers
 
 
-class RestaurantSerializer(serializers.ModelSerializer):
+class RestaurantSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     city = CitySerializer()
+    rating_histogram = serializers.SerializerMethodField()
 
     class Meta:
         model = Restaurant
         fields = [
             'id', 'name', 'city', 'opening_time', 'closing_time',
             'description_ru', 'description_kz',
-            'rating', 'reviews_count',
+            'rating', 'reviews_count', 'score', 'rating_histogram',
             'iiko_organization_id', 'external_menu_id',
             'price_category_id', 'department_id', 'photo'
         ]
 
+    def get_rating_histogram(self, obj):
+        return obj.rating_histogram
 
+    def fast_rating_histogram(self):
+        return Computed(
+            [f'rating_{star}_count' for star in RATING_STARS],
+            lambda *counts: {str(star): count for star, count in zip(RATING_STARS, counts)},
+        )
 
-class SectionSerializer(serializers.ModelSerializer):
+
+
+class SectionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     restaurant = RestaurantSerializer()
 
     class Meta:
         model = Section
         fields = ['id', 'name', 'restaurant', 'photo']
 
-class TableSerializer(serializers.ModelSerializer):
+class TableSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     section = SectionSerializer()
 
     class Meta:
         model = Table
         fields = ['uuid', 'number', 'section', 'qr', 'call_waiter', 'call_time', 'bill_waiter', 'bill_time', 'iiko_waiter_id']
 
-class RestaurantMinSerializer(serializers.ModelSerializer):
+class RestaurantMinSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     city_name = serializers.SerializerMethodField()
     
     class Meta:
         model = Restaurant
         fields = ['id', 'name', 'city', 'city_name']
+        related_paths = {'city_name': ['city']}
     
     def get_city_name(self, obj):
         return obj.city.name if obj.city else None
 
-class ReviewSerializer(serializers.ModelSerializer):
+    def fast_city_name(self):
+        return Computed(['city__name'], lambda name: name)
+
+class ReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user_details = UserSerializer(source='user', read_only=True)
     restaurant_name = serializers.CharField(source='restaurant.name', read_only=True)
     
@@ -70,4 +88,38 @@ class ReviewSerializer(serializers.ModelSerializer):
                 {"non_field_errors": "Вы уже оставили отзыв для этого ресторана"}
             )
             
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class TableProvisionSerializer(serializers.Serializer):
+    """Партия столов секции: номера first_number..last_number и UUID столов в iiko по номерам."""
+    section = serializers.PrimaryKeyRelatedField(queryset=Section.objects.select_related('restaurant'))
+    first_number = serializers.IntegerField(min_value=1)
+    last_number = serializers.IntegerField(min_value=1)
+    iiko_uuids = serializers.DictField(child=serializers.CharField(max_length=255), required=False)
+
+    def validate(self, attrs):
+        first, last = attrs['first_number'], attrs['last_number']
+        if last < first:
+            raise serializers.ValidationError({'last_number': 'Последний номер меньше первого'})
+        if last - first + 1 > settings.TABLE_PROVISION_MAX:
+            raise serializers.ValidationError(
+                {'last_number': f'За один раз можно создать не больше {settings.TABLE_PROVISION_MAX} столов'}
+            )
+        numbers = range(first, last + 1)
+
+        iiko_uuids = {}
+        for number, iiko_uuid in attrs.get('iiko_uuids', {}).items():
+            if not str(number).isdigit() or int(number) not in numbers:
+                raise serializers.ValidationError({'iiko_uuids': f'Номер {number} вне диапазона столов'})
+            iiko_uuids[int(number)] = iiko_uuid
+
+        existing = existing_numbers(attrs['section'], numbers)
+        if existing:
+            raise serializers.ValidationError(
+                {'non_field_errors': f"В секции уже есть столы: {', '.join(map(str, existing))}"}
+            )
+        attrs['numbers'] = numbers
+        attrs['iiko_uuids'] = iiko_uuids
+        return attrs
+
@@ -0,0 +1,121 @@
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from core.cache import invalidate_model
+
+from .models import Table
+from .qr import content_name, qr_file_name, render_qr_png, render_qr_svg, store_content_addressed, table_link
+
+logger = logging.getLogger(__name__)
+
+# Меньше столов быстрее отрисовать в текущем процессе, чем запускать пул.
+PARALLEL_MIN_TABLES = 20
+BULK_BATCH_SIZE = 500
+
+
+def existing_numbers(section, numbers):
+    return sorted(Table.objects.filter(section=section, number__in=numbers).values_list('number', flat=True))
+
+
+def log_provision_progress(done, total):
+    """progress для provision_tables: пишет в лог каждые 10% и завершение."""
+    step = max(1, total // 10)
+    if done % step == 0 or done == total:
+        logger.info(f'QR-коды столов: {done}/{total}')
+
+
+def _render_all(render, links):
+    """QR-коды по ссылкам в порядке ссылок; крупные партии - в пуле процессов."""
+    workers = min(settings.QR_RENDER_WORKERS, len(links) // PARALLEL_MIN_TABLES)
+    if workers <= 1:
+        yield from map(render, links)
+        return
+    # spawn, а не fork: у воркера есть потоки (экспорт трейсов, шина сброса кэша),
+    # а fork копирует только текущий поток вместе с захваченными блокировками.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        yield from pool.map(render, links, chunksize=max(1, len(links) // (workers * 4)))
+
+
+def _upload(storage, name, data, content_addressed):
+    """Сохраняет отрисованный QR-код; SVG - по имени от содержимого, как в Table.save."""
+    if content_addressed:
+        return store_content_addressed(storage, name, lambda: data)
+    return storage.save(name, ContentFile(data))
+
+
+def provision_tables(section, numbers, iiko_uuids=None, progress=None):
+    """
+    Создаёт столы секции с номерами numbers одним bulk_create и генерирует
+    их QR-коды (формат QR_FORMAT): коды рисуются в пуле процессов, загружаются в хранилище
+    пулом потоков, ссылки на файлы записываются одним bulk_update.
+
+    iiko_uuids - {номер: UUID стола в iiko}. progress(готово, всего)
+    вызывается из потока загрузки, как только завершается загрузка очередного QR-кода.
+
+    Столы фиксируются до загрузки файлов, поэтому сбой загрузки не откатывает их:
+    ссылки на загруженные файлы всё равно сохраняются, а у столов с ошибкой qr
+    остаётся пустым - код создаст следующий Table.save. bulk-операции не шлют
+    сигналов Table, поэтому сброс кэшей и шины публикуется явно в конце.
+    """
+    iiko_uuids = iiko_uuids or {}
+    started = time.monotonic()
+    tables = [
+        Table(uuid=uuid.uuid4(), section=section, number=number, iiko_uuid=iiko_uuids.get(number))
+        for number in numbers
+    ]
+    with transaction.atomic():
+        Table.objects.bulk_create(tables, batch_size=BULK_BATCH_SIZE)
+
+    links = [table_link(settings.BASE_URL, table.uuid) for table in tables]
+    qr_field = Table._meta.get_field('qr')
+    content_addressed = settings.QR_FORMAT == 'svg'
+    if content_addressed:
+        render, names = render_qr_svg, [content_name(link) for link in links]
+    else:
+        # Тот же путь, что даёт upload_to поля при Table.save.
+        render, names = render_qr_png, [
+            qr_field.generate_filename(table, qr_file_name(section.name, table.number)) for table in tables
+        ]
+    total = len(tables)
+    uploads = []
+    done = 0
+    done_lock = threading.Lock()
+
+    def uploaded(future):
+        nonlocal done
+        with done_lock:
+            done += 1
+            progress(done, total)
+
+    try:
+        with ThreadPoolExecutor(max_workers=settings.QR_UPLOAD_THREADS) as pool:
+            for table, name, data in zip(tables, names, _render_all(render, links)):
+                future = pool.submit(_upload, qr_field.storage, name, data, content_addressed)
+                if progress is not None:
+                    future.add_done_callback(uploaded)
+                uploads.append((table, future))
+    finally:
+        # Выход из пула дождался всех загрузок; если отрисовка прервалась, сохраняются уже загруженные.
+        failed = 0
+        for table, future in uploads:
+            try:
+                table.qr.name = future.result()
+            except Exception as e:
+                failed += 1
+                logger.error(f'Не удалось загрузить QR-код стола {table.pk}: {e}')
+        Table.objects.bulk_update([table for table in tables if table.qr], ['qr'], batch_size=BULK_BATCH_SIZE)
+        invalidate_model(Table)
+
+    logger.info(
+        f'Создано {total} столов секции {section.pk} с QR-кодами за {time.monotonic() - started:.1f} с'
+        + (f', без QR-кода: {failed}' if failed else '')
+    )
+    return tables
@@ -1,24 +1,76 @@
 from rest_framework import viewsets
 from .models import Restaurant, Section, Table, Review
 from rest_framework.decorators import action
-from .serializers import RestaurantSerializer, SectionSerializer, TableSerializer, ReviewSerializer
+from .serializers import RestaurantSerializer, SectionSerializer, TableSerializer, ReviewSerializer, TableProvisionSerializer
+from .services import log_provision_progress, provision_tables
+from .qr_export import qr_export_response
 from rest_framework.response import Response
 from rest_framework import filters
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import permissions
+from rest_framework import permissions, status
 from .permissions import IsOwnerOrReadOnly
+from core.cache import cache_response
+from core.conditional import ConditionalGetMixin, conditional_get
+from core.pagination import SelectablePagination
+from core.query_plan import QueryPlanMixin, apply_query_plan
 
-class RestaurantViewSet(viewsets.ModelViewSet):
+TOP_DEFAULT_LIMIT = 10
+TOP_MAX_LIMIT = 50
+QR_EXPORT_TYPES = ('zip', 'pdf')
+
+
+def qr_codes_response(request, tables, name, title):
+    """QR-коды столов ZIP-архивом (?type=zip) или листами PDF для печати (?type=pdf)."""
+    kind = request.query_params.get('type', 'zip')
+    if kind not in QR_EXPORT_TYPES:
+        return Response({'detail': 'Параметр type: zip или pdf'}, status=status.HTTP_400_BAD_REQUEST)
+    if not tables.exists():
+        return Response({'detail': 'Столов нет'}, status=status.HTTP_404_NOT_FOUND)
+    return qr_export_response(request, tables, kind, name, title)
+
+
+class RestaurantViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Restaurant.objects.all()
     serializer_class = RestaurantSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['city']
     search_fields = ['name', 'description_ru', 'description_kz']
+
+    @cache_response('restaurants')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response('restaurants')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
     
-    @action(detail=True, methods=['get'])
+    @action(detail=False, methods=['get'])
+    @cache_response('restaurants')
+    def top(self, request):
+        """
+        Лучшие рестораны города по взвешенному рейтингу (score):
+        /restaurants/top/?city=<id>&limit=10. Один проход по индексу (city, -score, id).
+        """
+        try:
+            city = int(request.query_params['city'])
+            limit = min(max(int(request.query_params.get('limit', TOP_DEFAULT_LIMIT)), 1), TOP_MAX_LIMIT)
+        except (KeyError, ValueError):
+            return Response({'detail': 'Укажите id города в параметре city'}, status=status.HTTP_400_BAD_REQUEST)
+
+        restaurants = self.get_queryset().filter(city_id=city).order_by('-score', 'id')[:limit]
+        serializer = self.get_serializer(restaurants, many=True)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['get'], url_path='qr-codes', permission_classes=[permissions.IsAdminUser])
+    def qr_codes(self, request, pk=None):
+        restaurant = self.get_object()
+        tables = Table.objects.filter(section__restaurant=restaurant)
+        return qr_codes_response(request, tables, f'qr-restaurant-{restaurant.pk}', restaurant.name)
+
+    @action(detail=True, methods=['get'], pagination_class=SelectablePagination)
     def reviews(self, request, pk=None):
         restaurant = self.get_object()
-        reviews = Review.objects.filter(restaurant=restaurant)
+        reviews = apply_query_plan(Review.objects.filter(restaurant=restaurant), ReviewSerializer())
         page = self.paginate_queryset(reviews)
         if page is not None:
             serializer = ReviewSerializer(page, many=True)
@@ -27,21 +79,63 @@ class RestaurantViewSet(viewsets.ModelViewSet):
         serializer = ReviewSerializer(reviews, many=True)
         return Response(serializer.data)
     
-class SectionViewSet(viewsets.ModelViewSet):
+class SectionViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Section.objects.all()
     serializer_class = SectionSerializer
 
-class TableViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'], url_path='qr-codes', permission_classes=[permissions.IsAdminUser])
+    def qr_codes(self, request, pk=None):
+        section = self.get_object()
+        return qr_codes_response(
+            request, section.tables.all(), f'qr-section-{section.pk}', f'{section.restaurant.name} - {section.name}',
+        )
+
+class TableViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Table.objects.all()
     serializer_class = TableSerializer
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAdminUser],
+            serializer_class=TableProvisionSerializer)
+    def provision(self, request):
+        """Массовое создание столов секции с QR-кодами."""
+        serializer = TableProvisionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        tables = provision_tables(
+            data['section'], data['numbers'], data['iiko_uuids'], progress=log_provision_progress,
+        )
+        return Response({
+            'created': len(tables),
+            # Столы без QR-кода получат его при следующем сохранении.
+            'qr_failed': sum(1 for table in tables if not table.qr),
+            'tables': [
+                {
+                    'uuid': table.uuid, 'number': table.number, 'iiko_uuid': table.iiko_uuid,
+                    'qr': table.qr.url if table.qr else None,
+                }
+                for table in tables
+            ],
+        }, status=status.HTTP_201_CREATED)
+
+class ReviewViewSet(ConditionalGetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['restaurant', 'user', 'rating']
     ordering_fields = ['created_at', 'rating']
     ordering = ['-created_at']
+    pagination_class = SelectablePagination
+    # Автор вложен в ответ, название ресторана меняет версию restaurants.
+    conditional_related = ('user',)
+    conditional_namespaces = ('restaurants',)
+
+    @conditional_get
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
     
     def get_permissions(self):
         if self.action in ['update', 'partial_update', 'destroy']:
@@ -55,7 +149,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
         
     @action(detail=False, methods=['get'])
     def my_reviews(self, request):
-        reviews = Review.objects.filter(user=request.user)
+        reviews = self.get_queryset().filter(user=request.user)
         serializer = ReviewSerializer(reviews, many=True)
         return Response(serializer.data)
     
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0003_review_restaurant__created_49afb3_idx_and_more"),
+        ("room", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["-reservation_date", "-start_time", "-id"],
+                name="room_reserv_reserva_c25452_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="room_reserv_created_853175_idx"
+            ),
+        ),
+    ]
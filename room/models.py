@@ -82,6 +82,8 @@ class Reservation(models.Model):
             models.Index(fields=['reservation_date', 'start_time']),
             models.Index(fields=['status']),
             models.Index(fields=['table', 'reservation_date']),
+            models.Index(fields=['-reservation_date', '-start_time', '-id']),
+            models.Index(fields=['-created_at', '-id']),
         ]
 
     def __str__(self):
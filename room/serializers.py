@@ -7,9 +7,10 @@ from restaurant.models import Restaurant, Table
 from restaurant.serializers import RestaurantSerializer, TableSerializer
 from products.models import Menu
 from products.serializers import MenuSerializer
+from core.serializers import SparseFieldsetMixin
 
 
-class ReservationMenuItemSerializer(serializers.ModelSerializer):
+class ReservationMenuItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     menu_item_details = MenuSerializer(source='menu_item', read_only=True)
     
     class Meta:
@@ -17,7 +18,7 @@ class ReservationMenuItemSerializer(serializers.ModelSerializer):
         fields = ['id', 'menu_item_details', 'quantity']
 
 
-class ReservationSerializer(serializers.ModelSerializer):
+class ReservationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     menu_items = ReservationMenuItemSerializer(many=True, read_only=True)
     restaurant_details = RestaurantSerializer(source='restaurant', read_only=True)
     table_details = TableSerializer(source='table', read_only=True)
@@ -16,16 +16,22 @@ from .serializers import (
 )
 from restaurant.models import Restaurant, Table, Section
 from restaurant.serializers import TableSerializer, SectionSerializer
+from core.fast_serializers import FastListMixin
+from core.pagination import SelectablePagination
+from core.query_plan import QueryPlanMixin, apply_query_plan
 
 
-class ReservationViewSet(viewsets.ModelViewSet):
+class ReservationViewSet(QueryPlanMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Reservation.objects.all()
     serializer_class = ReservationSerializer
     filterset_fields = ['restaurant', 'table', 'reservation_date', 'status']
     search_fields = ['guest_name', 'guest_phone', 'guest_email']
     ordering_fields = ['reservation_date', 'start_time', 'created_at']
     ordering = ['-created_at']
-    
+    pagination_class = SelectablePagination
+    # Условного GET нет: в ответ вложены стол, секция и позиции брони без updated_at,
+    # и их изменение не отразилось бы в ETag.
+
     def get_serializer_class(self):
         if self.action == 'create':
             return ReservationCreateSerializer
@@ -53,8 +59,7 @@ class ReservationViewSet(viewsets.ModelViewSet):
         if email:
             queryset = queryset.filter(guest_email=email)
             
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return Response(self.fast_data(queryset))
 
 
 class TableAvailabilityView(APIView):
@@ -174,6 +179,7 @@ class RestaurantTablesView(APIView):
     def get(self, request, restaurant_id):
         restaurant = get_object_or_404(Restaurant, id=restaurant_id)
         sections = Section.objects.filter(restaurant=restaurant)
+        tables = apply_query_plan(Table.objects.filter(section__restaurant=restaurant), TableSerializer())
         
         result = {
             'restaurant_id': restaurant_id,
@@ -181,12 +187,15 @@ class RestaurantTablesView(APIView):
             'sections': []
         }
         
+        tables_by_section = {}
+        for table in tables:
+            tables_by_section.setdefault(table.section_id, []).append(table)
+        
         for section in sections:
-            tables = Table.objects.filter(section=section)
             section_data = {
                 'id': section.id,
                 'name': section.name,
-                'tables': TableSerializer(tables, many=True).data
+                'tables': TableSerializer(tables_by_section.get(section.id, []), many=True).data
             }
             result['sections'].append(section_data)
             
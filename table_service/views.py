@@ -1,8 +1,8 @@
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
 from django.http import JsonResponse, HttpResponseBadRequest
 from django.views.decorators.http import require_POST, require_GET
 from django.utils import timezone
-from django.db.models import Sum, F, DecimalField, Value
+from django.db.models import Count, Sum, F, DecimalField, Value
 from django.db.models.functions import Coalesce, Concat
 from django.contrib import messages
 from django.views.decorators.csrf import csrf_exempt
@@ -10,6 +10,8 @@ from django.contrib.auth.decorators import login_required
 
 from restaurant.models import Table, Restaurant, Review
 from products.models import Menu, MenuType
+from core.fastjson import FastJsonResponse, loads as json_loads
+from core.ratelimit import rate_limit
 from .models import Order, OrderItem
 
 import json
@@ -18,17 +20,17 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-def get_table_from_uuid(table_uuid):
+async def aget_table_from_uuid(table_uuid):
     """Вспомогательная функция для получения стола по UUID"""
     try:
-        table = Table.objects.select_related('section__restaurant').get(uuid=table_uuid)
+        table = await Table.objects.select_related('section__restaurant').aget(uuid=table_uuid)
         return table
     except Table.DoesNotExist:
         return None
 
 def table_service_view(request, table_uuid):
     """Основная страница сервиса обслуживания стола"""
-    table = get_object_or_404(Table, uuid=table_uuid)
+    table = get_object_or_404(Table.objects.select_related('section__restaurant__city'), uuid=table_uuid)
     restaurant = table.section.restaurant
     
     # Получаем или создаем активный заказ для стола
@@ -49,7 +51,7 @@ def table_service_view(request, table_uuid):
 
 def menu_view(request, table_uuid):
     """Страница с меню ресторана"""
-    table = get_object_or_404(Table, uuid=table_uuid)
+    table = get_object_or_404(Table.objects.select_related('section__restaurant__city'), uuid=table_uuid)
     restaurant = table.section.restaurant
     
     # Используем name_ru как основное имя для каждого типа меню
@@ -71,7 +73,7 @@ def menu_view(request, table_uuid):
 
 def bill_view(request, table_uuid):
     """Страница с текущим счетом"""
-    table = get_object_or_404(Table, uuid=table_uuid)
+    table = get_object_or_404(Table.objects.select_related('section__restaurant__city'), uuid=table_uuid)
     restaurant = table.section.restaurant
     
     # Получаем активный заказ
@@ -90,14 +92,16 @@ def bill_view(request, table_uuid):
 
 @csrf_exempt 
 @require_POST
-def call_waiter(request, table_uuid):
+@rate_limit('call-waiter', '3/m', key='table')
+@rate_limit('call-waiter-ip', '20/m')
+async def call_waiter(request, table_uuid):
     """API для вызова официанта"""
-    table = get_object_or_404(Table, uuid=table_uuid)
+    table = await aget_object_or_404(Table, uuid=table_uuid)
     
     if not table.call_waiter:
         table.call_waiter = True
         table.call_time = timezone.now()
-        table.save(update_fields=['call_waiter', 'call_time'])
+        await table.asave(update_fields=['call_waiter', 'call_time'])
         
         # Здесь может быть логика для уведомления официанта
         
@@ -113,14 +117,16 @@ def call_waiter(request, table_uuid):
 
 @csrf_exempt 
 @require_POST
-def request_bill(request, table_uuid):
+@rate_limit('request-bill', '3/m', key='table')
+@rate_limit('request-bill-ip', '20/m')
+async def request_bill(request, table_uuid):
     """API для запроса счета"""
-    table = get_object_or_404(Table, uuid=table_uuid)
+    table = await aget_object_or_404(Table, uuid=table_uuid)
     
     if not table.bill_waiter:
         table.bill_waiter = True
         table.bill_time = timezone.now()
-        table.save(update_fields=['bill_waiter', 'bill_time'])
+        await table.asave(update_fields=['bill_waiter', 'bill_time'])
         
         # Здесь может быть логика для уведомления официанта
         
@@ -137,7 +143,7 @@ def request_bill(request, table_uuid):
 @csrf_exempt 
 def review_view(request, table_uuid):
     """Страница для оставления отзыва"""
-    table = get_object_or_404(Table, uuid=table_uuid)
+    table = get_object_or_404(Table.objects.select_related('section__restaurant__city'), uuid=table_uuid)
     restaurant = table.section.restaurant
     
     context = {
@@ -148,11 +154,11 @@ def review_view(request, table_uuid):
     return render(request, 'table_service/review.html', context)
 
 @require_GET
-def menu_items_api(request, table_uuid):
+async def menu_items_api(request, table_uuid):
     """API для получения элементов меню"""
-    table = get_table_from_uuid(table_uuid)
+    table = await aget_table_from_uuid(table_uuid)
     if not table:
-        return JsonResponse({'error': 'Стол не найден'}, status=404)
+        return FastJsonResponse({'error': 'Стол не найден'}, status=404)
     
     restaurant = table.section.restaurant
     
@@ -172,7 +178,7 @@ def menu_items_api(request, table_uuid):
         )
     
     data = []
-    for item in menu_items:
+    async for item in menu_items:
         data.append({
             'id': item.id,
             'name': item.name_ru,
@@ -188,15 +194,17 @@ def menu_items_api(request, table_uuid):
             'is_healthy': item.is_healthy()
         })
     
-    return JsonResponse({'items': data})
+    return FastJsonResponse({'items': data})
 
 @csrf_exempt 
 @require_POST
-def add_to_order(request, table_uuid):
+@rate_limit('add-to-order', '30/m', key='table')
+@rate_limit('add-to-order-ip', '60/m')
+async def add_to_order(request, table_uuid):
     """API для добавления блюда в заказ"""
     try:
-        table = get_object_or_404(Table, uuid=table_uuid)
-        data = json.loads(request.body)
+        table = await aget_object_or_404(Table.objects.select_related('section'), uuid=table_uuid)
+        data = json_loads(request.body)
         
         menu_item_id = data.get('menu_item_id')
         quantity = int(data.get('quantity', 1))
@@ -204,23 +212,24 @@ def add_to_order(request, table_uuid):
         if quantity <= 0:
             return HttpResponseBadRequest('Количество должно быть больше нуля')
         
-        menu_item = get_object_or_404(Menu, id=menu_item_id, restaurant=table.section.restaurant)
+        menu_item = await aget_object_or_404(Menu, id=menu_item_id, restaurant_id=table.section.restaurant_id)
         
         # Получение или создание активного заказа
-        active_order = Order.objects.filter(
+        active_order = await Order.objects.filter(
             table=table, 
             status__in=['new', 'processing']
-        ).first()
+        ).afirst()
         
         if not active_order:
-            active_order = Order.objects.create(
+            user = await request.auser()
+            active_order = await Order.objects.acreate(
                 table=table,
                 status='new',
-                user=request.user if request.user.is_authenticated else None
+                user=user if user.is_authenticated else None
             )
         
         # Добавление или обновление позиции заказа
-        order_item, created = OrderItem.objects.get_or_create(
+        order_item, created = await OrderItem.objects.aget_or_create(
             order=active_order,
             menu_item=menu_item,
             defaults={
@@ -230,46 +239,48 @@ def add_to_order(request, table_uuid):
         )
         
         if not created:
-            order_item.quantity += quantity
-            order_item.save(update_fields=['quantity'])
+            # F() вместо чтения и записи: одновременные добавления с соседних телефонов не теряются.
+            await OrderItem.objects.filter(pk=order_item.pk).aupdate(quantity=F('quantity') + quantity)
         
-        # Пересчет общей стоимости заказа
-        order_total = OrderItem.objects.filter(order=active_order).aggregate(
-            total=Coalesce(Sum(F('price') * F('quantity')), 0, output_field=DecimalField())
-        )['total']
+        # Пересчет общей стоимости и количества одним запросом
+        totals = await OrderItem.objects.filter(order=active_order).aaggregate(
+            total=Coalesce(Sum(F('price') * F('quantity')), 0, output_field=DecimalField()),
+            item_count=Count('id'),
+            total_quantity=Coalesce(Sum('quantity'), 0),
+        )
         
-        active_order.total_price = order_total
-        active_order.save(update_fields=['total_price'])
+        active_order.total_price = totals['total']
+        await active_order.asave(update_fields=['total_price'])
         
-        return JsonResponse({
+        return FastJsonResponse({
             'success': True,
             'message': f'{menu_item.name_ru} добавлено в заказ',
             'order_total': float(active_order.total_price),
-            'item_count': OrderItem.objects.filter(order=active_order).count(),
-            'total_quantity': OrderItem.objects.filter(order=active_order).aggregate(
-                total=Coalesce(Sum('quantity'), 0)
-            )['total']
+            'item_count': totals['item_count'],
+            'total_quantity': totals['total_quantity']
         })
     
     except Exception as e:
         logger.error(f"Error adding to order: {str(e)}")
-        return JsonResponse({
+        return FastJsonResponse({
             'success': False,
             'message': 'Произошла ошибка при добавлении в заказ'
         }, status=400)
 
 @require_GET
-def order_status(request, table_uuid):
+async def order_status(request, table_uuid):
     """API для получения статуса заказа"""
-    table = get_object_or_404(Table, uuid=table_uuid)
+    table = await aget_object_or_404(Table, uuid=table_uuid)
     
-    active_orders = Order.objects.filter(
-        table=table, 
-        status__in=['new', 'processing', 'ready', 'delivered']
-    )
+    active_orders = [
+        order async for order in Order.objects.filter(
+            table=table, 
+            status__in=['new', 'processing', 'ready', 'delivered']
+        ).prefetch_related('items__menu_item')
+    ]
     
     if not active_orders:
-        return JsonResponse({
+        return FastJsonResponse({
             'has_order': False,
             'message': 'У этого стола нет активных заказов'
         })
@@ -298,17 +309,19 @@ def order_status(request, table_uuid):
             'items': items
         })
     
-    return JsonResponse({
+    return FastJsonResponse({
         'has_order': True,
         'orders': order_data
     })
 
 @csrf_exempt 
 @require_POST
+@rate_limit('submit-review', '5/h', key='table')
+@rate_limit('submit-review-ip', '10/h')
 def submit_review(request, table_uuid):
     """API для отправки отзыва"""
     try:
-        table = get_object_or_404(Table, uuid=table_uuid)
+        table = get_object_or_404(Table.objects.select_related('section__restaurant'), uuid=table_uuid)
         restaurant = table.section.restaurant
         data = json.loads(request.body)
         
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.utils import timezone
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 from django import forms
@@ -96,11 +97,11 @@ class CustomUserAdmin(UserAdmin):
     actions = ['activate_users', 'deactivate_users']
     
     def activate_users(self, request, queryset):
-        updated = queryset.update(is_active=True)
+        updated = queryset.update(is_active=True, updated_at=timezone.now())
         self.message_user(request, f'Активировано {updated} пользователей')
     activate_users.short_description = _("Активировать выбранных пользователей")
     
     def deactivate_users(self, request, queryset):
-        updated = queryset.update(is_active=False)
+        updated = queryset.update(is_active=False, updated_at=timezone.now())
         self.message_user(request, f'Деактивировано {updated} пользователей')
     deactivate_users.short_description = _("Деактивировать выбранных пользователей")
\ No newline at end of file
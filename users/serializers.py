@@ -74,6 +74,7 @@ class ProfileSerializer(serializers.ModelSerializer):
             'language', 'city', 'city_details', 'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
+        related_paths = ['city']
     
     def get_image_url(self, obj):
         request = self.context.get('request')
@@ -9,6 +9,7 @@ from products.models import Menu
 from restaurant.models import Restaurant
 from cities.models import City
 from advertisement.views import get_banners_for_homepage
+from core.ratelimit import rate_limit
     
 User = get_user_model()
 
@@ -41,6 +42,7 @@ def home_view(request):
     
     return render(request, 'home.html', context)
 
+@rate_limit('registration', '5/h', methods=['POST'])
 def register_view(request):
     if request.user.is_authenticated:
         messages.info(request, 'Вы уже авторизованы.')
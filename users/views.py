@@ -20,6 +20,10 @@ from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
 from dj_rest_auth.registration.views import SocialLoginView
 from allauth.socialaccount.providers.oauth2.client import OAuth2Client
 from notifications.services import NotificationService
+from core.metrics import observe_external
+from core.conditional import ConditionalGetMixin, conditional_get
+from core.query_plan import QueryPlanMixin
+from core.ratelimit import rate_limit
 
 from .serializers import (
     UserSerializer, 
@@ -36,13 +40,15 @@ User = get_user_model()
 logger = logging.getLogger(__name__)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ConditionalGetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = UserFilter
     search_fields = ['name', 'last_name', 'phone_number', 'email']
     ordering_fields = ['name', 'created_at', 'city']
     ordering = ['-created_at']
+    # Город вложен в ответ retrieve.
+    conditional_namespaces = ('cities',)
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -65,6 +71,14 @@ class UserViewSet(viewsets.ModelViewSet):
         else:
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
+
+    @conditional_get
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
     
     @swagger_auto_schema(
         operation_description="Изменение пароля пользователя",
@@ -237,6 +251,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
+@rate_limit('registration', '5/h', methods=['POST'])
 class UserRegistrationView(generics.CreateAPIView):
     serializer_class = UserCreateSerializer
     permission_classes = [AllowAny]
@@ -434,19 +449,21 @@ def google(request):
     }
     form_encode = urlencode(form_data)
     
-    get_google_access_token = requests.post(settings.GOOGLE_TOKEN_URI, 
-                                            headers={
-                                                'Content-Type': 'application/x-www-form-urlencoded'
-                                            },
-                                            data=form_encode)
+    with observe_external('google', 'oauth_token'):
+        get_google_access_token = requests.post(settings.GOOGLE_TOKEN_URI, 
+                                                headers={
+                                                    'Content-Type': 'application/x-www-form-urlencoded'
+                                                },
+                                                data=form_encode)
     res_access_token = get_google_access_token.json()
     if 'error' in res_access_token:
         return Response(res_access_token, status=get_google_access_token.status_code)
     
-    get_user_credentials_from_google = requests.get(settings.GOOGLE_USER_INFO_URI,
-                                        headers={
-                                            'Authorization': f"Bearer {res_access_token['access_token']}"
-                                        })
+    with observe_external('google', 'userinfo'):
+        get_user_credentials_from_google = requests.get(settings.GOOGLE_USER_INFO_URI,
+                                            headers={
+                                                'Authorization': f"Bearer {res_access_token['access_token']}"
+                                            })
     res_user_credentials = get_user_credentials_from_google.json()
     if 'error' in get_user_credentials_from_google:
         return Response(res_user_credentials, status=res_user_credentials.status_code)